@@ -0,0 +1,214 @@
+import hashlib
+import math
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Per-user sliding-window aggregates over raw login, bid and payment events,
+# feeding the fraud detector's features. The window is a ring of
+# n_buckets time buckets per user. An event lands in bucket
+# (timestamp // bucket_seconds) % n_buckets, and a slot still holding an
+# older bucket is cleared first. Updates are O(1) and reads merge at most
+# n_buckets slots. Each slot keeps:
+#   - counters: logins, failed logins, bids, payments, payment total
+#   - login count and sums of sin/cos of the login hour-of-day angle
+#   - HyperLogLog registers over IP addresses
+# Login hours are circular: 23:00 and 01:00 are two hours apart, not 22.
+# The spread is the circular variance -2 ln R of the merged angles (R the
+# mean resultant length), in hours squared so it stays on the scale of the
+# plain variance the fraud model was trained on: about 1 for logins an hour
+# either side of the same time, up to 48 (a uniform spread over the day).
+# Users are kept in LRU order and the least recently active is evicted past
+# max_users, so memory stays bounded on an unbounded event stream.
+# Timestamps more than max_skew_seconds ahead of the clock are clamped to
+# it: a far-future event would otherwise claim the ring and make every later
+# real event look stale.
+
+EVENT_TYPES = ("login", "login_failed", "bid", "payment")
+
+# Counter layout within a slot
+_LOGINS, _FAILED_LOGINS, _BIDS, _PAYMENTS, _PAYMENT_TOTAL, _HOUR_N, _HOUR_SIN, _HOUR_COS = range(8)
+_FIELDS = 8
+
+# Radians per hour of the day, and the variance of hours spread uniformly
+# over the day (the cap when the angles cancel out)
+_HOUR_ANGLE = 2 * math.pi / 24
+_UNIFORM_HOUR_VARIANCE = 24 * 24 / 12
+
+
+def _hll_alpha(m):
+    return {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+
+
+class _UserWindow:
+    __slots__ = ("buckets", "counters", "registers")
+
+    def __init__(self, n_buckets, n_registers):
+        self.buckets = array("q", [-1]) * n_buckets
+        self.counters = array("d", [0.0]) * (n_buckets * _FIELDS)
+        self.registers = bytearray(n_buckets * n_registers)
+
+
+class ActivityFeatureStore:
+    def __init__(self, window_seconds=86400, n_buckets=12, max_users=100000, hll_precision=5,
+                 max_skew_seconds=300):
+        self.window_seconds = window_seconds
+        self.max_skew_seconds = max_skew_seconds
+        self.n_buckets = n_buckets
+        self.bucket_seconds = window_seconds / n_buckets
+        self.max_users = max_users
+        self.hll_precision = hll_precision
+        self.n_registers = 1 << hll_precision
+        self._users: "OrderedDict[int, _UserWindow]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.events = 0
+        self.stale_events = 0
+        self.evictions = 0
+
+    def _slot(self, window: _UserWindow, bucket) -> Optional[int]:
+        # Slot for bucket, cleared if it still holds an older bucket; None if
+        # it already holds a newer one (a bucket the window has moved past)
+        slot = bucket % self.n_buckets
+        current = window.buckets[slot]
+        if current == bucket:
+            return slot
+        if current > bucket:
+            return None
+        window.buckets[slot] = bucket
+        start = slot * _FIELDS
+        window.counters[start:start + _FIELDS] = array("d", [0.0]) * _FIELDS
+        start = slot * self.n_registers
+        window.registers[start:start + self.n_registers] = bytes(self.n_registers)
+        return slot
+
+    def add(self, user_id: int, event_type: str, timestamp: Optional[float] = None,
+            ip_address: Optional[str] = None, amount: Optional[float] = None) -> bool:
+        # False when the event is too old to fall inside the window
+        if event_type not in EVENT_TYPES:
+            raise ValueError(f"Unknown event type: {event_type}")
+        now = time.time()
+        timestamp = now if timestamp is None else min(timestamp, now + self.max_skew_seconds)
+        bucket = int(timestamp // self.bucket_seconds)
+        if bucket < int(now // self.bucket_seconds) - self.n_buckets + 1:
+            # Older than the window: never stored, even in an empty slot
+            with self._lock:
+                self.stale_events += 1
+            return False
+
+        with self._lock:
+            window = self._users.get(user_id)
+            if window is None:
+                window = self._users[user_id] = _UserWindow(self.n_buckets, self.n_registers)
+                if len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._users.move_to_end(user_id)
+
+            slot = self._slot(window, bucket)
+            if slot is None:
+                self.stale_events += 1
+                return False
+            self.events += 1
+            counters = window.counters
+            base = slot * _FIELDS
+
+            if event_type == "login":
+                counters[base + _LOGINS] += 1
+                # Login hour-of-day (UTC) as an angle on the clock
+                angle = (timestamp % 86400) / 3600 * _HOUR_ANGLE
+                counters[base + _HOUR_N] += 1
+                counters[base + _HOUR_SIN] += math.sin(angle)
+                counters[base + _HOUR_COS] += math.cos(angle)
+            elif event_type == "login_failed":
+                counters[base + _FAILED_LOGINS] += 1
+            elif event_type == "bid":
+                counters[base + _BIDS] += 1
+            elif event_type == "payment":
+                counters[base + _PAYMENTS] += 1
+                counters[base + _PAYMENT_TOTAL] += amount or 0.0
+
+            if ip_address:
+                # HyperLogLog: the top bits of the hash pick a register, which
+                # keeps the longest run of leading zeros seen in the rest
+                hashed = int.from_bytes(hashlib.blake2b(ip_address.encode("utf-8"), digest_size=8).digest(), "big")
+                register = hashed >> (64 - self.hll_precision)
+                rest_bits = 64 - self.hll_precision
+                rank = rest_bits - (hashed & ((1 << rest_bits) - 1)).bit_length() + 1
+                index = slot * self.n_registers + register
+                if rank > window.registers[index]:
+                    window.registers[index] = rank
+            return True
+
+    def features(self, user_id: int, now: Optional[float] = None) -> Dict[str, float]:
+        # The fraud model features derivable from events, as per-day rates
+        # over the live buckets of the window
+        now = time.time() if now is None else now
+        oldest = int(now // self.bucket_seconds) - self.n_buckets + 1
+        totals = [0.0] * _FIELDS
+        registers = bytearray(self.n_registers)
+
+        with self._lock:
+            window = self._users.get(user_id)
+            if window is not None:
+                for slot, bucket in enumerate(window.buckets):
+                    if bucket < oldest:
+                        continue
+                    base = slot * _FIELDS
+                    for field in range(_FIELDS):
+                        totals[field] += window.counters[base + field]
+
+                    start = slot * self.n_registers
+                    for i, value in enumerate(window.registers[start:start + self.n_registers]):
+                        if value > registers[i]:
+                            registers[i] = value
+
+        per_day = 86400 / self.window_seconds
+        return {
+            "logins_per_day": totals[_LOGINS] * per_day,
+            "bids_per_day": totals[_BIDS] * per_day,
+            "payment_amount": totals[_PAYMENT_TOTAL] / totals[_PAYMENTS] if totals[_PAYMENTS] else 0.0,
+            "login_time_variance": self._hour_variance(totals[_HOUR_N], totals[_HOUR_SIN], totals[_HOUR_COS]),
+            "ip_address_count": self._hll_count(registers),
+            "failed_login_attempts": int(totals[_FAILED_LOGINS]),
+        }
+
+    @staticmethod
+    def _hour_variance(n, sin_sum, cos_sum) -> float:
+        # Circular variance of the login hours, in hours squared
+        if not n:
+            return 0.0
+        resultant = math.hypot(sin_sum, cos_sum) / n
+        if resultant <= 0.0:
+            return _UNIFORM_HOUR_VARIANCE
+        variance = -2 * math.log(min(resultant, 1.0)) / (_HOUR_ANGLE * _HOUR_ANGLE)
+        return min(variance, _UNIFORM_HOUR_VARIANCE)
+
+    def _hll_count(self, registers) -> int:
+        m = self.n_registers
+        if not any(registers):
+            return 0
+        estimate = _hll_alpha(m) * m * m / sum(2.0 ** -value for value in registers)
+        zeros = registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def __contains__(self, user_id):
+        return user_id in self._users
+
+    def stats(self):
+        bytes_per_user = 8 * self.n_buckets + 8 * self.n_buckets * _FIELDS + self.n_buckets * self.n_registers
+        return {
+            "users": len(self._users),
+            "max_users": self.max_users,
+            "events": self.events,
+            "stale_events": self.stale_events,
+            "evictions": self.evictions,
+            "window_seconds": self.window_seconds,
+            "n_buckets": self.n_buckets,
+            "approx_bytes_per_user": bytes_per_user,
+        }
@@ -1,17 +1,34 @@
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import io
+import os
 import base64
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import fastapi
-from fastapi import FastAPI
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, ConfigDict
 from typing import List, Dict, Optional
+from model_loader import ServiceWarmup, add_health_routes, configure_logging
+from api_errors import add_validation_error_handler
+from analytics_store import AnalyticsStore, GRANULARITIES, DAY, to_epoch, from_epoch
 
 app = FastAPI(title="AI Analytics API")
 
+# matplotlib is imported on a background thread after startup instead of at
+# import; /health/ready reports when it is in place
+warmup = ServiceWarmup("analytics")
+
+def load_pyplot():
+    import matplotlib
+    matplotlib.use("Agg")  # Headless rendering to PNG
+    import matplotlib.pyplot as plt
+    return plt
+
+pyplot = warmup.resource("matplotlib", load_pyplot)
+
+add_health_routes(app, warmup)
+add_validation_error_handler(app)
+
 # Generate mock data for analytics
 np.random.seed(42)
 
@@ -37,6 +54,60 @@ activity_df = pd.DataFrame({
     'total_earnings': total_earnings
 })
 
+# Activity endpoints answer from pre-aggregated hourly and daily rollups
+# (see analytics_store.py) rather than from the frame. With
+# ANALYTICS_DB_PATH set, the rollups are backfilled from that SQLite copy
+# of the jobs, contracts, payments, profiles and messages tables; without
+# it they are seeded from the mock frame above. Live events are added
+# through POST /analytics/events, and /analytics/reload rebuilds from the
+# database.
+ACTIVITY_METRICS = ['user_signups', 'active_users', 'project_postings', 'completed_projects', 'total_earnings']
+ANALYTICS_DB_PATH = os.environ.get("ANALYTICS_DB_PATH")
+# Default window when a request gives no start: the 30 days before the
+# latest data, plus that day itself
+ANALYTICS_DEFAULT_DAYS = int(os.environ.get("ANALYTICS_DEFAULT_DAYS", "31"))
+
+def load_activity_store():
+    if ANALYTICS_DB_PATH:
+        return AnalyticsStore.from_sqlite(ANALYTICS_DB_PATH, ACTIVITY_METRICS)
+    store = AnalyticsStore(ACTIVITY_METRICS, source="mock")
+    # One bucket per mock row, at the start of its day
+    days = activity_df['date'].dt.normalize().to_numpy().astype('datetime64[s]').astype(np.int64)
+    for metric in ACTIVITY_METRICS:
+        store.add(metric, days, activity_df[metric].to_numpy())
+    return store
+
+activity_store = load_activity_store()
+
+def query_range(store: AnalyticsStore, start: Optional[datetime], end: Optional[datetime], granularity: str):
+    # Epoch seconds for [start, end). A missing end is the midnight after
+    # the latest data; a missing start is ANALYTICS_DEFAULT_DAYS before end.
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=422, detail=f"granularity must be one of {', '.join(GRANULARITIES)}")
+    if end is not None:
+        end_s = to_epoch(end)
+    elif store.latest is not None:
+        end_s = store.latest - store.latest % DAY + DAY
+    else:
+        end_s = to_epoch(datetime.now(timezone.utc))
+    start_s = to_epoch(start) if start is not None else end_s - ANALYTICS_DEFAULT_DAYS * DAY
+    if end_s - end_s % 3600 <= start_s - start_s % 3600:
+        raise HTTPException(status_code=422, detail="end must be at least an hour after start")
+    return start_s, end_s
+
+def activity_series(store: AnalyticsStore, metrics: List[str], start: int, end: int, granularity: str):
+    # Bucket start dates, per-metric arrays, and the records the endpoints return
+    columns = {}
+    for metric in metrics:
+        times, columns[metric] = store.series(metric, start, end, granularity)
+    dates = [from_epoch(t) for t in times]
+    records = [
+        {'date': date, **{metric: float(columns[metric][i]) if metric == 'total_earnings'
+                          else int(round(columns[metric][i])) for metric in metrics}}
+        for i, date in enumerate(dates)
+    ]
+    return dates, columns, records
+
 # Skill demand data
 skills = ['React', 'Node.js', 'Python', 'UI/UX Design', 'Content Writing', 
           'SEO', 'Data Analysis', 'Mobile Development', 'WordPress', 'Graphic Design']
@@ -79,11 +150,20 @@ def fig_to_base64(fig):
     return img_str
 
 @app.get("/analytics/user-activity")
-async def get_user_activity():
+async def get_user_activity(start: Optional[datetime] = None, end: Optional[datetime] = None,
+                            granularity: str = "day"):
+    warmup.require_ready()
+    plt = pyplot.get()
+    store = activity_store
+    start_s, end_s = query_range(store, start, end, granularity)
+    dates, columns, records = activity_series(store, ['active_users', 'user_signups'], start_s, end_s, granularity)
+    active = store.summary('active_users', start_s, end_s, granularity)
+    signups = store.summary('user_signups', start_s, end_s, granularity)
+    
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    ax.plot(activity_df['date'], activity_df['active_users'], label='Active Users')
-    ax.plot(activity_df['date'], activity_df['user_signups'], label='New Signups')
+    ax.plot(dates, columns['active_users'], label='Active Users')
+    ax.plot(dates, columns['user_signups'], label='New Signups')
     
     ax.set_title('User Activity Over Time')
     ax.set_xlabel('Date')
@@ -100,21 +180,31 @@ async def get_user_activity():
     
     return {
         "chart": img_str,
-        "data": activity_df[['date', 'active_users', 'user_signups']].to_dict(orient='records'),
+        "data": records,
         "summary": {
-            "total_active_users": int(activity_df['active_users'].sum()),
-            "total_new_signups": int(activity_df['user_signups'].sum()),
-            "avg_daily_active_users": float(activity_df['active_users'].mean()),
-            "avg_daily_signups": float(activity_df['user_signups'].mean())
+            "total_active_users": int(active['total']),
+            "total_new_signups": int(signups['total']),
+            "avg_daily_active_users": float(active.get('mean', 0.0)),
+            "avg_daily_signups": float(signups.get('mean', 0.0))
         }
     }
 
 @app.get("/analytics/project-metrics")
-async def get_project_metrics():
+async def get_project_metrics(start: Optional[datetime] = None, end: Optional[datetime] = None,
+                              granularity: str = "day"):
+    warmup.require_ready()
+    plt = pyplot.get()
+    store = activity_store
+    start_s, end_s = query_range(store, start, end, granularity)
+    dates, columns, records = activity_series(store, ['project_postings', 'completed_projects'], start_s, end_s,
+                                              granularity)
+    postings = store.summary('project_postings', start_s, end_s, granularity)
+    completed = store.total('completed_projects', start_s, end_s)
+    
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    ax.plot(activity_df['date'], activity_df['project_postings'], label='New Projects')
-    ax.plot(activity_df['date'], activity_df['completed_projects'], label='Completed Projects')
+    ax.plot(dates, columns['project_postings'], label='New Projects')
+    ax.plot(dates, columns['completed_projects'], label='Completed Projects')
     
     ax.set_title('Project Activity Over Time')
     ax.set_xlabel('Date')
@@ -130,25 +220,33 @@ async def get_project_metrics():
     plt.close(fig)
     
     # Calculate completion rate
-    completion_rate = activity_df['completed_projects'].sum() / activity_df['project_postings'].sum()
+    completion_rate = completed / postings['total'] if postings['total'] > 0 else 0.0
     
     return {
         "chart": img_str,
-        "data": activity_df[['date', 'project_postings', 'completed_projects']].to_dict(orient='records'),
+        "data": records,
         "summary": {
-            "total_projects_posted": int(activity_df['project_postings'].sum()),
-            "total_projects_completed": int(activity_df['completed_projects'].sum()),
+            "total_projects_posted": int(postings['total']),
+            "total_projects_completed": int(completed),
             "completion_rate": float(completion_rate),
-            "avg_daily_new_projects": float(activity_df['project_postings'].mean())
+            "avg_daily_new_projects": float(postings.get('mean', 0.0))
         }
     }
 
 @app.get("/analytics/earnings")
-async def get_earnings_metrics():
+async def get_earnings_metrics(start: Optional[datetime] = None, end: Optional[datetime] = None,
+                               granularity: str = "day"):
+    warmup.require_ready()
+    plt = pyplot.get()
+    store = activity_store
+    start_s, end_s = query_range(store, start, end, granularity)
+    dates, columns, records = activity_series(store, ['total_earnings'], start_s, end_s, granularity)
+    earnings = store.summary('total_earnings', start_s, end_s, granularity)
+    
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    ax.plot(activity_df['date'], activity_df['total_earnings'])
-    ax.fill_between(activity_df['date'], activity_df['total_earnings'], alpha=0.2)
+    ax.plot(dates, columns['total_earnings'])
+    ax.fill_between(dates, columns['total_earnings'], alpha=0.2)
     
     ax.set_title('Platform Earnings Over Time')
     ax.set_xlabel('Date')
@@ -167,17 +265,20 @@ async def get_earnings_metrics():
     
     return {
         "chart": img_str,
-        "data": activity_df[['date', 'total_earnings']].to_dict(orient='records'),
+        "data": records,
         "summary": {
-            "total_earnings": float(activity_df['total_earnings'].sum()),
-            "avg_daily_earnings": float(activity_df['total_earnings'].mean()),
-            "max_daily_earnings": float(activity_df['total_earnings'].max()),
-            "min_daily_earnings": float(activity_df['total_earnings'].min())
+            "total_earnings": float(earnings['total']),
+            "avg_daily_earnings": float(earnings.get('mean', 0.0)),
+            "max_daily_earnings": float(earnings.get('max', 0.0)),
+            "min_daily_earnings": float(earnings.get('min', 0.0))
         }
     }
 
 @app.get("/analytics/skill-demand")
 async def get_skill_demand():
+    warmup.require_ready()
+    plt = pyplot.get()
+    
     # Sort by demand
     sorted_skill_df = skill_df.sort_values('demand', ascending=False)
     
@@ -223,6 +324,9 @@ async def get_skill_demand():
 
 @app.get("/analytics/fraud-detection")
 async def get_fraud_metrics():
+    warmup.require_ready()
+    plt = pyplot.get()
+    
     fig, ax = plt.subplots(figsize=(10, 6))
     
     # Create pie chart
@@ -248,6 +352,9 @@ async def get_fraud_metrics():
 
 @app.get("/analytics/project-success")
 async def get_project_success():
+    warmup.require_ready()
+    plt = pyplot.get()
+    
     fig, ax = plt.subplots(figsize=(10, 6))
     
     # Sort by success rate
@@ -290,24 +397,30 @@ async def get_project_success():
     }
 
 @app.get("/analytics/dashboard-summary")
-async def get_dashboard_summary():
+async def get_dashboard_summary(start: Optional[datetime] = None, end: Optional[datetime] = None):
+    store = activity_store
+    start_s, end_s = query_range(store, start, end, "day")
+    week = 7 * DAY
+    
     # Calculate summary metrics
-    total_users = activity_df['active_users'].iloc[-1]
-    total_projects = activity_df['project_postings'].sum()
-    total_earnings = activity_df['total_earnings'].sum()
+    active = store.summary('active_users', start_s, end_s)
+    total_users = active.get('last', 0.0)
+    total_projects = store.total('project_postings', start_s, end_s)
+    total_earnings = store.total('total_earnings', start_s, end_s)
     avg_success_rate = success_df['success_rate'].mean()
     
     # User growth
-    user_growth = (activity_df['active_users'].iloc[-1] - activity_df['active_users'].iloc[0]) / activity_df['active_users'].iloc[0]
+    first_users = active.get('first', 0.0)
+    user_growth = (total_users - first_users) / first_users if first_users > 0 else 0
     
     # Project growth
-    first_week_projects = activity_df['project_postings'].iloc[:7].sum()
-    last_week_projects = activity_df['project_postings'].iloc[-7:].sum()
+    first_week_projects = store.total('project_postings', start_s, start_s + week)
+    last_week_projects = store.total('project_postings', end_s - week, end_s)
     project_growth = (last_week_projects - first_week_projects) / first_week_projects if first_week_projects > 0 else 0
     
     # Earnings growth
-    first_week_earnings = activity_df['total_earnings'].iloc[:7].sum()
-    last_week_earnings = activity_df['total_earnings'].iloc[-7:].sum()
+    first_week_earnings = store.total('total_earnings', start_s, start_s + week)
+    last_week_earnings = store.total('total_earnings', end_s - week, end_s)
     earnings_growth = (last_week_earnings - first_week_earnings) / first_week_earnings if first_week_earnings > 0 else 0
     
     return {
@@ -329,10 +442,56 @@ async def get_dashboard_summary():
         }
     }
 
+class ActivityEvent(BaseModel):
+    # NaN or infinite values would poison every prefix sum after them
+    model_config = ConfigDict(allow_inf_nan=False)
+    
+    metric: str
+    timestamp: datetime
+    value: float = 1.0
+
+class ActivityEvents(BaseModel):
+    events: List[ActivityEvent]
+
+@app.post("/analytics/events")
+async def add_activity_events(request: ActivityEvents):
+    # Adds events to the rollups; for active_users the value is that
+    # day's count of newly active users
+    unknown = sorted({event.metric for event in request.events} - set(ACTIVITY_METRICS))
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown metrics {unknown}, expected {ACTIVITY_METRICS}")
+    store = activity_store
+    for metric in ACTIVITY_METRICS:
+        events = [event for event in request.events if event.metric == metric]
+        if events:
+            store.add(metric, [to_epoch(event.timestamp) for event in events], [event.value for event in events])
+    return {"added": len(request.events), "latest": from_epoch(store.latest) if store.latest is not None else None}
+
+@app.post("/analytics/reload")
+def reload_activity_store():
+    # Rebuilds the rollups from ANALYTICS_DB_PATH and swaps them in;
+    # requests in flight finish on the old store
+    global activity_store
+    if not ANALYTICS_DB_PATH:
+        raise HTTPException(status_code=409, detail="ANALYTICS_DB_PATH is not set; serving mock data")
+    try:
+        store = load_activity_store()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed, still serving the previous rollups: {e}")
+    activity_store = store
+    return activity_store.stats()
+
+@app.get("/analytics/store/stats")
+async def get_activity_store_stats():
+    return activity_store.stats()
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
+warmup.mark_imported()
+
 if __name__ == "__main__":
+    configure_logging()
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8004)
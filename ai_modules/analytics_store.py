@@ -0,0 +1,269 @@
+import calendar
+import math
+import sqlite3
+import threading
+from datetime import datetime, timezone
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Time-series rollups for the analytics service. Every metric is kept as
+# bucket totals at two resolutions, hourly and daily. Each resolution also
+# keeps a running prefix sum, so the total over any range of whole buckets
+# is one subtraction. A series at any granularity costs one lookup per
+# output bucket, whatever the length of history.
+#
+# Events are added in place. Only the prefix sums from the earliest touched
+# bucket onwards are rebuilt, lazily, on the next query. Events arriving
+# near "now" therefore cost a short tail rebuild, never a rescan of history.
+#
+# Times are epoch seconds and buckets are aligned to UTC; naive datetimes
+# are taken as UTC. Ranges are [start, end) and are floored to the hour.
+# Queries use the daily rollup when both ends fall on midnight and the
+# granularity is a day or coarser, and the hourly rollup otherwise. Weeks
+# start on Monday.
+#
+# Backfill reads a SQLite stand-in for the platform tables, aggregated to
+# hourly buckets in SQL. Tables that are missing are skipped:
+#
+#   project_postings    jobs                 created_at   count, not drafts
+#   completed_projects  contracts            end_date     count, completed
+#   total_earnings      payments             created_at   sum(amount), completed
+#   user_signups        freelancer_profiles  created_at   count
+#                       employer_profiles    created_at   count
+#   active_users        messages             created_at   distinct senders per day
+
+GRANULARITIES = ("hour", "day", "week", "month")
+LEVEL_SECONDS = {"hour": 3600, "day": 86400}
+DAY = 86400
+# Epoch day 0 was a Thursday; Mondays are 4 days later
+WEEK_OFFSET = 4 * DAY
+
+SQLITE_SOURCES = [
+    ("project_postings", "jobs", "created_at", "COUNT(*)", "status != 'draft'"),
+    ("completed_projects", "contracts", "COALESCE(end_date, updated_at)", "COUNT(*)", "status = 'completed'"),
+    ("total_earnings", "payments", "created_at", "SUM(amount)", "status = 'completed'"),
+    ("user_signups", "freelancer_profiles", "created_at", "COUNT(*)", "1"),
+    ("user_signups", "employer_profiles", "created_at", "COUNT(*)", "1"),
+]
+
+
+def to_epoch(moment: datetime) -> int:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return math.floor(moment.timestamp())
+
+
+def from_epoch(seconds) -> datetime:
+    return datetime.fromtimestamp(int(seconds), tz=timezone.utc).replace(tzinfo=None)
+
+
+class _Level:
+    # Bucket totals for every metric at one resolution, as one
+    # (metrics, capacity) array that grows at either end
+    def __init__(self, seconds: int, n_metrics: int):
+        self.seconds = seconds
+        self.origin = 0  # bucket number of column 0
+        self.length = 0
+        self.values = np.zeros((n_metrics, 0))
+        self.prefix = np.zeros((n_metrics, 1))
+        self._dirty_from: Optional[int] = None
+
+    def _ensure(self, first: int, last: int):
+        if self.length == 0:
+            self.origin = first
+        if first < self.origin:
+            # Rare: history older than anything seen so far
+            shift = self.origin - first
+            self.values = np.concatenate([np.zeros((len(self.values), shift)), self.values], axis=1)
+            self.prefix = np.zeros((len(self.values), self.values.shape[1] + 1))
+            self.origin = first
+            self.length += shift
+            self._dirty_from = 0
+        needed = last - self.origin + 1
+        if needed > self.values.shape[1]:
+            capacity = max(needed, 2 * self.values.shape[1], 1024)
+            values = np.zeros((len(self.values), capacity))
+            values[:, :self.length] = self.values[:, :self.length]
+            prefix = np.zeros((len(self.values), capacity + 1))
+            prefix[:, :self.length + 1] = self.prefix[:, :self.length + 1]
+            self.values, self.prefix = values, prefix
+        if needed > self.length:
+            # New trailing buckets start at zero; their prefix is rebuilt
+            self._mark_dirty(self.length)
+            self.length = needed
+
+    def _mark_dirty(self, column: int):
+        self._dirty_from = column if self._dirty_from is None else min(self._dirty_from, column)
+
+    def add(self, metric: int, timestamps: np.ndarray, values: np.ndarray):
+        buckets = timestamps // self.seconds
+        self._ensure(int(buckets.min()), int(buckets.max()))
+        columns = buckets - self.origin
+        np.add.at(self.values[metric], columns, values)
+        self._mark_dirty(int(columns.min()))
+
+    def refresh(self):
+        # Rebuild prefix sums from the earliest bucket changed since the last query
+        if self._dirty_from is None:
+            return
+        start = self._dirty_from
+        self.prefix[:, start + 1:self.length + 1] = (
+            self.prefix[:, start:start + 1] + np.cumsum(self.values[:, start:self.length], axis=1)
+        )
+        self._dirty_from = None
+
+    def prefix_at(self, metric: int, timestamps) -> np.ndarray:
+        # Total of the buckets before each timestamp (which must be aligned)
+        columns = np.clip(np.asarray(timestamps) // self.seconds - self.origin, 0, self.length)
+        return self.prefix[metric, columns]
+
+
+class AnalyticsStore:
+    def __init__(self, metrics: Sequence[str], source: str = "empty"):
+        self.metrics = list(metrics)
+        self.source = source
+        self._metric_index = {metric: i for i, metric in enumerate(self.metrics)}
+        self._levels = {name: _Level(seconds, len(self.metrics)) for name, seconds in LEVEL_SECONDS.items()}
+        self._lock = threading.Lock()
+        self.added = 0  # events, or pre-aggregated buckets on backfill
+        self.earliest: Optional[int] = None
+        self.latest: Optional[int] = None
+
+    def _index(self, metric: str) -> int:
+        if metric not in self._metric_index:
+            raise KeyError(f"Unknown metric '{metric}', expected one of {', '.join(self.metrics)}")
+        return self._metric_index[metric]
+
+    def add(self, metric: str, timestamps, values=None):
+        # Events as epoch seconds, each adding its value (default 1)
+        index = self._index(metric)
+        timestamps = np.atleast_1d(np.asarray(timestamps, dtype=np.int64))
+        if len(timestamps) == 0:
+            return
+        values = np.ones(len(timestamps)) if values is None else np.broadcast_to(
+            np.asarray(values, dtype=np.float64), timestamps.shape)
+        if not np.isfinite(values).all():
+            # One NaN would poison every prefix sum after its bucket
+            raise ValueError("Event values must be finite")
+        with self._lock:
+            for level in self._levels.values():
+                level.add(index, timestamps, values)
+            first, last = int(timestamps.min()), int(timestamps.max())
+            self.earliest = first if self.earliest is None else min(self.earliest, first)
+            self.latest = last if self.latest is None else max(self.latest, last)
+            self.added += len(timestamps)
+
+    def _level(self, start: int, end: int, granularity: str) -> _Level:
+        if granularity != "hour" and start % DAY == 0 and end % DAY == 0:
+            level = self._levels["day"]
+        else:
+            level = self._levels["hour"]
+        level.refresh()
+        return level
+
+    @staticmethod
+    def _floor(seconds: int) -> int:
+        return seconds - seconds % 3600
+
+    def total(self, metric: str, start: int, end: int) -> float:
+        index = self._index(metric)
+        start, end = self._floor(start), self._floor(end)
+        if end <= start:
+            return 0.0
+        with self._lock:
+            level = self._level(start, end, "day")
+            before, after = level.prefix_at(index, [start, end])
+        return float(after - before)
+
+    @staticmethod
+    def edges(start: int, end: int, granularity: str) -> np.ndarray:
+        # Bucket boundaries covering [start, end): start, every aligned
+        # boundary strictly inside, then end
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity '{granularity}', expected one of {', '.join(GRANULARITIES)}")
+        if granularity == "month":
+            moment = from_epoch(start)
+            year, month = moment.year, moment.month
+            inner = []
+            while True:
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+                boundary = calendar.timegm((year, month, 1, 0, 0, 0))
+                if boundary >= end:
+                    break
+                inner.append(boundary)
+            inner = np.array(inner, dtype=np.int64)
+        else:
+            step = {"hour": 3600, "day": DAY, "week": 7 * DAY}[granularity]
+            offset = WEEK_OFFSET if granularity == "week" else 0
+            first = start - (start - offset) % step + step
+            inner = np.arange(first, end, step, dtype=np.int64)
+        return np.concatenate([[start], inner, [end]]).astype(np.int64)
+
+    def series(self, metric: str, start: int, end: int, granularity="day") -> Tuple[np.ndarray, np.ndarray]:
+        # (bucket start times, bucket totals); the first and last buckets
+        # are clipped to the range
+        index = self._index(metric)
+        start, end = self._floor(start), self._floor(end)
+        if end <= start:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        edges = self.edges(start, end, granularity)
+        with self._lock:
+            prefix = self._level(start, end, granularity).prefix_at(index, edges)
+        return edges[:-1], np.diff(prefix)
+
+    def summary(self, metric: str, start: int, end: int, granularity="day") -> Dict:
+        # Total, per-bucket mean, extremes, and the first and last buckets
+        times, values = self.series(metric, start, end, granularity)
+        if len(values) == 0:
+            return {"total": 0.0, "buckets": 0}
+        return {
+            "total": float(values.sum()),
+            "buckets": len(values),
+            "mean": float(values.mean()),
+            "max": float(values.max()),
+            "min": float(values.min()),
+            "first": float(values[0]),
+            "last": float(values[-1]),
+        }
+
+    def stats(self):
+        with self._lock:
+            return {
+                "source": self.source,
+                "metrics": self.metrics,
+                "added": self.added,
+                "earliest": from_epoch(self.earliest).isoformat() if self.earliest is not None else None,
+                "latest": from_epoch(self.latest).isoformat() if self.latest is not None else None,
+                "buckets": {name: level.length for name, level in self._levels.items()},
+                "bytes": int(sum(level.values.nbytes + level.prefix.nbytes for level in self._levels.values())),
+            }
+
+    @classmethod
+    def from_sqlite(cls, path: str, metrics: Sequence[str]) -> "AnalyticsStore":
+        store = cls(metrics, source=path)
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            tables = {name for (name,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            for metric, table, time_column, value, condition in SQLITE_SOURCES:
+                if table not in tables or metric not in store._metric_index:
+                    continue
+                rows = connection.execute(
+                    f"SELECT CAST(strftime('%s', {time_column}) AS INTEGER) / 3600 * 3600 AS hour, {value} "
+                    f"FROM {table} WHERE {condition} AND {time_column} IS NOT NULL GROUP BY hour"
+                ).fetchall()
+                store._add_rows(metric, rows)
+            if "messages" in tables and "active_users" in store._metric_index:
+                rows = connection.execute(
+                    "SELECT CAST(strftime('%s', date(created_at)) AS INTEGER), COUNT(DISTINCT sender_id) "
+                    "FROM messages GROUP BY date(created_at)"
+                ).fetchall()
+                store._add_rows("active_users", rows)
+        finally:
+            connection.close()
+        return store
+
+    def _add_rows(self, metric: str, rows: List[Tuple]):
+        rows = [(hour, value) for hour, value in rows if hour is not None and value is not None]
+        if rows:
+            hours, values = zip(*rows)
+            self.add(metric, np.array(hours, dtype=np.int64), np.array(values, dtype=np.float64))
@@ -0,0 +1,27 @@
+import math
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+
+# Shared 422 handler for services whose request models reject NaN and
+# infinity (allow_inf_nan=False). FastAPI's default handler echoes the
+# rejected input back, and a non-finite float cannot be encoded as JSON, so
+# the rejection itself turned into a 500. Non-finite inputs are reported as
+# the strings "nan", "inf" and "-inf" instead.
+
+
+def _finite(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_finite(item) for item in value]
+    return value
+
+
+def add_validation_error_handler(app: FastAPI):
+    @app.exception_handler(RequestValidationError)
+    async def request_validation_error(request: Request, exc: RequestValidationError):
+        return JSONResponse(status_code=422, content={"detail": _finite(jsonable_encoder(exc.errors()))})
@@ -0,0 +1,106 @@
+import copy
+import numpy as np
+from typing import Dict, Optional, Sequence
+from embedding_store import normalize
+
+# Embedding table for a categorical field such as a mentor's industry. There
+# are only a handful of distinct values, so each gets one vector instead of
+# one per mentor. The value x value cosine similarities are precomputed, and
+# rows carry an integer code per value. Comparing a request's value against
+# every row is then a gather from one table row. Values outside the
+# vocabulary need their own vector (from the embedding cache) and cost one
+# small matrix-vector product against the vocabulary.
+#
+# Multi-valued fields such as skills store each row as a padded array of
+# codes (-1 for padding). max_similarity is the late-interaction operator
+# over them: for every query value, its best match among a row's values.
+# Averaging that over a mentee's skills scores each skill on its own, and
+# never compares against one blurred vector for the whole list.
+
+
+class AttributeTable:
+    def __init__(self, values: Sequence[str], vectors):
+        # values are distinct; codes index this order
+        self.values = list(values)
+        self.index = {value: code for code, value in enumerate(self.values)}
+        self.vectors = normalize(vectors)
+        self.similarity = self.vectors @ self.vectors.T
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def nbytes(self):
+        return self.vectors.nbytes + self.similarity.nbytes
+
+    def extended(self, values: Sequence[str], vectors) -> "AttributeTable":
+        # A copy with the values not yet in the vocabulary appended; existing
+        # codes stay the same and this table is left untouched. Only the new
+        # rows and columns of the similarity table are computed.
+        added, added_vectors = [], []
+        for value, vector in zip(values, normalize(vectors)):
+            if value not in self.index and value not in added:
+                added.append(value)
+                added_vectors.append(vector)
+        if not added:
+            return self
+        n_old = len(self.values)
+        vectors = np.vstack([self.vectors, np.stack(added_vectors)])
+        cross = vectors[n_old:] @ vectors.T
+        similarity = np.empty((len(vectors), len(vectors)), dtype=np.float32)
+        similarity[:n_old, :n_old] = self.similarity
+        similarity[n_old:] = cross
+        similarity[:n_old, n_old:] = cross[:, :n_old].T
+        table = copy.copy(self)
+        table.similarity, table.vectors = similarity, vectors
+        table.values = self.values + added
+        table.index = {value: code for code, value in enumerate(table.values)}
+        return table
+
+    def code(self, value) -> int:
+        return self.index.get(value, -1)
+
+    def codes(self, values: Sequence[str]) -> np.ndarray:
+        return np.array([self.index.get(value, -1) for value in values], dtype=np.int64)
+
+    def unknown(self, values: Sequence[str]):
+        # Distinct values that need encoding, in first-seen order
+        return list(dict.fromkeys(value for value in values if value not in self.index))
+
+    def similarity_rows(self, values: Sequence[str], encoded: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+        # (len(values), len(self)) similarity of each value to every
+        # vocabulary entry; encoded holds vectors for the unknown values
+        codes = self.codes(values)
+        rows = self.similarity[np.maximum(codes, 0)]
+        missing = np.flatnonzero(codes < 0)
+        if len(missing):
+            vectors = np.stack([encoded[values[i]] for i in missing])
+            rows[missing] = normalize(vectors) @ self.vectors.T
+        return rows
+
+    def stats(self):
+        return {
+            "values": len(self.values),
+            "dim": int(self.vectors.shape[1]),
+            "bytes": int(self.nbytes),
+        }
+
+
+def max_similarity(query_similarities: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    # (k, n): for each of k query values (rows of similarity to the
+    # vocabulary), its best similarity among the values in each of n rows
+    # of codes. codes is (n, width), padded with -1; rows with no values
+    # score 0.
+    query_similarities = np.asarray(query_similarities, dtype=np.float32)
+    best = np.zeros((len(query_similarities), len(codes)), dtype=np.float32)
+    if codes.shape[1] == 0:
+        return best
+    # Code -1 selects the appended -inf column, so padding never wins
+    padded = np.concatenate(
+        [query_similarities, np.full((len(query_similarities), 1), -np.inf, dtype=np.float32)], axis=1
+    )
+    best = padded[:, codes[:, 0]]
+    for column in range(1, codes.shape[1]):
+        np.maximum(best, padded[:, codes[:, column]], out=best)
+    best[np.isneginf(best)] = 0.0
+    return best
@@ -0,0 +1,68 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from activity_features import EVENT_TYPES, ActivityFeatureStore
+
+# Ingestion throughput, feature read latency and memory per user of the
+# sliding-window activity store, plus distinct-IP estimation error.
+#
+#   python benchmarks/bench_activity_features.py --users 20000 --events 500000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--events", type=int, default=500000)
+    parser.add_argument("--buckets", type=int, default=12)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    now = time.time()
+    user_ids = rng.integers(0, args.users, args.events).tolist()
+    types = [EVENT_TYPES[i] for i in rng.integers(0, len(EVENT_TYPES), args.events)]
+    timestamps = (now - rng.uniform(0, 86400, args.events)).tolist()
+    ips = [f"10.{i // 256 % 256}.{i % 256}.1" for i in rng.integers(0, 50, args.events)]
+    amounts = rng.uniform(10, 5000, args.events).tolist()
+
+    events = list(zip(user_ids, types, timestamps, ips, amounts))
+    store = ActivityFeatureStore(n_buckets=args.buckets, max_users=args.users)
+    start = time.perf_counter()
+    for event in events:
+        store.add(*event)
+    seconds = time.perf_counter() - start
+
+    # Memory is measured on a second pass; tracemalloc slows ingestion down
+    tracemalloc.start()
+    measured = ActivityFeatureStore(n_buckets=args.buckets, max_users=args.users)
+    for event in events:
+        measured.add(*event)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for user_id in range(min(args.users, 5000)):
+        store.features(user_id, now)
+    read_us = (time.perf_counter() - start) / min(args.users, 5000) * 1e6
+
+    print(f"{'events/s':>12}{'read us':>10}{'bytes/user':>12}{'users':>10}")
+    print(f"{args.events / seconds:>12.0f}{read_us:>10.1f}{memory / len(store._users):>12.0f}{len(store._users):>10}")
+
+    print(f"{'distinct ips':>14}{'estimate':>10}{'error':>8}")
+    for n in [1, 2, 5, 10, 50, 200, 1000]:
+        errors = []
+        for trial in range(50):
+            probe = ActivityFeatureStore(n_buckets=args.buckets)
+            for i in range(n):
+                probe.add(0, "login", now, ip_address=f"{trial}.{i}")
+            errors.append(probe.features(0, now)["ip_address_count"] - n)
+        print(f"{n:>14}{n + np.mean(errors):>10.1f}{np.mean(np.abs(errors)) / n:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
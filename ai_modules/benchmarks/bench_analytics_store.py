@@ -0,0 +1,91 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from analytics_store import AnalyticsStore, DAY
+
+# Summary queries over years of synthetic hourly activity: recomputing from
+# the raw events with pandas (filter, resample to days, aggregate) against
+# the rollups (prefix-sum totals and series). Also times bulk ingestion, and
+# a live batch at the newest hour followed by a query, which pays for the
+# lazy prefix rebuild of the tail.
+#
+#   python benchmarks/bench_analytics_store.py --years 5 --events-per-hour 50
+
+
+def timed(fn, repeats):
+    fn()
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.percentile(latencies, [50, 95])
+
+
+def pandas_summary(events, start, end):
+    window = events[(events.index >= start) & (events.index < end)]
+    daily = window["value"].resample("D").sum()
+    return daily.sum(), daily.mean(), daily.max(), daily.min()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--events-per-hour", type=float, default=50)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    end = 1_767_225_600  # 2026-01-01
+    start = end - int(args.years * 365) * DAY
+    hours = (end - start) // 3600
+    counts = rng.poisson(args.events_per_hour, hours)
+    timestamps = np.repeat(start + 3600 * np.arange(hours), counts) + rng.integers(0, 3600, counts.sum())
+    amounts = rng.gamma(2.0, 500.0, len(timestamps))
+    events = pd.DataFrame({"value": amounts}, index=pd.to_datetime(timestamps, unit="s")).sort_index()
+
+    store = AnalyticsStore(["total_earnings"])
+    ingest = time.perf_counter()
+    for chunk in range(0, len(timestamps), 1_000_000):
+        store.add("total_earnings", timestamps[chunk:chunk + 1_000_000], amounts[chunk:chunk + 1_000_000])
+    ingest_s = time.perf_counter() - ingest
+    store.total("total_earnings", start, end)
+    print(f"{len(timestamps)} events over {args.years:g} years; ingested in {ingest_s:.2f} s "
+          f"({len(timestamps) / ingest_s / 1e6:.1f} M events/s), rollups {store.stats()['bytes'] / 1e6:.1f} MB")
+
+    ranges = [("last 30 days", end - 30 * DAY, end), ("last year", end - 365 * DAY, end), ("all", start, end)]
+    print(f"{'query':<34}{'p50 ms':>10}{'p95 ms':>10}")
+    for label, range_start, range_end in ranges:
+        first, last = pd.to_datetime(range_start, unit="s"), pd.to_datetime(range_end, unit="s")
+        reference = pandas_summary(events, first, last)
+        summary = store.summary("total_earnings", range_start, range_end)
+        assert np.isclose(summary["total"], reference[0]) and np.isclose(summary["max"], reference[2])
+        rows = [
+            (f"pandas recompute, {label}", lambda: pandas_summary(events, first, last)),
+            (f"rollup summary, {label}", lambda: store.summary("total_earnings", range_start, range_end)),
+            (f"rollup total, {label}", lambda: store.total("total_earnings", range_start, range_end)),
+        ]
+        for row_label, fn in rows:
+            p50, p95 = timed(fn, args.repeats)
+            print(f"{row_label:<34}{p50:>10.3f}{p95:>10.3f}")
+    for granularity in ("hour", "week", "month"):
+        p50, p95 = timed(lambda: store.series("total_earnings", start, end - 1800, granularity), args.repeats)
+        print(f"{f'rollup series by {granularity}, all':<34}{p50:>10.3f}{p95:>10.3f}")
+
+    # A live batch lands in the newest hour; the next query rebuilds only the tail
+    def live_batch():
+        store.add("total_earnings", end - 1 - rng.integers(0, 3600, 100), 1.0)
+        store.summary("total_earnings", end - 30 * DAY, end)
+
+    p50, p95 = timed(live_batch, args.repeats)
+    print(f"{'100 live events + summary':<34}{p50:>10.3f}{p95:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
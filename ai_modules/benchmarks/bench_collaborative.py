@@ -0,0 +1,76 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from collaborative import CollaborativeModel
+
+# Per-request collaborative scoring cost as the user base grows: the old
+# per-request Jaccard scan over every user versus a lookup in the
+# precomputed item-item model.
+#
+#   python benchmarks/bench_collaborative.py --users 1000 10000 100000 1000000
+
+
+def synthetic_histories(n_users, n_projects, rng):
+    # Skewed popularity: a few projects attract most of the interactions
+    lengths = rng.integers(3, 20, n_users)
+    popularity = rng.zipf(1.3, lengths.sum()) % n_projects + 1
+    return np.split(popularity, np.cumsum(lengths)[:-1])
+
+
+def scan_scores(history, histories, n_projects):
+    # The per-request loop recommend_projects used before the offline model
+    scores = np.zeros(n_projects)
+    user_history = set(history)
+    for other in histories:
+        other_history = set(other.tolist())
+        overlap = len(user_history & other_history)
+        if overlap > 0:
+            similarity = overlap / len(user_history | other_history)
+            for project in other_history - user_history:
+                scores[project - 1] += similarity
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--projects", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--candidates", type=int, default=200)
+    parser.add_argument("--scan-limit", type=int, default=100000,
+                        help="skip the per-request scan above this many users")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'users':>10}{'build s':>10}{'model ms/req':>14}{'scan ms/req':>14}")
+    for n_users in args.users:
+        histories = synthetic_histories(n_users, args.projects, rng)
+        start = time.perf_counter()
+        model = CollaborativeModel(histories)
+        build_seconds = time.perf_counter() - start
+
+        requests = [histories[i] for i in rng.integers(0, n_users, args.requests)]
+        candidates = rng.integers(1, args.projects + 1, (args.requests, args.candidates))
+        start = time.perf_counter()
+        for history, candidate_ids in zip(requests, candidates):
+            model.score(history, candidate_ids)
+        model_ms = (time.perf_counter() - start) / args.requests * 1000
+
+        scan_ms = float("nan")
+        if n_users <= args.scan_limit:
+            sample = requests[:max(1, args.requests // 20)]
+            start = time.perf_counter()
+            for history in sample:
+                scan_scores(history, histories, args.projects)
+            scan_ms = (time.perf_counter() - start) / len(sample) * 1000
+
+        print(f"{n_users:>10}{build_seconds:>10.2f}{model_ms:>14.3f}{scan_ms:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from embedding_store import QuantizedEmbeddings, load_store, normalize, save_store
+
+# Memory per worker and ranking-quality delta of the quantised embedding
+# store against the float32 matrices each worker used to hold privately.
+# Each format is loaded in a fresh process, the way a uvicorn worker would.
+#
+#   python benchmarks/bench_embedding_store.py --rows 200000
+
+
+def proc_status_kb(field):
+    # Linux only: private anonymous memory vs. shared file-backed pages
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def worker(directory, fmt, queries, results):
+    anon_before = proc_status_kb("RssAnon")
+    if fmt == "float32":
+        # Old behaviour: every worker holds its own float32 matrix
+        store = QuantizedEmbeddings(np.load(os.path.join(directory, "float32.npy")))
+    else:
+        store = load_store(directory, fmt)
+
+    start = time.perf_counter()
+    top = [np.argsort(-store.dot(q))[:10] for q in queries]
+    scan_ms = (time.perf_counter() - start) / len(queries) * 1000
+    results.put((fmt, proc_status_kb("RssAnon") - anon_before, proc_status_kb("RssFile"), scan_ms, top,
+                 store.dot(queries[0])))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centres = normalize(rng.standard_normal((200, args.dim)))
+    vectors = normalize(centres[rng.integers(0, 200, args.rows)]
+                        + 0.8 * rng.standard_normal((args.rows, args.dim)) / np.sqrt(args.dim))
+    queries = normalize(centres[rng.integers(0, 200, args.queries)]
+                        + 0.8 * rng.standard_normal((args.queries, args.dim)) / np.sqrt(args.dim))
+    texts = [str(i) for i in range(args.rows)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        np.save(os.path.join(directory, "float32.npy"), vectors)
+        for fmt in ("float16", "int8"):
+            save_store(directory, fmt, vectors, "benchmark", texts, fmt)
+
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        rows = {}
+        for fmt in ("float32", "float16", "int8"):
+            process = context.Process(target=worker, args=(directory, fmt, queries, results))
+            process.start()
+            result = results.get()
+            process.join()
+            rows[fmt] = result
+
+    exact_top, exact_scores = rows["float32"][4], rows["float32"][5]
+    print(f"{args.rows} rows x {args.dim} dims")
+    print(f"{'format':<10}{'private MB':>12}{'shared MB':>11}{'scan ms':>10}{'recall@10':>11}{'max |dscore|':>14}")
+    for fmt in ("float32", "float16", "int8"):
+        _, anon_kb, file_kb, scan_ms, top, scores = rows[fmt]
+        recall = np.mean([len(np.intersect1d(a, e)) / 10 for a, e in zip(top, exact_top)])
+        print(f"{fmt:<10}{anon_kb / 1024:>12.1f}{file_kb / 1024:>11.1f}{scan_ms:>10.2f}"
+              f"{recall:>11.3f}{np.abs(scores - exact_scores).max():>14.5f}")
+
+
+if __name__ == "__main__":
+    main()
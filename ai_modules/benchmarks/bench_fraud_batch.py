@@ -0,0 +1,64 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import fraud_detector
+from fraud_detector import UserActivityRequest, detect_fraud_many
+
+# Throughput of fraud scoring: one detect_fraud_many call per record (what
+# /detect-fraud does per HTTP request) versus one call per chunk of records
+# (/detect-fraud/batch, /detect-fraud/stream and the score CLI).
+#
+#   python benchmarks/bench_fraud_batch.py --records 20000
+
+
+def random_activities(n, rng):
+    fraud = rng.random(n) < 0.1
+    return [
+        UserActivityRequest(
+            user_id=i,
+            logins_per_day=float(rng.poisson(10 if f else 3)),
+            bids_per_day=float(rng.poisson(20 if f else 5)),
+            bid_to_project_ratio=float(rng.normal(0.8 if f else 0.3, 0.1)),
+            payment_amount=float(rng.normal(15000 if f else 5000, 1000)),
+            login_time_variance=float(rng.normal(12 if f else 3, 1)),
+            ip_address_count=int(rng.poisson(8 if f else 2)),
+            failed_login_attempts=int(rng.poisson(5 if f else 0.5)),
+        )
+        for i, f in enumerate(fraud)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--single-records", type=int, default=1000,
+                        help="records scored one at a time (extrapolated to --records)")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[500, 2000, 10000])
+    args = parser.parse_args()
+
+    fraud_detector.warmup.load_all()
+    activities = random_activities(args.records, np.random.default_rng(0))
+
+    start = time.perf_counter()
+    for activity in activities[:args.single_records]:
+        detect_fraud_many([activity])
+    per_record = (time.perf_counter() - start) / args.single_records
+    print(f"{'mode':<22}{'records/s':>12}{'us/record':>12}")
+    print(f"{'one per call':<22}{1 / per_record:>12.0f}{per_record * 1e6:>12.1f}")
+
+    for chunk_size in args.chunk_sizes:
+        start = time.perf_counter()
+        for offset in range(0, len(activities), chunk_size):
+            detect_fraud_many(activities[offset:offset + chunk_size])
+        elapsed = time.perf_counter() - start
+        label = f"chunks of {chunk_size}"
+        print(f"{label:<22}{len(activities) / elapsed:>12.0f}{elapsed / len(activities) * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
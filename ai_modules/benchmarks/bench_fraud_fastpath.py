@@ -0,0 +1,74 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fraud_fastpath import CompiledFraudEnsemble, parity_error, parity_probe
+from fraud_model import FAST_PATH_TOLERANCE, synthetic_training_data, train_bundle
+
+# Parity and latency of the flat-array fraud ensemble against sklearn.
+# Parity is checked on the training data, the probe set, and forests trained
+# with feature subsampling and other seeds, so changes in sklearn's tree
+# layout or scoring show up here. Exits non-zero if any check drifts.
+#
+#   python benchmarks/bench_fraud_fastpath.py --batch-sizes 1 100 10000
+
+
+def median_us(fn, repeats):
+    fn()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return np.median(timings) * 1e6
+
+
+def check_parity():
+    from sklearn.ensemble import IsolationForest
+    X, y = synthetic_training_data()
+    failures = 0
+    cases = [("default", {}), ("max_features=0.5", {"max_features": 0.5}),
+             ("bootstrap", {"bootstrap": True, "random_state": 7}), ("max_samples=64", {"max_samples": 64})]
+    for label, params in cases:
+        bundle = train_bundle(X, y)
+        if params:
+            params.setdefault("random_state", 42)
+            bundle.isolation_forest = IsolationForest(contamination=0.1, **params).fit(bundle.scaler.transform(X))
+        compiled = CompiledFraudEnsemble(bundle.scaler, bundle.isolation_forest, bundle.logistic_regression)
+        rng = np.random.default_rng(1)
+        for data_label, features in [("training", X), ("probe", parity_probe(bundle.scaler, 4096, seed=3)),
+                                     ("extreme", X * rng.uniform(-20, 20, X.shape))]:
+            error = parity_error(compiled, bundle.sklearn_score, features)
+            ok = error <= FAST_PATH_TOLERANCE
+            failures += not ok
+            print(f"parity {label:<18}{data_label:<10}max |error| {error:.3g} {'ok' if ok else 'DRIFT'}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    failures = check_parity()
+
+    bundle = train_bundle(*synthetic_training_data())
+    features = parity_probe(bundle.scaler, max(args.batch_sizes), seed=5)
+    print(f"{'rows':>8}{'sklearn us':>14}{'fast path us':>14}{'speed-up':>10}")
+    for n in args.batch_sizes:
+        repeats = max(3, args.repeats // max(1, n // 100))
+        sklearn_us = median_us(lambda: bundle.sklearn_score(features[:n]), repeats)
+        fast_us = median_us(lambda: bundle.compiled.score(features[:n]), repeats)
+        print(f"{n:>8}{sklearn_us:>14.1f}{fast_us:>14.1f}{sklearn_us / fast_us:>9.0f}x")
+
+    if failures:
+        sys.exit(f"{failures} parity checks drifted beyond {FAST_PATH_TOLERANCE}")
+
+
+if __name__ == "__main__":
+    main()
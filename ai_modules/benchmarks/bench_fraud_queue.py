@@ -0,0 +1,58 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fraud_model import synthetic_training_data, train_bundle
+from fraud_queue import QueueFull, ScoringQueue
+
+# Payment-lane latency of the queued fraud scorer while a bulk re-scoring
+# burst is in the queue, against the same payments with no burst.
+#
+#   python benchmarks/bench_fraud_queue.py --rescore-jobs 20000 --payments 500
+
+
+def run(bundle, features, rescore_jobs, payments, workers, batch_size):
+    queue = ScoringQueue(lambda rows: bundle.score(np.array(rows))[0].tolist(), max_depth=len(features),
+                         workers=workers, max_batch_size=batch_size)
+    rejected = 0
+    for i in range(rescore_jobs):
+        try:
+            queue.submit(features[i % len(features)], "rescore")
+        except QueueFull:
+            rejected += 1
+    jobs = []
+    for i in range(payments):
+        jobs.append(queue.submit(features[i], "payment"))
+        time.sleep(0.0005)
+    while queue.depth() or any(job.finished_at is None for job in jobs):
+        time.sleep(0.005)
+    latencies = np.array([job.finished_at - job.submitted_at for job in jobs]) * 1000
+    stats = queue.stats()
+    queue.stop()
+    return np.percentile(latencies, 50), np.percentile(latencies, 99), stats["avg_batch_size"], rejected
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rescore-jobs", type=int, default=20000)
+    parser.add_argument("--payments", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    X, y = synthetic_training_data()
+    bundle = train_bundle(X, y)
+    features = [row for row in X] * (args.rescore_jobs // len(X) + 1)
+
+    print(f"{'rescore burst':>14}{'payment p50 ms':>16}{'payment p99 ms':>16}{'avg batch':>11}{'rejected':>10}")
+    for burst in [0, args.rescore_jobs]:
+        p50, p99, avg_batch, rejected = run(bundle, features, burst, args.payments, args.workers, args.batch_size)
+        print(f"{burst:>14}{p50:>16.2f}{p99:>16.2f}{avg_batch:>11.1f}{rejected:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from image_cache import ImageResultCache, hamming
+
+# Near-duplicate lookup latency of the image result cache (multi-index
+# hashing) against a linear Hamming scan, with recall of perturbed hashes.
+#
+#   python benchmarks/bench_image_cache.py --entries 20000 --max-distance 6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--max-distance", type=int, default=6)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    hashes = [int(h) for h in rng.integers(0, 2 ** 63, args.entries, dtype=np.int64)]
+    cache = ImageResultCache(max_entries=args.entries, max_distance=args.max_distance)
+    for i, image_hash in enumerate(hashes):
+        cache.put(f"{i}", image_hash, np.zeros(8, dtype=np.float32))
+
+    # Queries are stored hashes with up to max_distance random bits flipped
+    queries = []
+    for i in rng.integers(0, args.entries, args.queries):
+        flips = rng.choice(64, rng.integers(0, args.max_distance + 1), replace=False)
+        queries.append(hashes[i] ^ sum(1 << int(bit) for bit in flips))
+
+    start = time.perf_counter()
+    found = sum(cache.get_near(query) is not None for query in queries)
+    index_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+    start = time.perf_counter()
+    for query in queries[:200]:
+        min(hamming(query, image_hash) for image_hash in hashes)
+    scan_us = (time.perf_counter() - start) / min(200, len(queries)) * 1e6
+
+    print(f"{'entries':>9}{'index us':>10}{'scan us':>10}{'recall':>8}")
+    print(f"{args.entries:>9}{index_us:>10.1f}{scan_us:>10.1f}{found / len(queries):>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from attribute_table import AttributeTable
+from embedding_store import QuantizedEmbeddings, normalize, quantize
+from mentor_matcher import MenteeProfile, match_page
+from mentor_store import MentorStore
+from ranking import rank
+
+# Per-request mentor scoring on a synthetic catalogue. The baseline is the
+# original handler: a Python loop for the experience score, DataFrame .iloc
+# per returned mentor, and one skills, industry and bio vector per mentor.
+# It is compared with match_page over the columnar MentorStore, which uses
+# the skill and industry tables. Mentee embeddings are fixed vectors, so
+# encoding is not part of the timing. The two paths score skills
+# differently (joined vector vs per-skill max-sim), so rankings differ. At
+# 384 dimensions the per-mentor vector scans dominate the baseline; a small
+# --dim isolates the filter, score and response work.
+#
+#   python benchmarks/bench_mentor_store.py --mentors 50000 --limit 50
+#   python benchmarks/bench_mentor_store.py --mentors 50000 --dim 8
+
+SKILLS = ["Python", "Machine Learning", "Data Science", "JavaScript", "React", "Node.js", "UX Design",
+          "Product Management", "Cloud Architecture", "DevOps", "Java", "SQL", "Leadership", "Marketing"]
+INDUSTRIES = ["Technology", "Finance", "Healthcare", "Education", "E-commerce", "Design", "Media"]
+
+
+def synthetic_mentors(n, rng) -> pd.DataFrame:
+    return pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "name": [f"Mentor {i}" for i in range(n)],
+        "skills": [list(rng.choice(SKILLS, size=int(rng.integers(2, 7)), replace=False)) for _ in range(n)],
+        "industry": list(rng.choice(INDUSTRIES, size=n)),
+        "experience_years": rng.integers(1, 25, n),
+        "hourly_rate": rng.integers(30, 200, n),
+        "availability_hours_per_week": rng.integers(1, 20, n),
+        "rating": np.round(rng.uniform(3.5, 5.0, n), 1),
+        "mentees_count": rng.integers(0, 40, n),
+        "bio": [f"Mentor {i} bio" for i in range(n)],
+    })
+
+
+def old_match(mentors, embeddings, profile, mentee_embeddings):
+    # The pre-MentorStore handler body, minus encoding
+    mentor_skill_embeddings, mentor_industry_embeddings, mentor_bio_embeddings = embeddings
+    mentee_skills_embedding, mentee_industry_embedding, mentee_goals_embedding = mentee_embeddings
+    experience_years = profile.experience_years
+    budget_filter = ((mentors['hourly_rate'] >= profile.budget_range["min"])
+                     & (mentors['hourly_rate'] <= profile.budget_range["max"]))
+    availability_filter = mentors['availability_hours_per_week'] >= profile.availability["hours_per_week"]
+    eligible = (budget_filter & availability_filter).to_numpy()
+    weights = {'skills': 0.4, 'industry': 0.2, 'goals_bio': 0.2, 'experience': 0.1, 'rating': 0.1}
+
+    def score_mentors(rows):
+        experience_scores = np.zeros(len(rows))
+        for i, mentor_exp in enumerate(mentors['experience_years'].to_numpy()[rows]):
+            if mentor_exp > experience_years:
+                exp_diff = mentor_exp - experience_years
+                if exp_diff <= 10:
+                    experience_scores[i] = 1.0 - (exp_diff - 3) / 7 if exp_diff >= 3 else 1.0 - (3 - exp_diff) / 3
+                else:
+                    experience_scores[i] = 0.5
+            else:
+                experience_scores[i] = 0.2
+        return (
+            weights['skills'] * mentor_skill_embeddings.cosine(mentee_skills_embedding, rows) +
+            weights['industry'] * mentor_industry_embeddings.cosine(mentee_industry_embedding, rows) +
+            weights['goals_bio'] * mentor_bio_embeddings.cosine(mentee_goals_embedding, rows) +
+            weights['experience'] * experience_scores +
+            weights['rating'] * (mentors['rating'].to_numpy()[rows] - 3.5) / 1.5
+        )
+
+    top_indices, top_scores = rank(score_mentors, eligible, len(mentors), profile.limit, profile.offset)
+    match_reasons = []
+    for idx in top_indices:
+        mentor = mentors.iloc[idx]
+        reasons = []
+        matching_skills = set(profile.skills_to_learn).intersection(set(mentor['skills']))
+        if matching_skills:
+            reasons.append(f"Skills match: {', '.join(list(matching_skills)[:3])}")
+            if len(matching_skills) > 3:
+                reasons[-1] += f" and {len(matching_skills) - 3} more"
+        if mentor['industry'] == profile.industry:
+            reasons.append(f"Same industry: {profile.industry}")
+        reasons.append(f"{mentor['experience_years']} years of experience")
+        if mentor['rating'] >= 4.5:
+            reasons.append(f"Highly rated: {mentor['rating']:.1f}/5.0")
+        match_reasons.append(", ".join(reasons))
+    mentors_list = []
+    for i, idx in enumerate(top_indices):
+        mentor = mentors.iloc[idx]
+        mentors_list.append({
+            "id": int(mentor['id']), "name": mentor['name'], "skills": mentor['skills'],
+            "industry": mentor['industry'], "experience_years": int(mentor['experience_years']),
+            "hourly_rate": int(mentor['hourly_rate']),
+            "availability_hours_per_week": int(mentor['availability_hours_per_week']),
+            "rating": float(mentor['rating']), "mentees_count": int(mentor['mentees_count']),
+            "bio": mentor['bio'], "match_score": float(top_scores[i]),
+        })
+    return {"mentee_id": profile.user_id, "mentors": mentors_list,
+            "match_scores": top_scores.tolist(), "match_reasons": match_reasons}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mentors", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--dtype", default="float16", choices=["float16", "int8"])
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    mentors = synthetic_mentors(args.mentors, rng)
+    bio_embeddings = QuantizedEmbeddings(
+        *quantize(rng.standard_normal((args.mentors, args.dim), dtype=np.float32), args.dtype)
+    )
+    start = time.perf_counter()
+    store = MentorStore.from_frame(mentors)
+    build_ms = (time.perf_counter() - start) * 1000
+    # The old handler compares one skills vector (standing in for the joined
+    # skills text) and one industry vector per mentor; match_page works from
+    # the skill codes and the two tables
+    skill_table = AttributeTable(store.skill_names,
+                                 rng.standard_normal((len(store.skill_names), args.dim), dtype=np.float32))
+    industry_table = AttributeTable(store.industry_names,
+                                    rng.standard_normal((len(store.industry_names), args.dim), dtype=np.float32))
+    skill_embeddings = QuantizedEmbeddings(*quantize(
+        np.stack([skill_table.vectors[skill_table.codes(skills)].mean(axis=0) for skills in store.skills]),
+        args.dtype
+    ))
+    industry_embeddings = QuantizedEmbeddings(*quantize(industry_table.vectors[store.industry_codes], args.dtype))
+    old_embeddings = (skill_embeddings, industry_embeddings, bio_embeddings)
+    new_embeddings = (skill_table, industry_table, bio_embeddings)
+
+    profiles = [
+        MenteeProfile(
+            user_id=i, skills_to_learn=list(rng.choice(SKILLS, size=3, replace=False)),
+            industry=str(rng.choice(INDUSTRIES)), experience_years=int(rng.integers(0, 10)),
+            goals=["grow"], budget_range={"min": 40, "max": 180}, availability={"hours_per_week": 3},
+            limit=args.limit,
+        )
+        for i in range(args.requests)
+    ]
+    old_queries, new_queries = [], []
+    for profile in profiles:
+        goals = normalize(rng.standard_normal(args.dim, dtype=np.float32))[0]
+        skills = skill_table.codes(profile.skills_to_learn)
+        industry = industry_table.code(profile.industry)
+        old_queries.append((skill_table.vectors[skills].mean(axis=0), industry_table.vectors[industry], goals))
+        new_queries.append((np.full(len(skills), 1.0 / len(skills), dtype=np.float32), skill_table.similarity[skills],
+                            industry_table.similarity[industry], goals))
+
+    print(f"{args.mentors} mentors, {args.dtype} embeddings, limit {args.limit}; store built in {build_ms:.0f} ms")
+    print(f"{'path':<14}{'p50 ms':>10}{'p95 ms':>10}")
+    baseline = None
+    for label, fn, data, embeddings, queries in [
+        ("dataframe", old_match, mentors, old_embeddings, old_queries),
+        ("mentor store", match_page, store, new_embeddings, new_queries),
+    ]:
+        fn(data, embeddings, profiles[0], queries[0])
+        latencies = []
+        for profile, query in zip(profiles, queries):
+            start = time.perf_counter()
+            fn(data, embeddings, profile, query)
+            latencies.append((time.perf_counter() - start) * 1000)
+        p50, p95 = np.percentile(latencies, [50, 95])
+        baseline = baseline or p50
+        print(f"{label:<14}{p50:>10.2f}{p95:>10.2f}  ({baseline / p50:.1f}x)")
+
+    print(f"skills term: {skill_embeddings.nbytes / 1e6:.1f} MB per-mentor vectors, "
+          f"{(store.skill_codes.nbytes + skill_table.nbytes) / 1e6:.1f} MB codes and table")
+    print(f"industry term: {industry_embeddings.nbytes / 1e6:.1f} MB per-mentor vectors, "
+          f"{industry_table.nbytes / 1e3:.1f} KB table")
+
+
+if __name__ == "__main__":
+    main()
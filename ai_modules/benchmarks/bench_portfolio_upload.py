@@ -0,0 +1,85 @@
+import argparse
+import base64
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import skill_verification
+
+# Per-image cost of getting a portfolio photo to a ResNet50 input: the
+# base64-in-JSON path (JSON string -> bytes -> full decode -> resize) against
+# the multipart path (spooled file -> draft-mode JPEG decode -> resize).
+# Reports peak traced memory per image and images/sec with 1 and N decode
+# threads. The model itself is not run.
+#
+#   python benchmarks/bench_portfolio_upload.py --width 4000 --height 3000 --threads 4
+
+
+def make_jpeg(width, height, seed):
+    small = np.random.default_rng(seed).integers(0, 255, (24, 32, 3), dtype=np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(small).resize((width, height), Image.BILINEAR).save(buf, "JPEG", quality=90)
+    return buf.getvalue()
+
+
+def via_json(payload):
+    image_data = json.loads(payload)["image_data"]
+    return skill_verification.prepare_image(skill_verification.open_base64(image_data), 0)
+
+
+def via_file(path):
+    with open(path, "rb") as source:
+        return skill_verification.prepare_image(source, 0, draft=True)
+
+
+def measure(fn, items, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(fn, items))
+    return len(items) / (time.perf_counter() - start)
+
+
+def peak_bytes(fn, item):
+    tracemalloc.start()
+    fn(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--images", type=int, default=24)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    jpegs = [make_jpeg(args.width, args.height, seed) for seed in range(args.images)]
+    payloads = [json.dumps({"image_data": base64.b64encode(jpeg).decode("ascii")}) for jpeg in jpegs]
+    directory = tempfile.mkdtemp()
+    paths = []
+    for i, jpeg in enumerate(jpegs):
+        paths.append(os.path.join(directory, f"{i}.jpg"))
+        with open(paths[-1], "wb") as f:
+            f.write(jpeg)
+    via_file(paths[0])
+
+    print(f"{args.width}x{args.height} JPEG, {np.mean([len(j) for j in jpegs]) / 1e6:.1f} MB")
+    print(f"{'path':<22}{'peak MB/image':>15}{'img/s x1':>10}{f'img/s x{args.threads}':>11}")
+    for label, fn, items in [("base64 JSON", via_json, payloads), ("multipart + draft", via_file, paths)]:
+        peak = peak_bytes(fn, items[0]) / 1e6
+        print(f"{label:<22}{peak:>15.1f}{measure(fn, items, 1):>10.1f}{measure(fn, items, args.threads):>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from quiz_store import QuizStore
+
+# Quiz serving and grading on a synthetic item bank: rebuilding the
+# answer-free quiz and the answer list per request (the old handlers)
+# against the store's pre-serialised quizzes and vectorised batch grading.
+#
+#   python benchmarks/bench_quiz_store.py --categories 2000 --questions 200 --submissions 10000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--categories", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--submissions", type=int, default=10000)
+    parser.add_argument("--sample", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    banks = {
+        f"skill_{k}": [{"question": f"Question {k}-{i}?", "options": ["A", "B", "C", "D"],
+                        "answer": int(rng.integers(4))} for i in range(args.questions)]
+        for k in range(args.categories)
+    }
+    start = time.perf_counter()
+    store = QuizStore(banks)
+    load_s = time.perf_counter() - start
+    category = "skill_0"
+    bank = store.get(category)
+    answers = rng.integers(0, 4, (args.submissions, args.questions)).tolist()
+
+    def old_serve():
+        return json.dumps({"skill_category": category, "questions": [
+            {"question": q["question"], "options": q["options"]} for q in banks[category]]})
+
+    def old_grade(row):
+        correct_answers = [q["answer"] for q in banks[category]]
+        return sum(1 for ua, ca in zip(row, correct_answers) if ua == ca) / len(correct_answers)
+
+    print(f"built {args.categories} banks of {args.questions} questions in {load_s:.2f}s")
+    print(f"{'operation':<32}{'old us':>12}{'store us':>12}")
+    for label, old, new, n in [
+        ("serve full quiz", old_serve, lambda: bank.quiz_json(), 2000),
+        (f"serve {args.sample}-question sample", old_serve, lambda: bank.quiz_json(12345, args.sample), 2000),
+    ]:
+        t = time.perf_counter(); [old() for _ in range(n)]; old_us = (time.perf_counter() - t) / n * 1e6
+        t = time.perf_counter(); [new() for _ in range(n)]; new_us = (time.perf_counter() - t) / n * 1e6
+        print(f"{label:<32}{old_us:>12.1f}{new_us:>12.1f}")
+
+    t = time.perf_counter(); [old_grade(row) for row in answers]
+    old_us = (time.perf_counter() - t) / len(answers) * 1e6
+    t = time.perf_counter(); bank.grade(answers)
+    new_us = (time.perf_counter() - t) / len(answers) * 1e6
+    print(f"{'grade (per submission)':<32}{old_us:>12.1f}{new_us:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
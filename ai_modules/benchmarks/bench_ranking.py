@@ -0,0 +1,62 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ranking import rank, top_k
+
+# Micro-benchmark of the ranking path: full argsort versus argpartition top-K,
+# and scoring every candidate then filtering versus masking before scoring.
+#
+#   python benchmarks/bench_ranking.py --sizes 10000 100000 1000000
+
+
+def best_of(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--dim", type=int, default=32)
+    parser.add_argument("--eligible", type=float, default=0.2,
+                        help="fraction of candidates passing the filters")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'candidates':>12}{'argsort ms':>12}{'top_k ms':>10}{'score+filter ms':>17}{'mask+score ms':>15}")
+    for n in args.sizes:
+        scores = rng.random(n).astype(np.float32)
+        vectors = rng.standard_normal((n, args.dim)).astype(np.float32)
+        query = rng.standard_normal(args.dim).astype(np.float32)
+        mask = rng.random(n) < args.eligible
+
+        argsort_ms = best_of(lambda: np.argsort(scores)[::-1][:args.k], args.repeats)
+        top_k_ms = best_of(lambda: top_k(scores, args.k), args.repeats)
+
+        def score_then_filter():
+            all_scores = vectors @ query
+            all_scores = np.where(mask, all_scores, 0)
+            return np.argsort(all_scores)[::-1][:args.k]
+
+        def mask_then_score():
+            return rank(lambda rows: vectors[rows] @ query, mask, n, args.k)
+
+        assert set(score_then_filter()) == set(mask_then_score()[0])
+        print(f"{n:>12}{argsort_ms:>12.3f}{top_k_ms:>10.3f}"
+              f"{best_of(score_then_filter, args.repeats):>17.3f}"
+              f"{best_of(mask_then_score, args.repeats):>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
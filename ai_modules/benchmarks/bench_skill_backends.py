@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from skill_model import BACKENDS, IMAGE_SIZE, load_backend
+
+# Latency and memory of each skill-model backend on CPU. Every backend runs
+# in its own process so resident memory is not shared between them. Export
+# the graphs first with skill_model.py; missing backends are skipped.
+#
+#   python benchmarks/bench_skill_backends.py --backends keras savedmodel tflite-int8 onnx
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def worker(name, model_dir, batch_sizes, repeats):
+    import tensorflow  # baseline includes the framework itself
+    baseline = rss_mb()
+    start = time.perf_counter()
+    backend = load_backend(name, model_dir)
+    load_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    result = {"backend": name, "load_seconds": load_seconds, "latency_ms": {}, "images_per_second": {}}
+    for batch_size in batch_sizes:
+        batch = rng.uniform(-120, 150, (batch_size, IMAGE_SIZE, IMAGE_SIZE, 3)).astype(np.float32)
+        backend(batch)
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            backend(batch)
+            timings.append(time.perf_counter() - start)
+        result["latency_ms"][batch_size] = float(np.median(timings) * 1000)
+        result["images_per_second"][batch_size] = batch_size / float(np.median(timings))
+    result["rss_mb"] = rss_mb() - baseline
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--model-dir", default=os.environ.get(
+        "SKILL_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "skill_models")))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.model_dir, args.batch_sizes, args.repeats)
+        return
+
+    header = f"{'backend':<14}{'load s':>8}{'RSS MB':>9}"
+    for batch_size in args.batch_sizes:
+        header += f"{f'b={batch_size} ms':>11}{f'b={batch_size} img/s':>13}"
+    print(header)
+    for name in args.backends:
+        command = [sys.executable, os.path.abspath(__file__), "--worker", name, "--model-dir", args.model_dir,
+                   "--repeats", str(args.repeats), "--batch-sizes", *map(str, args.batch_sizes)]
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(f"{name:<14}skipped: {completed.stderr.strip().splitlines()[-1] if completed.stderr else 'failed'}")
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        line = f"{name:<14}{result['load_seconds']:>8.2f}{result['rss_mb']:>9.0f}"
+        for batch_size in args.batch_sizes:
+            line += f"{result['latency_ms'][str(batch_size)]:>11.1f}{result['images_per_second'][str(batch_size)]:>13.1f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from attribute_table import AttributeTable, max_similarity
+from embedding_store import QuantizedEmbeddings, quantize
+from mentor_store import MentorStore
+
+# Per-request cost of the mentor skills term: the old single vector per
+# mentor (cosine over float16 rows) against per-skill late interaction
+# (max_similarity over padded skill codes) for mentees asking for 1 to 10
+# skills. Also times adding new skills to the vocabulary and one mentor.
+#
+#   python benchmarks/bench_skill_maxsim.py --mentors 100000 --vocabulary 2000
+
+
+def timed(fn, repeats):
+    fn()
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.percentile(latencies, [50, 95])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mentors", type=int, default=100000)
+    parser.add_argument("--vocabulary", type=int, default=2000)
+    parser.add_argument("--max-skills", type=int, default=8)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--eligible", type=float, default=0.6, help="fraction of mentors passing the filters")
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    names = [f"skill {i}" for i in range(args.vocabulary)]
+    skills = [list(rng.choice(names, size=int(rng.integers(2, args.max_skills + 1)), replace=False))
+              for _ in range(args.mentors)]
+    zeros = np.zeros(args.mentors, dtype=np.int64)
+    store = MentorStore({"id": np.arange(args.mentors), "name": names[:1] * args.mentors, "skills": skills,
+                         "industry": ["Technology"] * args.mentors, "experience_years": zeros, "hourly_rate": zeros,
+                         "availability_hours_per_week": zeros, "rating": zeros, "mentees_count": zeros,
+                         "bio": [""] * args.mentors})
+    table = AttributeTable(store.skill_names, rng.standard_normal((len(store.skill_names), args.dim),
+                                                                  dtype=np.float32))
+    # One vector per mentor, as the joined skills text used to be encoded
+    joined = QuantizedEmbeddings(*quantize(
+        np.stack([table.vectors[table.codes(mentor_skills)].mean(axis=0) for mentor_skills in skills]), "float16"
+    ))
+    rows = np.flatnonzero(rng.random(args.mentors) < args.eligible)
+    query = rng.standard_normal(args.dim, dtype=np.float32)
+
+    print(f"{args.mentors} mentors ({len(rows)} eligible), {len(table)} skills, "
+          f"up to {store.skill_codes.shape[1]} per mentor")
+    print(f"{'skills term':<26}{'p50 ms':>10}{'p95 ms':>10}")
+    p50, p95 = timed(lambda: joined.cosine(query, rows), args.repeats)
+    print(f"{'joined vector (old)':<26}{p50:>10.2f}{p95:>10.2f}")
+    for n_skills in (1, 3, 5, 10):
+        codes = rng.choice(len(table), size=n_skills, replace=False)
+        weights = np.full(n_skills, 1.0 / n_skills, dtype=np.float32)
+        similarities = table.similarity[codes]
+        p50, p95 = timed(lambda: weights @ max_similarity(similarities, store.skill_codes[rows]), args.repeats)
+        print(f"{f'max-sim, {n_skills} skills':<26}{p50:>10.2f}{p95:>10.2f}")
+
+    print(f"memory: joined vectors {joined.nbytes / 1e6:.1f} MB, skill codes {store.skill_codes.nbytes / 1e6:.1f} MB "
+          f"+ table {table.nbytes / 1e6:.1f} MB")
+
+    # New skills: only their vectors and table rows are computed
+    start = time.perf_counter()
+    new_skills = [f"new skill {i}" for i in range(10)]
+    store, added = store.with_skills(0, new_skills)
+    table = table.extended(added, rng.standard_normal((len(added), args.dim), dtype=np.float32))
+    print(f"adding {len(added)} new skills to one mentor: {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"(widened codes to {store.skill_codes.shape[1]})")
+
+
+if __name__ == "__main__":
+    main()
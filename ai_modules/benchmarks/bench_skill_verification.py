@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import skill_verification
+from micro_batcher import MicroBatcher
+
+# CPU images/sec of portfolio scoring: the old per-image path (two predict
+# calls and a Python loop over skill classes) against one batched forward
+# pass with the class-index gather, per portfolio and with portfolios from
+# concurrent requests sharing batches through the MicroBatcher.
+#
+#   python benchmarks/bench_skill_verification.py --portfolio-size 20 --portfolios 8
+
+
+def per_image(model, images):
+    # The previous /verify-portfolio path, once per image
+    for img in images:
+        img_array = np.expand_dims(img, axis=0)
+        features = model.predict(img_array, verbose=0)
+        base_predictions = model.predict(img_array, verbose=0)
+        for related_classes in skill_verification.skill_categories.values():
+            float(np.mean([base_predictions[0, cls] for cls in related_classes]))
+
+
+async def concurrent_portfolios(portfolios, max_batch_size):
+    batcher = MicroBatcher(skill_verification.skill_confidences, max_batch_size=max_batch_size, max_wait_ms=10)
+    await asyncio.gather(*(batcher.submit(images) for images in portfolios))
+    return batcher.stats()["avg_batch_size"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--portfolio-size", type=int, default=20)
+    parser.add_argument("--portfolios", type=int, default=8)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    skill_verification.warmup.load_all()
+    # The old path always ran eager Keras, whichever backend is configured
+    model = getattr(skill_verification.resnet.get(), "model", None) or skill_verification.KerasBackend().model
+    rng = np.random.default_rng(0)
+    portfolios = [
+        [rng.uniform(-120, 150, (224, 224, 3)).astype(np.float32) for _ in range(args.portfolio_size)]
+        for _ in range(args.portfolios)
+    ]
+    n_images = args.portfolio_size * args.portfolios
+    skill_verification.skill_confidences(portfolios[0][:2])
+
+    print(f"{'path':<34}{'images/s':>10}")
+    start = time.perf_counter()
+    for images in portfolios:
+        per_image(model, images)
+    print(f"{'per image, two predicts':<34}{n_images / (time.perf_counter() - start):>10.1f}")
+
+    start = time.perf_counter()
+    for images in portfolios:
+        skill_verification.skill_confidences(images)
+    print(f"{'one forward pass per portfolio':<34}{n_images / (time.perf_counter() - start):>10.1f}")
+
+    start = time.perf_counter()
+    avg_batch = asyncio.run(concurrent_portfolios(portfolios, args.max_batch_size))
+    label = f"concurrent, batched ({avg_batch:.0f}/batch)"
+    print(f"{label:<34}{n_images / (time.perf_counter() - start):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
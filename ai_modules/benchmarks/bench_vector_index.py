@@ -0,0 +1,74 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from vector_index import BruteForceIndex, IVFIndex, normalize_rows
+
+# Recall-vs-latency benchmark of the IVF index against the exact scan the
+# recommender used to run over every project on every request.
+#
+#   python benchmarks/bench_vector_index.py --projects 300000 --queries 200
+
+
+def synthetic_embeddings(n, dim, n_topics, rng):
+    # Sentence embeddings of job descriptions cluster by topic, so draw
+    # vectors around a set of topic centres rather than uniformly
+    centres = normalize_rows(rng.standard_normal((n_topics, dim)))
+    topics = rng.integers(0, n_topics, n)
+    return normalize_rows(centres[topics] + 0.8 * rng.standard_normal((n, dim)) / np.sqrt(dim))
+
+
+def timed_search(index, queries, k, **params):
+    results = []
+    start = time.perf_counter()
+    for query in queries:
+        results.append(index.search(query, k, **params)[0])
+    elapsed = time.perf_counter() - start
+    return results, elapsed / len(queries) * 1000
+
+
+def recall(approx, exact):
+    hits = [len(np.intersect1d(a, e)) / len(e) for a, e in zip(approx, exact)]
+    return float(np.mean(hits))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--projects", type=int, default=300000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=200)
+    parser.add_argument("--topics", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = synthetic_embeddings(args.projects, args.dim, args.topics, rng)
+    queries = synthetic_embeddings(args.queries, args.dim, args.topics, rng)
+
+    exact = BruteForceIndex(vectors)
+    start = time.perf_counter()
+    ivf = IVFIndex(vectors)
+    build_seconds = time.perf_counter() - start
+
+    exact_results, exact_ms = timed_search(exact, queries, args.k)
+    print(f"{args.projects} projects, dim {args.dim}, top-{args.k}")
+    print(f"IVF build: {build_seconds:.1f}s ({ivf.n_lists} lists)")
+    print(f"{'backend':<16}{'ms/query':>10}{'recall@10':>12}{'recall@k':>12}")
+    print(f"{'exact':<16}{exact_ms:>10.2f}{1.0:>12.3f}{1.0:>12.3f}")
+
+    exact_top10 = [r[:10] for r in exact_results]
+    for n_probe in (1, 4, 8, 16, 32, 64):
+        if n_probe > ivf.n_lists:
+            break
+        results, ms = timed_search(ivf, queries, args.k, n_probe=n_probe)
+        print(f"{'ivf probe=' + str(n_probe):<16}{ms:>10.2f}"
+              f"{recall([r[:10] for r in results], exact_top10):>12.3f}"
+              f"{recall(results, exact_results):>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
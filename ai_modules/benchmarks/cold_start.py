@@ -0,0 +1,70 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+# Cold-start timing per service: launches uvicorn in a fresh process and
+# polls /health/live and /health/ready until each answers 200, then prints
+# the service's own startup report (import time, per-model load times).
+#
+#   python benchmarks/cold_start.py --services recommender mentor_matcher
+
+AI_MODULES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SERVICES = ["recommender", "mentor_matcher", "fraud_detector", "skill_verification", "analytics"]
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+    except (urllib.error.URLError, ConnectionError, OSError):
+        return None, None
+
+
+def measure(service, port, timeout):
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{service}:app", "--port", str(port), "--log-level", "warning"],
+        cwd=AI_MODULES,
+    )
+    live_seconds = ready_seconds = report = None
+    try:
+        while time.perf_counter() - start < timeout and process.poll() is None:
+            if live_seconds is None and get(f"http://127.0.0.1:{port}/health/live")[0] == 200:
+                live_seconds = time.perf_counter() - start
+            if live_seconds is not None:
+                status, report = get(f"http://127.0.0.1:{port}/health/ready")
+                if status == 200:
+                    ready_seconds = time.perf_counter() - start
+                    break
+            time.sleep(0.05)
+    finally:
+        process.terminate()
+        process.wait()
+    return live_seconds, ready_seconds, report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--services", nargs="+", default=SERVICES)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    print(f"{'service':<22}{'live s':>9}{'ready s':>10}  load times")
+    for service in args.services:
+        live_seconds, ready_seconds, report = measure(service, args.port, args.timeout)
+        loads = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in (report or {}).get("load_seconds", {}).items())
+        live = f"{live_seconds:.2f}" if live_seconds is not None else "-"
+        ready = f"{ready_seconds:.2f}" if ready_seconds is not None else "timeout"
+        print(f"{service:<22}{live:>9}{ready:>10}  {loads}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from micro_batcher import MicroBatcher
+
+# Load test for request-time encodes: concurrent async handlers each encode
+# one skills string, either by calling model.encode inline (the old handlers)
+# or through MicroBatcher. Reports p50/p99 latency and requests/sec.
+#
+#   python benchmarks/load_test_encode.py --concurrency 64 --requests 2000
+
+SKILLS = ["React", "Node.js", "Python", "Django", "Figma", "UI Design", "SEO",
+          "Content Writing", "Data Analysis", "SQL", "Flask", "Machine Learning",
+          "Video Editing", "Branding", "JavaScript", "PostgreSQL"]
+
+
+def random_profile(rng):
+    return " ".join(rng.sample(SKILLS, rng.randint(2, 5)))
+
+
+async def run_load(handle, texts, concurrency):
+    queue = list(texts)
+    latencies = []
+
+    async def client():
+        while queue:
+            text = queue.pop()
+            start = time.perf_counter()
+            await handle(text)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies = np.array(latencies) * 1000
+    return np.percentile(latencies, 50), np.percentile(latencies, 99), len(texts) / elapsed
+
+
+def report(label, result):
+    p50, p99, rps = result
+    print(f"{label:<28}{p50:>10.1f}{p99:>10.1f}{rps:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="paraphrase-MiniLM-L6-v2")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-batch-size", type=int, nargs="+", default=[16, 32, 64])
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(args.model)
+    model.encode(["warm up"])
+
+    rng = random.Random(0)
+    texts = [random_profile(rng) for _ in range(args.requests)]
+
+    async def inline(text):
+        return model.encode([text])[0]
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}")
+    print(f"{'mode':<28}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>12}")
+    report("inline encode (before)", asyncio.run(run_load(inline, texts, args.concurrency)))
+
+    for max_batch_size in args.max_batch_size:
+        batcher = MicroBatcher(model.encode, max_batch_size=max_batch_size, max_wait_ms=args.max_wait_ms)
+
+        async def batched(text):
+            return (await batcher.submit([text]))[0]
+
+        result = asyncio.run(run_load(batched, texts, args.concurrency))
+        report(f"micro-batch size={max_batch_size}", result)
+        print(f"{'':<28}avg batch {batcher.stats()['avg_batch_size']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
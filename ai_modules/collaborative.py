@@ -0,0 +1,123 @@
+import logging
+import threading
+import time
+import numpy as np
+import scipy.sparse as sp
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+# Offline item-item collaborative filtering. A sparse user x project
+# interaction matrix is turned into Jaccard similarities between projects that
+# share users, pruned to the strongest neighbours per project. At request
+# time a user's history selects a few rows of that matrix, so the cost depends
+# on history length and neighbour count, not on how many users exist.
+
+
+class CollaborativeModel:
+    def __init__(self, histories, max_neighbours=50):
+        histories = [list(dict.fromkeys(history)) for history in histories]
+        self.user_count = len(histories)
+        self.max_neighbours = max_neighbours
+        self.built_at = time.time()
+
+        flat = np.fromiter((p for history in histories for p in history), dtype=np.int64)
+        self.project_ids = np.unique(flat)
+        lengths = np.fromiter((len(history) for history in histories), dtype=np.int64, count=len(histories))
+        user_rows = np.repeat(np.arange(len(histories)), lengths)
+        project_cols = np.searchsorted(self.project_ids, flat)
+        interactions = sp.csr_matrix(
+            (np.ones(len(flat), dtype=np.float32), (user_rows, project_cols)),
+            shape=(len(histories), len(self.project_ids)),
+        )
+        self.item_similarity = self._item_similarity(interactions)
+
+    def _item_similarity(self, interactions):
+        interactions = interactions.tocsc()
+        co_occurrence = (interactions.T @ interactions).tocoo()
+        users_per_project = np.diff(interactions.indptr)
+
+        rows, cols, overlap = co_occurrence.row, co_occurrence.col, co_occurrence.data
+        off_diagonal = rows != cols
+        rows, cols, overlap = rows[off_diagonal], cols[off_diagonal], overlap[off_diagonal]
+        similarity = overlap / (users_per_project[rows] + users_per_project[cols] - overlap)
+
+        # Keep the max_neighbours most similar projects per project, ties
+        # going to the lower column so rebuilds are deterministic
+        order = np.lexsort((cols, -similarity, rows))
+        rows, cols, similarity = rows[order], cols[order], similarity[order]
+        row_starts = np.searchsorted(rows, np.arange(len(self.project_ids)))
+        rank = np.arange(len(rows)) - row_starts[rows]
+        keep = rank < self.max_neighbours
+
+        matrix = sp.csr_matrix(
+            (similarity[keep].astype(np.float32), (rows[keep], cols[keep])),
+            shape=(len(self.project_ids), len(self.project_ids)),
+        )
+        matrix.sort_indices()
+        return matrix
+
+    def score(self, history: List[int], project_ids) -> np.ndarray:
+        # Normalised collaborative scores for project_ids given a project
+        # history; projects already in the history score zero
+        project_ids = np.asarray(project_ids, dtype=np.int64)
+        scores = np.zeros(len(project_ids), dtype=np.float32)
+        history_cols = self._columns(np.asarray(history, dtype=np.int64))
+        if len(history_cols) == 0 or len(self.project_ids) == 0:
+            return scores
+
+        neighbours = self.item_similarity[history_cols]
+        totals = sp.csr_matrix(np.ones((1, len(history_cols)), dtype=np.float32)) @ neighbours
+        totals.sort_indices()
+        cols, values = totals.indices, totals.data
+        values[np.isin(cols, history_cols)] = 0.0
+        if len(values) == 0 or values.max() <= 0:
+            return scores
+
+        candidate_cols = self._columns(project_ids, keep_missing=True)
+        positions = np.searchsorted(cols, candidate_cols)
+        positions = np.minimum(positions, len(cols) - 1)
+        found = (candidate_cols >= 0) & (cols[positions] == candidate_cols)
+        scores[found] = values[positions[found]] / values.max()
+        return scores
+
+    def _columns(self, project_ids, keep_missing=False):
+        if len(self.project_ids) == 0:
+            return np.full(len(project_ids), -1, dtype=np.int64) if keep_missing else project_ids[:0]
+        cols = np.minimum(np.searchsorted(self.project_ids, project_ids), len(self.project_ids) - 1)
+        known = self.project_ids[cols] == project_ids
+        if keep_missing:
+            return np.where(known, cols, -1)
+        return np.unique(cols[known])
+
+
+class CollaborativeRefresher:
+    # Rebuilds the model from load_histories() every interval_seconds on a
+    # daemon thread and swaps it in; requests read .model without locking
+    def __init__(self, load_histories: Callable, interval_seconds: float, **model_params):
+        self._load_histories = load_histories
+        self._interval_seconds = interval_seconds
+        self._model_params = model_params
+        self._stop = threading.Event()
+        self._thread = None
+        self.model = CollaborativeModel(load_histories(), **model_params)
+
+    def refresh(self):
+        self.model = CollaborativeModel(self._load_histories(), **self._model_params)
+        return self.model
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="collaborative-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self._interval_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the previous model; the next cycle retries
+                logger.exception("Collaborative model refresh failed: %s", e)
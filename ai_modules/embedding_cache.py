@@ -0,0 +1,254 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from typing import Dict, List, Optional
+
+# Query-embedding cache shared by the recommender and the mentor matcher.
+# Entries are keyed by (model name, normalised text) and held in a bounded
+# in-memory LRU with a TTL. An optional disk tier appends every encoded
+# vector as float16 to a memory-mapped file per model, so a restarted worker
+# starts warm. The disk tier rotates between two files of at most
+# disk_max_rows records each, so it is bounded too.
+
+
+def normalize_text(text: str) -> str:
+    # paraphrase-MiniLM-L6-v2 is uncased and ignores whitespace runs, so
+    # these variants encode to the same vector
+    return " ".join(text.lower().split())
+
+
+class _RecordFile:
+    # Append-only records of (sha1 key, float16 vector). Each record is written
+    # with a single O_APPEND write, so several workers can share one file. A
+    # file replaced on disk (rotated by any worker) is re-read from the start.
+    def __init__(self, path, record):
+        self.path = path
+        self.record = record
+        self.rows: Dict[bytes, int] = {}
+        self._records = None
+        self._size = 0
+        self._inode = None
+        self.refresh()
+
+    def __len__(self):
+        return 0 if self._records is None else len(self._records)
+
+    def refresh(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            stat = None
+        inode = stat.st_ino if stat else None
+        if inode != self._inode:
+            self.rows, self._records, self._size, self._inode = {}, None, 0, inode
+        size = stat.st_size if stat else 0
+        count = size // self.record.itemsize
+        if count == 0 or size == self._size:
+            return
+        start = len(self)
+        self._records = np.memmap(self.path, dtype=self.record, mode='r', shape=(count,))
+        for row, key in enumerate(self._records['key'][start:], start):
+            self.rows.setdefault(bytes(key), row)
+        self._size = size
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        row = self.rows.get(key)
+        if row is None:
+            return None
+        return self._records['vector'][row].astype(np.float32)
+
+    def append(self, key: bytes, vector):
+        record = np.zeros(1, dtype=self.record)
+        record['key'] = key
+        record['vector'] = vector
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, record.tobytes())
+        finally:
+            os.close(fd)
+
+
+class _ModelFile:
+    # Two generations of records per model. New vectors are appended to the
+    # current file; once it holds max_rows records it replaces the previous
+    # file and a new current file starts. Hits in the previous generation
+    # are copied forward, so vectors still in use survive the next rotation.
+    # Disk and the in-memory key maps stay under 2 x max_rows records.
+    def __init__(self, path, dim, max_rows):
+        self.dim = dim
+        self.max_rows = max_rows
+        record = np.dtype([('key', 'S40'), ('vector', '<f2', (dim,))])
+        self.current = _RecordFile(path, record)
+        self.previous = _RecordFile(f"{path}.old", record)
+
+    def refresh(self):
+        self.current.refresh()
+        self.previous.refresh()
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        if key not in self.current.rows and key not in self.previous.rows:
+            self.refresh()
+        vector = self.current.get(key)
+        if vector is None:
+            vector = self.previous.get(key)
+            if vector is not None:
+                self.put(key, vector)
+        return vector
+
+    def put(self, key: bytes, vector):
+        if key in self.current.rows:
+            return
+        self.current.refresh()
+        if len(self.current) >= self.max_rows:
+            try:
+                os.replace(self.current.path, self.previous.path)
+            except FileNotFoundError:
+                pass  # another worker rotated it first
+            self.refresh()
+        self.current.append(key, vector)
+
+
+class DiskEmbeddingTier:
+    def __init__(self, directory, max_rows=100000):
+        self.directory = directory
+        self.max_rows = max_rows
+        os.makedirs(directory, exist_ok=True)
+        self._files: Dict[str, _ModelFile] = {}
+        self._lock = threading.Lock()
+
+    def _file(self, model_name, dim=None) -> Optional[_ModelFile]:
+        if model_name in self._files:
+            return self._files[model_name]
+        stem = os.path.join(self.directory, re.sub(r'[^A-Za-z0-9_.-]', '_', model_name))
+        meta_path = f"{stem}.json"
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                dim = json.load(f)["dim"]
+        elif dim is None:
+            return None
+        else:
+            with open(meta_path, "w") as f:
+                json.dump({"model": model_name, "dim": int(dim)}, f)
+        self._files[model_name] = _ModelFile(f"{stem}.f16", dim, self.max_rows)
+        return self._files[model_name]
+
+    @staticmethod
+    def _key(text) -> bytes:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest().encode("ascii")
+
+    def get(self, model_name, text) -> Optional[np.ndarray]:
+        with self._lock:
+            model_file = self._file(model_name)
+            return model_file.get(self._key(text)) if model_file else None
+
+    def put(self, model_name, text, vector):
+        with self._lock:
+            self._file(model_name, len(vector)).put(self._key(text), vector)
+
+
+class EmbeddingCache:
+    def __init__(self, max_entries=10000, ttl_seconds=3600.0, disk_dir=None, disk_max_rows=100000):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk = DiskEmbeddingTier(disk_dir, disk_max_rows) if disk_dir else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get_many(self, model_name, texts) -> List[Optional[np.ndarray]]:
+        now = time.monotonic()
+        found = []
+        disk_lookups = []
+        with self._lock:
+            for text in texts:
+                key = (model_name, normalize_text(text))
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] <= now:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    found.append(entry[0])
+                else:
+                    disk_lookups.append(len(found))
+                    found.append(None)
+
+        # Memory misses fall through to the disk tier, and disk hits are
+        # promoted back into memory
+        for position in disk_lookups:
+            vector = self.disk.get(model_name, normalize_text(texts[position])) if self.disk else None
+            if vector is not None:
+                self._store(model_name, texts[position], vector)
+                found[position] = vector
+            with self._lock:
+                if vector is None:
+                    self.misses += 1
+                else:
+                    self.disk_hits += 1
+        return found
+
+    def put_many(self, model_name, texts, vectors):
+        for text, vector in zip(texts, vectors):
+            vector = np.asarray(vector, dtype=np.float32)
+            self._store(model_name, text, vector)
+            if self.disk:
+                self.disk.put(model_name, normalize_text(text), vector)
+
+    def _store(self, model_name, text, vector):
+        key = (model_name, normalize_text(text))
+        with self._lock:
+            self._entries[key] = (vector, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _missing(self, model_name, texts):
+        vectors = self.get_many(model_name, texts)
+        missing = list(dict.fromkeys(texts[i] for i, v in enumerate(vectors) if v is None))
+        return vectors, missing
+
+    def _fill(self, model_name, texts, vectors, missing, encoded):
+        encoded = dict(zip(missing, encoded))
+        self.put_many(model_name, missing, [encoded[text] for text in missing])
+        return [encoded[texts[i]] if v is None else v for i, v in enumerate(vectors)]
+
+    def encode(self, model, model_name, texts) -> np.ndarray:
+        # Look every text up and encode the distinct misses in one batch
+        vectors, missing = self._missing(model_name, texts)
+        if missing:
+            vectors = self._fill(model_name, texts, vectors, missing, model.encode(missing))
+        return np.vstack(vectors).astype(np.float32)
+
+    async def encode_async(self, encode, model_name, texts) -> np.ndarray:
+        # Same as encode(), with misses sent to an async encoder such as
+        # MicroBatcher.submit
+        vectors, missing = self._missing(model_name, texts)
+        if missing:
+            vectors = self._fill(model_name, texts, vectors, missing, await encode(missing))
+        return np.vstack(vectors).astype(np.float32)
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
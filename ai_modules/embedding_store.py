@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import time
+import numpy as np
+from typing import Callable, List, Optional
+
+# On-disk store for precomputed embedding matrices (project descriptions,
+# mentor skills/industries/bios). Rows are L2-normalised and stored as float16,
+# or int8 with a float32 scale per row, next to a manifest holding a content
+# hash of the model name and source texts. Workers np.load the arrays with
+# mmap_mode='r', so they share one copy of the pages and skip re-encoding
+# whenever the hash still matches.
+
+STORE_DTYPES = ("float16", "int8")
+
+
+class QuantizedEmbeddings:
+    # Read-side view over quantised rows. Slicing or fancy indexing returns
+    # dequantised float32 rows; dot() streams over the matrix in chunks so a
+    # full scan never materialises a float32 copy of the whole store.
+    def __init__(self, values, scales=None, content_hash=""):
+        self.values = values
+        self.scales = scales
+        self.content_hash = content_hash
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def dtype(self):
+        return self.values.dtype
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, rows):
+        values = np.asarray(self.values[rows], dtype=np.float32)
+        if self.scales is not None:
+            values *= self.scales[rows][..., None]
+        return values
+
+    def dot(self, query, rows=None, chunk_size=16384) -> np.ndarray:
+        # query is one vector (dim,) or a block of vectors (dim, n)
+        query = np.asarray(query, dtype=np.float32)
+        if rows is not None:
+            # Dequantise the selected rows a chunk at a time
+            rows = np.asarray(rows)
+            if rows.dtype == bool:
+                rows = np.flatnonzero(rows)
+            scores = np.empty((len(rows),) + query.shape[1:], dtype=np.float32)
+            for start in range(0, len(rows), chunk_size):
+                scores[start:start + chunk_size] = self[rows[start:start + chunk_size]] @ query
+            return scores
+        scores = np.empty((len(self),) + query.shape[1:], dtype=np.float32)
+        for start in range(0, len(self), chunk_size):
+            end = start + chunk_size
+            scores[start:end] = np.asarray(self.values[start:end], dtype=np.float32) @ query
+        if self.scales is not None:
+            scores *= self.scales.reshape((-1,) + (1,) * (query.ndim - 1))
+        return scores
+
+    __matmul__ = dot
+
+    def cosine(self, query, rows=None) -> np.ndarray:
+        # Rows are stored normalised, so cosine similarity is a scaled dot
+        query = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        return self.dot(query / norm if norm > 0 else query, rows)
+
+    def with_rows(self, keep, new_vectors) -> "QuantizedEmbeddings":
+        # Copy-on-write: kept rows followed by newly quantised rows, in memory
+        values, scales = quantize(new_vectors, str(self.values.dtype))
+        kept_scales = None if self.scales is None else np.concatenate([self.scales[keep], scales])
+        return QuantizedEmbeddings(np.concatenate([self.values[keep], values]), kept_scales)
+
+
+def normalize(vectors):
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def quantize(vectors, dtype):
+    if dtype not in STORE_DTYPES:
+        raise ValueError(f"Unsupported embedding store dtype: {dtype}")
+    vectors = normalize(vectors)
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    scales = np.abs(vectors).max(axis=1, initial=0.0) / 127
+    scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+    values = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return values, scales
+
+
+def content_hash(model_name, texts) -> str:
+    digest = hashlib.sha256(model_name.encode("utf-8"))
+    for text in texts:
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _paths(directory, name):
+    stem = os.path.join(directory, name)
+    return f"{stem}.manifest.json", f"{stem}.values.npy", f"{stem}.scales.npy"
+
+
+def save_store(directory, name, vectors, model_name, texts, dtype="float16") -> QuantizedEmbeddings:
+    os.makedirs(directory, exist_ok=True)
+    manifest_path, values_path, scales_path = _paths(directory, name)
+    values, scales = quantize(vectors, dtype)
+
+    # Arrays first, manifest last: a store is only valid once its manifest
+    # names the hash, so a crashed write is simply rebuilt next start
+    np.save(f"{values_path}.tmp.npy", values)
+    os.replace(f"{values_path}.tmp.npy", values_path)
+    if scales is not None:
+        np.save(f"{scales_path}.tmp.npy", scales)
+        os.replace(f"{scales_path}.tmp.npy", scales_path)
+
+    manifest = {
+        "name": name,
+        "model": model_name,
+        "dtype": dtype,
+        "rows": int(values.shape[0]),
+        "dim": int(values.shape[1]),
+        "content_hash": content_hash(model_name, texts),
+        "created_at": time.time(),
+    }
+    with open(f"{manifest_path}.tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    return QuantizedEmbeddings(values, scales, manifest["content_hash"])
+
+
+def load_store(directory, name, expected_hash: Optional[str] = None,
+               dtype: Optional[str] = None) -> Optional[QuantizedEmbeddings]:
+    manifest_path, values_path, scales_path = _paths(directory, name)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if expected_hash is not None and manifest["content_hash"] != expected_hash:
+        return None
+    if dtype is not None and manifest["dtype"] != dtype:
+        return None
+    values = np.load(values_path, mmap_mode='r')
+    scales = np.load(scales_path, mmap_mode='r') if manifest["dtype"] == "int8" else None
+    return QuantizedEmbeddings(values, scales, manifest["content_hash"])
+
+
+def load_or_build_store(directory, name, model_name, texts: List[str],
+                        encode: Callable, dtype="float16") -> QuantizedEmbeddings:
+    # Map the stored matrix read-only when it was built from the same model
+    # and texts; otherwise encode once and write it for the next worker
+    expected_hash = content_hash(model_name, texts)
+    store = load_store(directory, name, expected_hash, dtype)
+    if store is not None:
+        return store
+    save_store(directory, name, encode(texts), model_name, texts, dtype)
+    return load_store(directory, name, expected_hash, dtype)
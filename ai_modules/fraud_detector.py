@@ -1,81 +1,75 @@
+import os
+import sys
+import tempfile
+import logging
+import itertools
+import time
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import IsolationForest
-from sklearn.linear_model import LogisticRegression
-from sklearn.preprocessing import StandardScaler
 import fastapi
-from fastapi import FastAPI, Body
-from pydantic import BaseModel
-from typing import List, Dict, Optional
+from fastapi import FastAPI, Body, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict
+from typing import List, Dict, Optional, Iterable, Iterator
 import datetime
 import json
+from model_loader import ServiceWarmup, add_health_routes, configure_logging
+from api_errors import add_validation_error_handler
+from fraud_model import FEATURE_NAMES, FraudModelReloader, synthetic_training_data, train_bundle
+from activity_features import EVENT_TYPES, ActivityFeatureStore
+from fraud_queue import QueueFull, ScoringQueue
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Fraud Detection API")
 
-# Mock historical data for training
-np.random.seed(42)
-n_samples = 1000
-
-# Generate normal user behavior
-normal_logins_per_day = np.random.poisson(3, n_samples)
-normal_bids_per_day = np.random.poisson(5, n_samples)
-normal_bid_to_project_ratio = np.random.normal(0.3, 0.1, n_samples)
-normal_payment_amount = np.random.normal(5000, 1000, n_samples)
-normal_login_time_variance = np.random.normal(3, 1, n_samples)
-normal_ip_address_count = np.random.poisson(2, n_samples)
-normal_failed_login_attempts = np.random.poisson(0.5, n_samples)
-
-# Generate fraudulent behavior
-fraud_logins_per_day = np.random.poisson(10, n_samples // 10)
-fraud_bids_per_day = np.random.poisson(20, n_samples // 10)
-fraud_bid_to_project_ratio = np.random.normal(0.8, 0.1, n_samples // 10)
-fraud_payment_amount = np.random.normal(15000, 5000, n_samples // 10)
-fraud_login_time_variance = np.random.normal(12, 3, n_samples // 10)
-fraud_ip_address_count = np.random.poisson(8, n_samples // 10)
-fraud_failed_login_attempts = np.random.poisson(5, n_samples // 10)
-
-# Create training dataset
-X_normal = np.column_stack([
-    normal_logins_per_day,
-    normal_bids_per_day,
-    normal_bid_to_project_ratio,
-    normal_payment_amount,
-    normal_login_time_variance,
-    normal_ip_address_count,
-    normal_failed_login_attempts
-])
-
-X_fraud = np.column_stack([
-    fraud_logins_per_day,
-    fraud_bids_per_day,
-    fraud_bid_to_project_ratio,
-    fraud_payment_amount,
-    fraud_login_time_variance,
-    fraud_ip_address_count,
-    fraud_failed_login_attempts
-])
-
-# Create labels (0 for normal, 1 for fraud)
-y_normal = np.zeros(n_samples)
-y_fraud = np.ones(n_samples // 10)
-
-# Combine datasets
-X = np.vstack([X_normal, X_fraud])
-y = np.hstack([y_normal, y_fraud])
-
-# Scale features
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
-
-# Train Isolation Forest
-isolation_forest = IsolationForest(contamination=0.1, random_state=42)
-isolation_forest.fit(X_scaled)
-
-# Train Logistic Regression
-logistic_regression = LogisticRegression(random_state=42)
-logistic_regression.fit(X_scaled, y)
+# Models load on a background thread after startup; /health/ready reports
+# when they are in place
+warmup = ServiceWarmup("fraud_detector")
+
+# Versioned model bundles written by the training CLI (fraud_model.py). Every
+# worker loads the bundle named by {FRAUD_MODEL_DIR}/LATEST and checks it
+# every FRAUD_MODEL_RELOAD_SECONDS for a new version to swap in. Without a
+# bundle the models are trained on the mock data, as before.
+FRAUD_MODEL_DIR = os.environ.get(
+    "FRAUD_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "fraud_models")
+)
+FRAUD_MODEL_RELOAD_SECONDS = float(os.environ.get("FRAUD_MODEL_RELOAD_SECONDS", "30"))
+
+def load_fraud_models():
+    reloader = FraudModelReloader(
+        FRAUD_MODEL_DIR, FRAUD_MODEL_RELOAD_SECONDS,
+        fallback=lambda: train_bundle(*synthetic_training_data(), version="synthetic")
+    )
+    reloader.start()
+    return reloader
+
+fraud_models = warmup.resource("fraud_models", load_fraud_models)
+
+add_health_routes(app, warmup)
+add_validation_error_handler(app)
+
+# Per-user sliding-window aggregates built from raw events posted to /events,
+# so clients can score by user_id instead of precomputing the features. Memory
+# is bounded by FRAUD_FEATURE_MAX_USERS; the least recently active users are
+# evicted first. Aggregates are per worker process.
+FRAUD_FEATURE_WINDOW_SECONDS = float(os.environ.get("FRAUD_FEATURE_WINDOW_SECONDS", "86400"))
+FRAUD_FEATURE_BUCKETS = int(os.environ.get("FRAUD_FEATURE_BUCKETS", "12"))
+FRAUD_FEATURE_MAX_USERS = int(os.environ.get("FRAUD_FEATURE_MAX_USERS", "100000"))
+# Allowed clock skew for client event timestamps; later ones are rejected
+FRAUD_EVENT_MAX_SKEW_SECONDS = float(os.environ.get("FRAUD_EVENT_MAX_SKEW_SECONDS", "300"))
+
+activity_store = ActivityFeatureStore(
+    window_seconds=FRAUD_FEATURE_WINDOW_SECONDS,
+    n_buckets=FRAUD_FEATURE_BUCKETS,
+    max_users=FRAUD_FEATURE_MAX_USERS,
+    max_skew_seconds=FRAUD_EVENT_MAX_SKEW_SECONDS
+)
 
 class UserActivityRequest(BaseModel):
+    # NaN and infinity are rejected with 422, as the models cannot score them
+    model_config = ConfigDict(allow_inf_nan=False)
+    
     user_id: int
     logins_per_day: float
     bids_per_day: float
@@ -95,78 +89,334 @@ class FraudDetectionResponse(BaseModel):
     status: str
     reasons: List[str]
     timestamp: str
+    model_version: Optional[str] = None
 
-@app.post("/detect-fraud", response_model=FraudDetectionResponse)
-async def detect_fraud(request: UserActivityRequest = Body(...)):
-    # Extract features
-    features = np.array([
-        request.logins_per_day,
-        request.bids_per_day,
-        request.bid_to_project_ratio,
-        request.payment_amount,
-        request.login_time_variance,
-        request.ip_address_count,
-        request.failed_login_attempts
-    ]).reshape(1, -1)
-    
-    # Scale features
-    features_scaled = scaler.transform(features)
+class BatchFraudRequest(BaseModel):
+    activities: List[UserActivityRequest]
+
+class BatchFraudResponse(BaseModel):
+    results: List[FraudDetectionResponse]
+
+class QueuedFraudRequest(BaseModel):
+    activity: UserActivityRequest
+    # "payment" checks are scored ahead of "rescore" jobs
+    priority: str = "payment"
+    # Receives the finished job as a JSON POST
+    callback_url: Optional[str] = None
+
+class ActivityEvent(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
     
-    # Get Isolation Forest score (-1 to 1, where lower is more anomalous)
-    isolation_score = isolation_forest.decision_function(features_scaled)[0]
-    # Convert to 0-1 scale where higher means more likely to be fraud
-    isolation_score_normalized = (1 - (isolation_score + 1) / 2)
+    user_id: int
+    event_type: str  # one of EVENT_TYPES
+    timestamp: Optional[float] = None  # epoch seconds, defaults to arrival time
+    ip_address: Optional[str] = None
+    amount: Optional[float] = None  # payment events only
+
+class ActivityEventsRequest(BaseModel):
+    events: List[ActivityEvent]
+
+class UserFraudRequest(BaseModel):
+    user_id: int
+    # Not derivable from the event stream, so still supplied by the caller
+    bid_to_project_ratio: float
+    # Overrides the window's mean payment, e.g. to score a pending payment
+    payment_amount: Optional[float] = None
+
+# Reasons for the score: one (feature, threshold, message) rule per column,
+# checked for every row at once as a (rows x features) mask
+REASON_RULES = [
+    ("logins_per_day", 5, "High login frequency: {} logins per day"),
+    ("bids_per_day", 10, "High bidding frequency: {} bids per day"),
+    ("bid_to_project_ratio", 0.5, "Unusual bid-to-project ratio: {:.2f}"),
+    ("payment_amount", 10000, "Large payment amount: ₹{:.2f}"),
+    ("login_time_variance", 8, "Unusual login time variance: {} hours"),
+    ("ip_address_count", 5, "Multiple IP addresses: {:.0f}"),
+    ("failed_login_attempts", 3, "Failed login attempts: {:.0f}")
+]
+REASON_COLUMNS = np.array([FEATURE_NAMES.index(name) for name, _, _ in REASON_RULES])
+REASON_THRESHOLDS = np.array([threshold for _, threshold, _ in REASON_RULES])
+
+# Records scored per model call on the streaming endpoint
+FRAUD_STREAM_CHUNK_SIZE = int(os.environ.get("FRAUD_STREAM_CHUNK_SIZE", "2000"))
+
+def fraud_reasons(features, statuses) -> List[List[str]]:
+    # Only the cells that cross a threshold are formatted
+    hits = features[:, REASON_COLUMNS] > REASON_THRESHOLDS
+    reasons = [[] for _ in range(len(features))]
+    for row, rule in zip(*np.nonzero(hits)):
+        reasons[row].append(REASON_RULES[rule][2].format(features[row, REASON_COLUMNS[rule]]))
     
-    # Get Logistic Regression probability
-    lr_probability = logistic_regression.predict_proba(features_scaled)[0][1]
+    # If no specific reasons but still suspicious, add a generic reason
+    for row in np.flatnonzero(~hits.any(axis=1) & (statuses != "normal")):
+        reasons[row].append("Unusual pattern detected in user behavior")
+    return reasons
+
+def detect_fraud_many(activities: List[UserActivityRequest]) -> List[Dict]:
+    if not activities:
+        return []
     
-    # Ensemble the scores (weighted average)
-    fraud_score = 0.6 * isolation_score_normalized + 0.4 * lr_probability
+    # Extract features
+    features = np.array([[getattr(activity, name) for name in FEATURE_NAMES] for activity in activities],
+                        dtype=np.float64)
+    # One bundle per call, so a reload mid-batch never mixes versions
+    bundle = fraud_models.get().bundle
+    fraud_scores, lr_probabilities, isolation_scores, statuses = bundle.score(features)
+    reasons = fraud_reasons(features, statuses)
+    timestamp = datetime.datetime.now().isoformat()
     
-    # Determine status
-    if fraud_score < 0.3:
-        status = "normal"
-    elif fraud_score < 0.7:
-        status = "suspicious"
-    else:
-        status = "flagged"
+    return [
+        {
+            "user_id": activity.user_id,
+            "fraud_score": fraud_score,
+            "fraud_probability": lr_probability,
+            "isolation_forest_score": isolation_score,
+            "logistic_regression_score": lr_probability,
+            "status": status,
+            "reasons": activity_reasons,
+            "timestamp": timestamp,
+            "model_version": bundle.version
+        }
+        for activity, fraud_score, lr_probability, isolation_score, status, activity_reasons in zip(
+            activities, fraud_scores.tolist(), lr_probabilities.tolist(), isolation_scores.tolist(),
+            statuses.tolist(), reasons
+        )
+    ]
+
+@app.post("/detect-fraud", response_model=FraudDetectionResponse)
+async def detect_fraud(request: UserActivityRequest = Body(...)):
+    warmup.require_ready()
+    return detect_fraud_many([request])[0]
+
+@app.post("/detect-fraud/batch", response_model=BatchFraudResponse)
+def detect_fraud_batch(request: BatchFraudRequest = Body(...)):
+    # Sync handler: the matrix is scored in the threadpool, off the event loop
+    warmup.require_ready()
+    return {"results": detect_fraud_many(request.activities)}
+
+@app.post("/events")
+def ingest_events(request: ActivityEventsRequest = Body(...)):
+    # Each event is folded into its user's aggregates in O(1); events older
+    # than the window are counted as stale and dropped
+    accepted = stale = 0
+    latest = time.time() + FRAUD_EVENT_MAX_SKEW_SECONDS
+    for event in request.events:
+        if event.event_type not in EVENT_TYPES:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Unknown event_type '{event.event_type}', expected one of {', '.join(EVENT_TYPES)}"
+            )
+        if event.timestamp is not None and event.timestamp > latest:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Event timestamp {event.timestamp} is more than {FRAUD_EVENT_MAX_SKEW_SECONDS:g}s "
+                       f"in the future"
+            )
+    for event in request.events:
+        if activity_store.add(event.user_id, event.event_type, event.timestamp, event.ip_address, event.amount):
+            accepted += 1
+        else:
+            stale += 1
+    return {"accepted": accepted, "stale": stale}
+
+@app.get("/events/stats")
+async def event_stats():
+    return activity_store.stats()
+
+@app.get("/users/{user_id}/features")
+async def user_features(user_id: int):
+    if user_id not in activity_store:
+        raise HTTPException(status_code=404, detail=f"No activity recorded for user {user_id}")
+    return {"user_id": user_id, **activity_store.features(user_id)}
+
+@app.post("/detect-fraud/user", response_model=FraudDetectionResponse)
+def detect_fraud_user(request: UserFraudRequest = Body(...)):
+    # Scores a user from the aggregated event features
+    warmup.require_ready()
+    if request.user_id not in activity_store:
+        raise HTTPException(status_code=404, detail=f"No activity recorded for user {request.user_id}")
+    features = activity_store.features(request.user_id)
+    if request.payment_amount is not None:
+        features["payment_amount"] = request.payment_amount
+    activity = UserActivityRequest(
+        user_id=request.user_id, bid_to_project_ratio=request.bid_to_project_ratio, **features
+    )
+    return detect_fraud_many([activity])[0]
+
+# Queued mode: POST /detect-fraud/jobs answers at once with a job id, and
+# the score is fetched from /detect-fraud/jobs/{job_id} or pushed to the
+# job's callback_url. Each priority lane holds at most FRAUD_QUEUE_MAX_DEPTH
+# jobs; beyond that submissions get a 429.
+FRAUD_QUEUE_LANES = ("payment", "rescore")
+FRAUD_QUEUE_MAX_DEPTH = int(os.environ.get("FRAUD_QUEUE_MAX_DEPTH", "10000"))
+FRAUD_QUEUE_WORKERS = int(os.environ.get("FRAUD_QUEUE_WORKERS", "2"))
+FRAUD_QUEUE_BATCH_SIZE = int(os.environ.get("FRAUD_QUEUE_BATCH_SIZE", "256"))
+FRAUD_QUEUE_MAX_WAIT_MS = float(os.environ.get("FRAUD_QUEUE_MAX_WAIT_MS", "2"))
+FRAUD_JOB_TTL_SECONDS = float(os.environ.get("FRAUD_JOB_TTL_SECONDS", "600"))
+# Registered webhooks, comma-separated; a job's callback_url must be one of
+# them exactly. Results are never POSTed anywhere else.
+FRAUD_WEBHOOK_URLS = [url.strip() for url in os.environ.get("FRAUD_WEBHOOK_URLS", "").split(",") if url.strip()]
+
+scoring_queue = ScoringQueue(
+    detect_fraud_many,
+    lanes=FRAUD_QUEUE_LANES,
+    max_depth=FRAUD_QUEUE_MAX_DEPTH,
+    workers=FRAUD_QUEUE_WORKERS,
+    max_batch_size=FRAUD_QUEUE_BATCH_SIZE,
+    max_wait_ms=FRAUD_QUEUE_MAX_WAIT_MS,
+    result_ttl_seconds=FRAUD_JOB_TTL_SECONDS,
+    allowed_callbacks=FRAUD_WEBHOOK_URLS
+)
+
+@app.post("/detect-fraud/jobs", status_code=202)
+async def submit_fraud_job(request: QueuedFraudRequest = Body(...)):
+    warmup.require_ready()
+    if request.priority not in FRAUD_QUEUE_LANES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown priority '{request.priority}', expected one of {', '.join(FRAUD_QUEUE_LANES)}"
+        )
+    if request.callback_url is not None and request.callback_url not in FRAUD_WEBHOOK_URLS:
+        raise HTTPException(status_code=422, detail="callback_url must be one of the registered webhooks")
+    try:
+        job = scoring_queue.submit(request.activity, request.priority, request.callback_url)
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    return {"job_id": job.id, "status": job.status, "priority": job.lane,
+            "queue_depth": scoring_queue.depth(job.lane)}
+
+@app.get("/detect-fraud/jobs/{job_id}")
+async def get_fraud_job(job_id: str):
+    job = scoring_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job {job_id}")
+    return job.to_dict()
+
+@app.get("/detect-fraud/queue")
+async def fraud_queue_metrics():
+    return scoring_queue.stats()
+
+def score_stream(activities: Iterable[UserActivityRequest], chunk_size=FRAUD_STREAM_CHUNK_SIZE) -> Iterator[Dict]:
+    # Scores an arbitrarily long stream chunk_size records per model call
+    activities = iter(activities)
+    while True:
+        chunk = list(itertools.islice(activities, chunk_size))
+        if not chunk:
+            break
+        yield from detect_fraud_many(chunk)
+
+# Request bodies for the streaming endpoint are spooled to a temporary file
+# once larger than this
+FRAUD_STREAM_SPOOL_BYTES = int(os.environ.get("FRAUD_STREAM_SPOOL_BYTES", str(8 * 1024 * 1024)))
+
+def score_ndjson(source) -> Iterator[str]:
+    # Scores NDJSON lines FRAUD_STREAM_CHUNK_SIZE records per model call and
+    # yields their output lines in input order. A line that is not a valid
+    # activity object yields {"line": n, "error": ...} in its place.
+    entries = []
     
-    # Generate reasons for the score
-    reasons = []
-    if request.logins_per_day > 5:
-        reasons.append(f"High login frequency: {request.logins_per_day} logins per day")
-    if request.bids_per_day > 10:
-        reasons.append(f"High bidding frequency: {request.bids_per_day} bids per day")
-    if request.bid_to_project_ratio > 0.5:
-        reasons.append(f"Unusual bid-to-project ratio: {request.bid_to_project_ratio:.2f}")
-    if request.payment_amount > 10000:
-        reasons.append(f"Large payment amount: ₹{request.payment_amount:.2f}")
-    if request.login_time_variance > 8:
-        reasons.append(f"Unusual login time variance: {request.login_time_variance} hours")
-    if request.ip_address_count > 5:
-        reasons.append(f"Multiple IP addresses: {request.ip_address_count}")
-    if request.failed_login_attempts > 3:
-        reasons.append(f"Failed login attempts: {request.failed_login_attempts}")
+    def flush():
+        results = iter(detect_fraud_many([entry for entry in entries if isinstance(entry, UserActivityRequest)]))
+        return "".join(json.dumps(entry if isinstance(entry, dict) else next(results)) + "\n" for entry in entries)
     
-    # If no specific reasons but still suspicious, add a generic reason
-    if not reasons and status != "normal":
-        reasons.append("Unusual pattern detected in user behavior")
+    for line_number, line in enumerate(source, 1):
+        if not line.strip():
+            continue
+        try:
+            entries.append(UserActivityRequest(**json.loads(line)))
+        except (ValueError, TypeError, AttributeError) as e:
+            entries.append({"line": line_number, "error": str(e)})
+        if len(entries) >= FRAUD_STREAM_CHUNK_SIZE:
+            yield flush()
+            entries = []
+    if entries:
+        yield flush()
+
+def score_spooled(spool) -> Iterator[str]:
+    try:
+        yield from score_ndjson(spool)
+    finally:
+        spool.close()
+
+@app.post("/detect-fraud/stream")
+async def detect_fraud_stream(request: Request):
+    # NDJSON in, NDJSON out. The body is spooled (to disk past
+    # FRAUD_STREAM_SPOOL_BYTES) before the response starts, because
+    # StreamingResponse listens for disconnects on the same receive channel.
+    # Results are then scored and streamed chunk by chunk from a sync
+    # generator in the threadpool, so neither side is held in memory. For
+    # the full user base use the "score" CLI, which streams file to file.
+    warmup.require_ready()
     
+    spool = tempfile.SpooledTemporaryFile(max_size=FRAUD_STREAM_SPOOL_BYTES)
+    try:
+        async for data in request.stream():
+            spool.write(data)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return StreamingResponse(score_spooled(spool), media_type="application/x-ndjson")
+
+def run_score_cli(input_path, output_path, chunk_size):
+    # Offline re-scoring: reads UserActivityRequest JSON lines and writes one
+    # result JSON line per record without holding either file in memory
+    sink = sys.stdout if output_path == "-" else open(output_path, "w")
+    count = 0
+    try:
+        with open(input_path) as source:
+            activities = (UserActivityRequest(**json.loads(line)) for line in source if line.strip())
+            for result in score_stream(activities, chunk_size):
+                sink.write(json.dumps(result) + "\n")
+                count += 1
+    finally:
+        if sink is not sys.stdout:
+            sink.close()
+    logger.info("Scored %d activity records", count)
+
+@app.get("/model-info")
+async def model_info():
+    warmup.require_ready()
+    reloader = fraud_models.get()
+    bundle = reloader.bundle
     return {
-        "user_id": request.user_id,
-        "fraud_score": float(fraud_score),
-        "fraud_probability": float(lr_probability),
-        "isolation_forest_score": float(isolation_score_normalized),
-        "logistic_regression_score": float(lr_probability),
-        "status": status,
-        "reasons": reasons,
-        "timestamp": datetime.datetime.now().isoformat()
+        **bundle.manifest,
+        "loaded_at": reloader.loaded_at,
+        "model_dir": FRAUD_MODEL_DIR,
+        "fast_path": {"enabled": bundle.compiled is not None, "parity_error": bundle.parity_error}
     }
 
+@app.post("/model-info/reload")
+def reload_model():
+    # Picks up a new LATEST now instead of at the next periodic check
+    warmup.require_ready()
+    reloader = fraud_models.get()
+    try:
+        reloaded = reloader.reload()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed, still serving {reloader.bundle.version}: {e}")
+    return {"reloaded": reloaded, "version": reloader.bundle.version}
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
+warmup.mark_imported()
+
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8002)
+    import argparse
+    configure_logging()
+    parser = argparse.ArgumentParser(description="Fraud Detection API")
+    subparsers = parser.add_subparsers(dest="command")
+    score_parser = subparsers.add_parser("score", help="score a file of UserActivityRequest JSON lines")
+    score_parser.add_argument("--input", required=True)
+    score_parser.add_argument("--output", default="-")
+    score_parser.add_argument("--chunk-size", type=int, default=FRAUD_STREAM_CHUNK_SIZE)
+    args = parser.parse_args()
+    
+    if args.command == "score":
+        warmup.load_all()
+        run_score_cli(args.input, args.output, args.chunk_size)
+    else:
+        import uvicorn
+        uvicorn.run(app, host="0.0.0.0", port=8002)
@@ -0,0 +1,118 @@
+import numpy as np
+from scipy.special import expit
+from typing import Tuple
+
+# Flat-array inference for the fraud ensemble. The fitted scaler, every
+# isolation tree and the logistic regression coefficients are exported into
+# plain NumPy arrays once per model bundle, and scoring walks all trees for
+# all rows together, one level per step, instead of going through sklearn's
+# per-estimator dispatch and input validation. Results match sklearn: trees
+# compare float32-rounded inputs against their float64 thresholds, exactly as
+# sklearn's tree.apply does, and the path-length formulas are the same.
+
+
+def average_path_length(n_samples):
+    # Average path length of an unsuccessful BST search over n samples, the
+    # normaliser used by isolation forests (same formula as sklearn)
+    n_samples = np.asarray(n_samples, dtype=np.float64)
+    lengths = np.zeros_like(n_samples)
+    lengths[n_samples == 2] = 1.0
+    large = n_samples > 2
+    lengths[large] = (2.0 * (np.log(n_samples[large] - 1.0) + np.euler_gamma)
+                      - 2.0 * (n_samples[large] - 1.0) / n_samples[large])
+    return lengths
+
+
+class CompiledFraudEnsemble:
+    def __init__(self, scaler, isolation_forest, logistic_regression):
+        self.mean = np.asarray(scaler.mean_, dtype=np.float64)
+        self.scale = np.asarray(scaler.scale_, dtype=np.float64)
+        self.lr_coef = np.asarray(logistic_regression.coef_[0], dtype=np.float64)
+        self.lr_intercept = float(logistic_regression.intercept_[0])
+        self.offset = float(isolation_forest.offset_)
+
+        # All trees concatenated into one node table. Features are mapped back
+        # to columns of the full matrix through estimators_features_. Leaves
+        # point at themselves, so extra steps past a leaf are no-ops.
+        features, thresholds, lefts, rights, leaf_depths, roots = [], [], [], [], [], []
+        start = 0
+        for estimator, estimator_features in zip(isolation_forest.estimators_,
+                                                 isolation_forest.estimators_features_):
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(n_nodes)
+
+            depths = np.zeros(n_nodes, dtype=np.float64)
+            for node in range(n_nodes):
+                if not is_leaf[node]:
+                    depths[tree.children_left[node]] = depths[node] + 1
+                    depths[tree.children_right[node]] = depths[node] + 1
+
+            features.append(np.where(is_leaf, 0, np.asarray(estimator_features)[np.maximum(tree.feature, 0)]))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(start + np.where(is_leaf, node_ids, tree.children_left))
+            rights.append(start + np.where(is_leaf, node_ids, tree.children_right))
+            # Path length credited to a row ending in this leaf: its depth
+            # plus the expected depth of the samples it did not isolate
+            leaf_depths.append(depths + average_path_length(tree.n_node_samples))
+            roots.append(start)
+            start += n_nodes
+
+        self.feature = np.concatenate(features).astype(np.intp)
+        self.threshold = np.concatenate(thresholds).astype(np.float64)
+        # children[2 * node] is the left child, children[2 * node + 1] the right
+        self.children = np.column_stack([np.concatenate(lefts), np.concatenate(rights)]).ravel().astype(np.intp)
+        self.leaf_depth = np.concatenate(leaf_depths)
+        self.roots = np.array(roots, dtype=np.intp)
+        self.max_depth = max(estimator.tree_.max_depth for estimator in isolation_forest.estimators_)
+        self.denominator = len(isolation_forest.estimators_) * float(
+            average_path_length([isolation_forest.max_samples_])[0]
+        )
+
+    def isolation_depths(self, features_scaled) -> np.ndarray:
+        # Summed path length over all trees for each row
+        rows = np.asarray(features_scaled, dtype=np.float32).astype(np.float64)
+        values = rows.ravel()
+        if len(rows) == 1:
+            # Single-request path: 1-D node vector, no row offsets
+            nodes = self.roots
+            for _ in range(self.max_depth):
+                nodes = self.children[2 * nodes + (values[self.feature[nodes]] > self.threshold[nodes])]
+            return self.leaf_depth[nodes].sum(keepdims=True)
+        row_starts = (np.arange(len(rows)) * rows.shape[1])[:, None]
+        nodes = np.broadcast_to(self.roots, (len(rows), len(self.roots)))
+        for _ in range(self.max_depth):
+            go_right = values[row_starts + self.feature[nodes]] > self.threshold[nodes]
+            nodes = self.children[2 * nodes + go_right]
+        return self.leaf_depth[nodes].sum(axis=1)
+
+    def score(self, features) -> Tuple[np.ndarray, np.ndarray]:
+        # (normalised isolation forest score, logistic regression probability)
+        features_scaled = (np.asarray(features, dtype=np.float64) - self.mean) / self.scale
+
+        depths = self.isolation_depths(features_scaled)
+        if self.denominator != 0:
+            isolation_scores = -(2 ** (-depths / self.denominator)) - self.offset
+        else:
+            isolation_scores = np.full(len(depths), -0.5 - self.offset)
+        isolation_scores_normalized = (1 - (isolation_scores + 1) / 2)
+
+        lr_probabilities = expit(features_scaled @ self.lr_coef + self.lr_intercept)
+        return isolation_scores_normalized, lr_probabilities
+
+
+def parity_error(compiled: CompiledFraudEnsemble, sklearn_score, features) -> float:
+    # Largest absolute difference between the flat-array path and sklearn
+    # on features; sklearn_score returns the same pair as compiled.score
+    fast = compiled.score(features)
+    reference = sklearn_score(features)
+    return float(max(np.max(np.abs(a - b)) for a, b in zip(fast, reference)))
+
+
+def parity_probe(scaler, n_rows=512, seed=0) -> np.ndarray:
+    # Rows spread around the training distribution, including outliers well
+    # beyond it, for checking a compiled ensemble against sklearn
+    rng = np.random.default_rng(seed)
+    spread = rng.standard_normal((n_rows, len(scaler.mean_))) * rng.choice([0.5, 1.0, 3.0, 8.0], (n_rows, 1))
+    return scaler.mean_ + spread * scaler.scale_
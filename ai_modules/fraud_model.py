@@ -0,0 +1,348 @@
+import argparse
+import datetime
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import threading
+import numpy as np
+from typing import Callable, Dict, Optional
+from fraud_fastpath import CompiledFraudEnsemble, parity_error, parity_probe
+
+logger = logging.getLogger(__name__)
+
+# Versioned fraud model bundles. The training CLI fits the scaler, isolation
+# forest and logistic regression once and writes them, with the feature
+# schema, status thresholds and a checksum, to
+#
+#   {model_dir}/{version}/models.joblib
+#   {model_dir}/{version}/manifest.json
+#   {model_dir}/LATEST                    name of the live version
+#
+# Every worker loads the same bundle instead of training its own, and
+# FraudModelReloader swaps a new version in when LATEST changes.
+#
+#   python fraud_model.py --data activity.csv --label-column is_fraud
+#   python fraud_model.py --synthetic
+
+# Column order of the feature matrix the models are trained on
+FEATURE_NAMES = [
+    "logins_per_day",
+    "bids_per_day",
+    "bid_to_project_ratio",
+    "payment_amount",
+    "login_time_variance",
+    "ip_address_count",
+    "failed_login_attempts"
+]
+
+# fraud_score below "suspicious" is normal, at or above "flagged" is flagged
+DEFAULT_THRESHOLDS = {"suspicious": 0.3, "flagged": 0.7}
+DEFAULT_WEIGHTS = {"isolation_forest": 0.6, "logistic_regression": 0.4}
+
+# Score through the flat-array engine in fraud_fastpath.py; FRAUD_FAST_PATH=0
+# uses sklearn directly. Each bundle is checked against sklearn when loaded
+# and falls back to it if the two differ by more than FAST_PATH_TOLERANCE.
+FRAUD_FAST_PATH = os.environ.get("FRAUD_FAST_PATH", "1") != "0"
+FAST_PATH_TOLERANCE = 1e-9
+# The fast path wins on request-sized inputs; past about a thousand rows
+# sklearn's per-tree Cython loop is as fast, so large batches go there
+FAST_PATH_MAX_ROWS = int(os.environ.get("FRAUD_FAST_PATH_MAX_ROWS", "1024"))
+
+
+class FraudModelBundle:
+    def __init__(self, scaler, isolation_forest, logistic_regression, manifest: Dict):
+        self.scaler = scaler
+        self.isolation_forest = isolation_forest
+        self.logistic_regression = logistic_regression
+        self.manifest = manifest
+        self.thresholds = manifest["thresholds"]
+        self.weights = manifest["weights"]
+        self.compiled = None
+        self.parity_error = None
+        if FRAUD_FAST_PATH:
+            self._compile()
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    def _compile(self):
+        try:
+            compiled = CompiledFraudEnsemble(self.scaler, self.isolation_forest, self.logistic_regression)
+            self.parity_error = parity_error(compiled, self.sklearn_score, parity_probe(self.scaler))
+        except Exception as e:
+            logger.warning("Fraud model %s: fast path unavailable, using sklearn: %s", self.version, e)
+            return
+        if self.parity_error > FAST_PATH_TOLERANCE:
+            logger.warning("Fraud model %s: fast path differs from sklearn by %.3g, using sklearn",
+                           self.version, self.parity_error)
+            return
+        self.compiled = compiled
+
+    def sklearn_score(self, features):
+        # One scaler/decision_function/predict_proba call for the whole matrix
+        features_scaled = self.scaler.transform(features)
+
+        # Get Isolation Forest score (-1 to 1, where lower is more anomalous)
+        isolation_scores = self.isolation_forest.decision_function(features_scaled)
+        # Convert to 0-1 scale where higher means more likely to be fraud
+        isolation_scores_normalized = (1 - (isolation_scores + 1) / 2)
+
+        # Get Logistic Regression probability
+        lr_probabilities = self.logistic_regression.predict_proba(features_scaled)[:, 1]
+        return isolation_scores_normalized, lr_probabilities
+
+    def score(self, features):
+        # sklearn rejects NaN and infinity; the fast path must too, rather
+        # than routing them down arbitrary branches
+        if not np.isfinite(features).all():
+            raise ValueError("Input contains NaN or infinity")
+        if self.compiled is not None and len(features) <= FAST_PATH_MAX_ROWS:
+            isolation_scores_normalized, lr_probabilities = self.compiled.score(features)
+        else:
+            isolation_scores_normalized, lr_probabilities = self.sklearn_score(features)
+
+        # Ensemble the scores (weighted average)
+        fraud_scores = (self.weights["isolation_forest"] * isolation_scores_normalized +
+                        self.weights["logistic_regression"] * lr_probabilities)
+
+        # Determine status
+        statuses = np.where(fraud_scores < self.thresholds["suspicious"], "normal",
+                            np.where(fraud_scores < self.thresholds["flagged"], "suspicious", "flagged"))
+        return fraud_scores, lr_probabilities, isolation_scores_normalized, statuses
+
+
+def synthetic_training_data():
+    # The mock historical data the service used to train on at import
+    rng = np.random.RandomState(42)
+    n_samples = 1000
+
+    # Generate normal user behavior
+    X_normal = np.column_stack([
+        rng.poisson(3, n_samples),
+        rng.poisson(5, n_samples),
+        rng.normal(0.3, 0.1, n_samples),
+        rng.normal(5000, 1000, n_samples),
+        rng.normal(3, 1, n_samples),
+        rng.poisson(2, n_samples),
+        rng.poisson(0.5, n_samples)
+    ])
+
+    # Generate fraudulent behavior
+    X_fraud = np.column_stack([
+        rng.poisson(10, n_samples // 10),
+        rng.poisson(20, n_samples // 10),
+        rng.normal(0.8, 0.1, n_samples // 10),
+        rng.normal(15000, 5000, n_samples // 10),
+        rng.normal(12, 3, n_samples // 10),
+        rng.poisson(8, n_samples // 10),
+        rng.poisson(5, n_samples // 10)
+    ])
+
+    # Create labels (0 for normal, 1 for fraud)
+    X = np.vstack([X_normal, X_fraud])
+    y = np.hstack([np.zeros(n_samples), np.ones(n_samples // 10)])
+    return X, y
+
+
+def load_training_data(path, label_column):
+    import pandas as pd
+    if path.endswith(".parquet"):
+        data = pd.read_parquet(path)
+    else:
+        data = pd.read_csv(path)
+    missing = [column for column in FEATURE_NAMES + [label_column] if column not in data.columns]
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(missing)}")
+    return data[FEATURE_NAMES].to_numpy(dtype=np.float64), data[label_column].to_numpy(dtype=np.float64)
+
+
+def train_bundle(X, y, version=None, source="synthetic", contamination=0.1, random_state=42) -> FraudModelBundle:
+    from sklearn.ensemble import IsolationForest
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import StandardScaler
+
+    # Scale features
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+
+    # Train Isolation Forest
+    isolation_forest = IsolationForest(contamination=contamination, random_state=random_state)
+    isolation_forest.fit(X_scaled)
+
+    # Train Logistic Regression
+    logistic_regression = LogisticRegression(random_state=random_state)
+    logistic_regression.fit(X_scaled, y)
+
+    import sklearn
+    created_at = datetime.datetime.now(datetime.timezone.utc)
+    manifest = {
+        "version": version or created_at.strftime("%Y%m%dT%H%M%SZ"),
+        "created_at": created_at.isoformat(),
+        "features": [{"name": name, "dtype": "float64"} for name in FEATURE_NAMES],
+        "thresholds": dict(DEFAULT_THRESHOLDS),
+        "weights": dict(DEFAULT_WEIGHTS),
+        "training": {
+            "source": source,
+            "samples": int(len(X)),
+            "fraud_rate": float(np.mean(y)),
+            "contamination": contamination,
+            "random_state": random_state,
+        },
+        "sklearn_version": sklearn.__version__,
+    }
+    return FraudModelBundle(scaler, isolation_forest, logistic_regression, manifest)
+
+
+def _sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def save_bundle(bundle: FraudModelBundle, model_dir, make_latest=True) -> str:
+    import joblib
+    final_dir = os.path.join(model_dir, bundle.version)
+    if os.path.exists(final_dir):
+        raise ValueError(f"Fraud model version {bundle.version} already exists in {model_dir}")
+
+    # Write into a hidden directory and rename it into place, so a reader
+    # never sees a half-written bundle
+    tmp_dir = os.path.join(model_dir, f".{bundle.version}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    models_path = os.path.join(tmp_dir, "models.joblib")
+    joblib.dump({
+        "scaler": bundle.scaler,
+        "isolation_forest": bundle.isolation_forest,
+        "logistic_regression": bundle.logistic_regression,
+    }, models_path)
+    bundle.manifest["checksum"] = {"models.joblib": _sha256(models_path)}
+    with open(os.path.join(tmp_dir, "manifest.json"), "w") as f:
+        json.dump(bundle.manifest, f, indent=2)
+    os.rename(tmp_dir, final_dir)
+
+    if make_latest:
+        latest_path = os.path.join(model_dir, "LATEST")
+        with open(f"{latest_path}.tmp", "w") as f:
+            f.write(bundle.version + "\n")
+        os.replace(f"{latest_path}.tmp", latest_path)
+    return final_dir
+
+
+def latest_version(model_dir) -> Optional[str]:
+    try:
+        with open(os.path.join(model_dir, "LATEST")) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_bundle(model_dir, version) -> FraudModelBundle:
+    # joblib unpickles, so bundles are only ever read from our own model_dir
+    import joblib
+    bundle_dir = os.path.join(model_dir, version)
+    with open(os.path.join(bundle_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    if [feature["name"] for feature in manifest["features"]] != FEATURE_NAMES:
+        raise ValueError(f"Fraud model {version} was trained on a different feature schema")
+    models_path = os.path.join(bundle_dir, "models.joblib")
+    if _sha256(models_path) != manifest["checksum"]["models.joblib"]:
+        raise ValueError(f"Fraud model {version} failed its checksum")
+    models = joblib.load(models_path)
+    return FraudModelBundle(models["scaler"], models["isolation_forest"], models["logistic_regression"], manifest)
+
+
+class FraudModelReloader:
+    # Holds the live bundle and checks LATEST every interval_seconds on a
+    # daemon thread. A new version is loaded and verified off the request
+    # path, then swapped in with one assignment; requests already scoring
+    # keep the bundle they started with. Without any bundle on disk the
+    # fallback (e.g. training on synthetic data) is used.
+    def __init__(self, model_dir, interval_seconds: float, fallback: Optional[Callable] = None):
+        self._model_dir = model_dir
+        self._interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.loaded_at = None
+        version = latest_version(model_dir)
+        if version is None and fallback is None:
+            raise FileNotFoundError(f"No fraud model bundle in {model_dir}")
+        if version is None:
+            logger.warning("No fraud model bundle in %s; using the fallback model", model_dir)
+            self._swap(fallback())
+        else:
+            self._swap(load_bundle(model_dir, version))
+
+    def _swap(self, bundle):
+        self.bundle = bundle
+        self.loaded_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+    def reload(self) -> bool:
+        # True when a new version was swapped in
+        with self._lock:
+            version = latest_version(self._model_dir)
+            if version is None or version == self.bundle.version:
+                return False
+            self._swap(load_bundle(self._model_dir, version))
+            logger.info("Fraud model %s is live", version)
+            return True
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="fraud-model-reload", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self._interval_seconds):
+            try:
+                self.reload()
+            except Exception as e:
+                # Keep serving the current bundle; the next check retries
+                logger.exception("Fraud model reload failed: %s", e)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Train a fraud model bundle")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--data", help="CSV or Parquet file with the feature columns and a label column")
+    source.add_argument("--synthetic", action="store_true", help="train on the built-in mock data")
+    parser.add_argument("--label-column", default="is_fraud")
+    parser.add_argument("--model-dir", default=os.environ.get(
+        "FRAUD_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "fraud_models")))
+    parser.add_argument("--version", help="defaults to the UTC training time")
+    parser.add_argument("--contamination", type=float, default=0.1)
+    parser.add_argument("--random-state", type=int, default=42)
+    parser.add_argument("--no-promote", action="store_true", help="write the bundle without updating LATEST")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        X, y = synthetic_training_data()
+        source_name = "synthetic"
+    else:
+        try:
+            X, y = load_training_data(args.data, args.label_column)
+        except ValueError as e:
+            sys.exit(str(e))
+        source_name = f"{os.path.basename(args.data)} sha256:{_sha256(args.data)}"
+
+    bundle = train_bundle(X, y, args.version, source_name, args.contamination, args.random_state)
+    try:
+        path = save_bundle(bundle, args.model_dir, make_latest=not args.no_promote)
+    except ValueError as e:
+        sys.exit(str(e))
+    logger.info("Wrote fraud model %s to %s", bundle.version, path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+import json
+import logging
+import threading
+import time
+import urllib.request
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Queued scoring for callers that should not wait on the model. submit()
+# returns a job id at once, or raises QueueFull when the job's lane is at
+# capacity. A pool of worker threads drains the lanes in micro-batches,
+# always taking from the highest-priority lane first, so payment checks jump
+# ahead of bulk re-scoring. Finished jobs are kept for result_ttl_seconds for
+# polling by id, and are POSTed as JSON to the job's callback_url if one
+# was given. Callback URLs must be registered in allowed_callbacks, and
+# redirects are not followed, so jobs cannot be used to reach other hosts.
+
+
+class QueueFull(Exception):
+    pass
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_webhook_opener = urllib.request.build_opener(_NoRedirect)
+
+
+class _Job:
+    __slots__ = ("id", "lane", "payload", "callback_url", "submitted_at", "started_at", "finished_at",
+                 "status", "result", "error", "webhook_status")
+
+    def __init__(self, lane, payload, callback_url):
+        self.id = uuid.uuid4().hex
+        self.lane = lane
+        self.payload = payload
+        self.callback_url = callback_url
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.webhook_status = None
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "priority": self.lane,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "webhook_status": self.webhook_status,
+        }
+
+
+def _percentiles(samples):
+    if not samples:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    ordered = sorted(samples)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+    return {"p50_ms": pick(0.5), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+class ScoringQueue:
+    def __init__(self, score_fn: Callable[[List], Sequence], lanes=("payment", "rescore"), max_depth=10000,
+                 workers=2, max_batch_size=256, max_wait_ms=2.0, result_ttl_seconds=600,
+                 webhook_timeout_seconds=5.0, webhook_retries=3, allowed_callbacks: Sequence[str] = ()):
+        # lanes are listed highest priority first; max_depth applies per lane
+        self._score_fn = score_fn
+        self.lanes = tuple(lanes)
+        self.max_depth = max_depth
+        self.workers = workers
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.result_ttl_seconds = result_ttl_seconds
+        self.webhook_timeout_seconds = webhook_timeout_seconds
+        self.webhook_retries = webhook_retries
+        self.allowed_callbacks = frozenset(allowed_callbacks)
+        self._queues: Dict[str, deque] = {lane: deque() for lane in self.lanes}
+        self._jobs: "OrderedDict[str, _Job]" = OrderedDict()
+        # (finished_at, job id) in completion order, for expiry
+        self._finished: deque = deque()
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stop = False
+        self._webhooks = ThreadPoolExecutor(max_workers=4, thread_name_prefix="fraud-webhook")
+        # Recent per-lane timings: time spent queued and submit-to-result
+        self._wait_seconds = {lane: deque(maxlen=2048) for lane in self.lanes}
+        self._latency_seconds = {lane: deque(maxlen=2048) for lane in self.lanes}
+        self.submitted = {lane: 0 for lane in self.lanes}
+        self.rejected = {lane: 0 for lane in self.lanes}
+        self.completed = 0
+        self.failed = 0
+        self.batches = 0
+        self.webhooks_sent = 0
+        self.webhooks_failed = 0
+
+    def start(self):
+        with self._condition:
+            if self._threads:
+                return
+            self._stop = False
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"fraud-queue-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self):
+        with self._condition:
+            self._stop = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def submit(self, payload: Any, lane: Optional[str] = None, callback_url: Optional[str] = None) -> _Job:
+        lane = lane or self.lanes[0]
+        if lane not in self._queues:
+            raise ValueError(f"Unknown priority '{lane}', expected one of {', '.join(self.lanes)}")
+        if callback_url is not None and callback_url not in self.allowed_callbacks:
+            raise ValueError("callback_url is not a registered webhook")
+        self.start()
+        job = _Job(lane, payload, callback_url)
+        with self._condition:
+            if len(self._queues[lane]) >= self.max_depth:
+                self.rejected[lane] += 1
+                raise QueueFull(f"The {lane} queue is full ({self.max_depth} jobs)")
+            self._queues[lane].append(job)
+            self._jobs[job.id] = job
+            self.submitted[lane] += 1
+            self._expire_jobs()
+            self._condition.notify()
+        return job
+
+    def get(self, job_id: str) -> Optional[_Job]:
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def depth(self, lane: Optional[str] = None) -> int:
+        if lane is not None:
+            return len(self._queues[lane])
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _expire_jobs(self):
+        # Finished jobs expire in completion order, however long older jobs
+        # still wait in a starved lane
+        cutoff = time.time() - self.result_ttl_seconds
+        while self._finished and self._finished[0][0] <= cutoff:
+            _, job_id = self._finished.popleft()
+            self._jobs.pop(job_id, None)
+
+    def _take_batch(self) -> List[_Job]:
+        # Called with the condition held: fills a batch from the lanes in
+        # priority order, lingering up to max_wait_ms for it to fill
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        batch = []
+        while True:
+            for lane in self.lanes:
+                queue = self._queues[lane]
+                while queue and len(batch) < self.max_batch_size:
+                    batch.append(queue.popleft())
+            if len(batch) >= self.max_batch_size or self._stop:
+                return batch
+            if batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return batch
+                self._condition.wait(remaining)
+            else:
+                self._condition.wait()
+                deadline = time.monotonic() + self.max_wait_ms / 1000
+
+    def _run(self):
+        while True:
+            with self._condition:
+                batch = self._take_batch()
+                if not batch and self._stop:
+                    return
+            if not batch:
+                continue
+
+            started = time.time()
+            for job in batch:
+                job.started_at = started
+                job.status = "running"
+                self._wait_seconds[job.lane].append(started - job.submitted_at)
+            try:
+                results = self._score_fn([job.payload for job in batch])
+                error = None
+            except Exception as e:
+                logger.exception("Error scoring queued fraud batch: %s", e)
+                results, error = [None] * len(batch), str(e)
+
+            finished = time.time()
+            with self._condition:
+                self.batches += 1
+                for job, result in zip(batch, results):
+                    job.finished_at = finished
+                    job.result = result
+                    job.error = error
+                    job.status = "failed" if error else "done"
+                    self._finished.append((finished, job.id))
+                    self._latency_seconds[job.lane].append(finished - job.submitted_at)
+                    if error:
+                        self.failed += 1
+                    else:
+                        self.completed += 1
+                self._expire_jobs()
+            for job in batch:
+                if job.callback_url:
+                    self._webhooks.submit(self._send_webhook, job)
+
+    def _send_webhook(self, job: _Job):
+        body = json.dumps(job.to_dict()).encode("utf-8")
+        for attempt in range(self.webhook_retries):
+            request = urllib.request.Request(
+                job.callback_url, data=body, headers={"Content-Type": "application/json"}, method="POST"
+            )
+            try:
+                with _webhook_opener.open(request, timeout=self.webhook_timeout_seconds) as response:
+                    job.webhook_status = response.status
+                with self._condition:
+                    self.webhooks_sent += 1
+                return
+            except Exception as e:
+                job.webhook_status = f"error: {e}"
+                if attempt + 1 < self.webhook_retries:
+                    time.sleep(0.5 * 2 ** attempt)
+        with self._condition:
+            self.webhooks_failed += 1
+        logger.warning("Error delivering fraud job %s to %s: %s", job.id, job.callback_url, job.webhook_status)
+
+    def stats(self):
+        with self._condition:
+            lanes = {
+                lane: {
+                    "depth": len(self._queues[lane]),
+                    "submitted": self.submitted[lane],
+                    "rejected": self.rejected[lane],
+                    "queue_wait": _percentiles(self._wait_seconds[lane]),
+                    "latency": _percentiles(self._latency_seconds[lane]),
+                }
+                for lane in self.lanes
+            }
+            return {
+                "lanes": lanes,
+                "depth": self.depth(),
+                "max_depth_per_lane": self.max_depth,
+                "workers": self.workers,
+                "max_batch_size": self.max_batch_size,
+                "batches": self.batches,
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_batch_size": (self.completed + self.failed) / self.batches if self.batches else 0.0,
+                "tracked_jobs": len(self._jobs),
+                "webhooks_sent": self.webhooks_sent,
+                "webhooks_failed": self.webhooks_failed,
+            }
@@ -0,0 +1,205 @@
+import hashlib
+import heapq
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from typing import BinaryIO, Dict, List, Optional, Set, Tuple
+
+# Content-addressed cache of per-image model outputs for skill verification.
+# Lookups try the exact tier first (SHA-256 of the uploaded bytes), then a
+# near-duplicate tier on a 64-bit dHash. The near-duplicate tier catches
+# re-encoded, resized or lightly edited copies of the same image. It uses
+# multi-index hashing: the hash is split into max_distance + 1 chunks and
+# each chunk value is indexed. Two hashes within max_distance bits of each
+# other must agree exactly on at least one chunk, so only entries sharing a
+# chunk are compared bit by bit. Each entry also records the accounts that
+# uploaded the image, which is how cross-account reuse is reported.
+
+EVICTION_POLICIES = ("lru", "lfu")
+
+# Accounts remembered per image; reuse counts saturate here
+MAX_ACCOUNTS_PER_IMAGE = 1000
+
+
+def dhash(img, hash_size=8) -> int:
+    # Difference hash: one bit per horizontally adjacent pixel pair of a
+    # (hash_size + 1) x hash_size greyscale thumbnail
+    pixels = np.asarray(img.convert("L").resize((hash_size + 1, hash_size)), dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class _Entry:
+    __slots__ = ("sha256", "dhash", "outputs", "expires", "hits", "accounts")
+
+    def __init__(self, sha256, image_hash, outputs, expires):
+        self.sha256 = sha256
+        self.dhash = image_hash
+        self.outputs = outputs
+        self.expires = expires
+        self.hits = 0
+        self.accounts: Set[int] = set()
+
+
+class ImageResultCache:
+    def __init__(self, max_entries=20000, ttl_seconds=86400.0, policy="lru", max_distance=6, hash_bits=64):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy '{policy}', expected one of {', '.join(EVICTION_POLICIES)}")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.policy = policy
+        self.max_distance = max_distance
+        self.hash_bits = hash_bits
+        # Chunk boundaries for multi-index hashing; max_distance 0 disables
+        # the near-duplicate tier
+        n_chunks = max_distance + 1
+        edges = [round(i * hash_bits / n_chunks) for i in range(n_chunks + 1)]
+        self._chunks = [(start, (1 << (end - start)) - 1) for start, end in zip(edges, edges[1:])]
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._index: List[Dict[int, Set[str]]] = [{} for _ in self._chunks]
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def sha256(source: BinaryIO) -> str:
+        # Hashes a seekable file in chunks and rewinds it for decoding
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: source.read(1 << 16), b""):
+            digest.update(chunk)
+        source.seek(0)
+        return digest.hexdigest()
+
+    def _chunk_values(self, image_hash):
+        return [(image_hash >> start) & mask for start, mask in self._chunks]
+
+    def _remove(self, sha256):
+        entry = self._entries.pop(sha256)
+        for table, value in zip(self._index, self._chunk_values(entry.dhash)):
+            keys = table.get(value)
+            if keys is not None:
+                keys.discard(sha256)
+                if not keys:
+                    del table[value]
+
+    def _live(self, sha256, now) -> Optional[_Entry]:
+        entry = self._entries.get(sha256)
+        if entry is not None and entry.expires <= now:
+            self._remove(sha256)
+            self.expirations += 1
+            return None
+        return entry
+
+    def _hit(self, entry: _Entry, account):
+        entry.hits += 1
+        if account is not None and len(entry.accounts) < MAX_ACCOUNTS_PER_IMAGE:
+            entry.accounts.add(account)
+        self._entries.move_to_end(entry.sha256)
+
+    def get_exact(self, sha256: str, account: Optional[int] = None) -> Optional[np.ndarray]:
+        with self._lock:
+            entry = self._live(sha256, time.monotonic())
+            if entry is None:
+                return None
+            self.exact_hits += 1
+            self._hit(entry, account)
+            return entry.outputs
+
+    def get_near(self, image_hash: int, account: Optional[int] = None) -> Optional[Tuple[np.ndarray, int]]:
+        # (outputs, distance) of the closest entry within max_distance bits;
+        # counts a miss when there is none, so call after get_exact
+        now = time.monotonic()
+        with self._lock:
+            best, best_distance = None, self.max_distance + 1
+            if self.max_distance > 0:
+                candidates = set()
+                for table, value in zip(self._index, self._chunk_values(image_hash)):
+                    candidates.update(table.get(value, ()))
+                for sha256 in candidates:
+                    entry = self._live(sha256, now)
+                    if entry is None:
+                        continue
+                    distance = hamming(entry.dhash, image_hash)
+                    if distance < best_distance:
+                        best, best_distance = entry, distance
+            if best is None:
+                self.misses += 1
+                return None
+            self.near_hits += 1
+            self._hit(best, account)
+            return best.outputs, best_distance
+
+    def put(self, sha256: str, image_hash: int, outputs, account: Optional[int] = None):
+        with self._lock:
+            if sha256 in self._entries:
+                self._remove(sha256)
+            entry = _Entry(sha256, image_hash, np.asarray(outputs), time.monotonic() + self.ttl_seconds)
+            if account is not None:
+                entry.accounts.add(account)
+            self._entries[sha256] = entry
+            for table, value in zip(self._index, self._chunk_values(image_hash)):
+                table.setdefault(value, set()).add(sha256)
+            if len(self._entries) > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        if self.policy == "lru":
+            victims = [next(iter(self._entries))]
+        else:
+            # LFU evicts the least-hit 5% at once so the scan is amortised
+            # over many inserts; ties go to the least recently used. The
+            # entry just inserted has no hits yet and is never a victim, or
+            # a full cache would drop every new image before its first hit.
+            count = max(1, self.max_entries // 20)
+            order = {sha256: position for position, sha256 in enumerate(self._entries)}
+            newest = next(reversed(self._entries))
+            candidates = [sha256 for sha256 in self._entries if sha256 != newest] or [newest]
+            victims = heapq.nsmallest(count, candidates,
+                                      key=lambda sha256: (self._entries[sha256].hits, order[sha256]))
+        for sha256 in victims:
+            self._remove(sha256)
+            self.evictions += 1
+
+    def reuse_report(self, min_accounts=2, limit=100) -> List[Dict]:
+        # Images uploaded by at least min_accounts distinct accounts, most
+        # widely shared first
+        with self._lock:
+            shared = [entry for entry in self._entries.values() if len(entry.accounts) >= min_accounts]
+            shared.sort(key=lambda entry: len(entry.accounts), reverse=True)
+            return [
+                {
+                    "sha256": entry.sha256,
+                    "dhash": f"{entry.dhash:016x}",
+                    "accounts": len(entry.accounts),
+                    "account_ids": sorted(entry.accounts)[:20],
+                    "hits": entry.hits,
+                }
+                for entry in shared[:limit]
+            ]
+
+    def stats(self):
+        lookups = self.exact_hits + self.near_hits + self.misses
+        with self._lock:
+            reused = sum(1 for entry in self._entries.values() if len(entry.accounts) >= 2)
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "policy": self.policy,
+            "max_distance": self.max_distance,
+            "exact_hits": self.exact_hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": (self.exact_hits + self.near_hits) / lookups if lookups else 0.0,
+            "images_reused_across_accounts": reused,
+        }
@@ -0,0 +1,125 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+from typing import Callable, Dict, Tuple
+from ranking import top_k_rows
+
+# Cohort assignment for the mentor matcher: every mentee in a cohort gets at
+# most one mentor, and no mentor gets more mentees than they have capacity
+# for. Together these choices maximise the total match score.
+#
+# Scoring the full cohort x mentor matrix is cheap, but solving over all of
+# it is not. Each mentee therefore keeps only its top-K eligible mentors as
+# candidate edges. Each mentor is expanded into one column per free slot,
+# and each mentee gets a private "unassigned" column. The result is a
+# sparse rectangular assignment problem. scipy's LAPJVsp
+# (min_weight_full_bipartite_matching) solves it exactly over the candidate
+# edges. Slot s of a mentor costs load_penalty * s extra, which spreads
+# mentees across mentors when scores are close. A mentor never gets more
+# slot columns than it has candidate mentees, so the graph stays small
+# when capacities are generous.
+
+
+def mentor_capacities(store, hours_per_mentee: float, max_mentees: int) -> np.ndarray:
+    # Free slots per mentor: whole blocks of hours_per_mentee in their weekly
+    # availability, capped by how many more mentees they can take on
+    by_hours = np.floor(store.availability_hours_per_week / hours_per_mentee).astype(np.int64)
+    remaining = max_mentees - store.mentees_count.astype(np.int64)
+    return np.clip(np.minimum(by_hours, remaining), 0, None)
+
+
+def candidate_edges(score_block: Callable[[int, int], np.ndarray], n_mentees: int, k: int,
+                    block_size=1024) -> Tuple[np.ndarray, np.ndarray]:
+    # Top-k mentors per mentee as (n_mentees, k) mentor rows and scores.
+    # score_block(start, end) returns the scores of mentees [start, end)
+    # against every mentor, with -inf for ineligible pairs; those come back
+    # with a -inf score and must be ignored.
+    candidates, scores = [], []
+    for start in range(0, n_mentees, block_size):
+        rows, block_scores = top_k_rows(score_block(start, min(start + block_size, n_mentees)), k)
+        candidates.append(rows)
+        scores.append(block_scores)
+    if not candidates:
+        return np.empty((0, k), dtype=np.int64), np.empty((0, k), dtype=np.float32)
+    return np.vstack(candidates), np.vstack(scores)
+
+
+def solve_assignment(candidates: np.ndarray, candidate_scores: np.ndarray, capacities: np.ndarray,
+                     min_score=0.0, load_penalty=0.0) -> Tuple[np.ndarray, np.ndarray]:
+    # Optimal capacity-constrained assignment over the candidate edges.
+    # Returns each mentee's mentor row (-1 when unassigned) and its score.
+    # Leaving a mentee unassigned is worth min_score, so edges scoring below
+    # it are never used.
+    n_mentees = len(candidates)
+    assignment = np.full(n_mentees, -1, dtype=np.int64)
+    assigned_scores = np.full(n_mentees, np.nan)
+    valid = np.isfinite(candidate_scores) & (candidate_scores >= min_score)
+    edge_mentees = np.nonzero(valid)[0]
+    edge_mentors = candidates[valid]
+    edge_scores = candidate_scores[valid].astype(np.float64)
+    capacities = np.minimum(capacities, np.bincount(edge_mentors, minlength=len(capacities)))
+    keep = capacities[edge_mentors] > 0
+    edge_mentees, edge_mentors, edge_scores = edge_mentees[keep], edge_mentors[keep], edge_scores[keep]
+    if len(edge_scores) == 0:
+        return assignment, assigned_scores
+
+    # One column per (mentor, slot): repeat each edge once per slot of its mentor
+    slot_offsets = np.concatenate([[0], np.cumsum(capacities)])
+    n_slots = int(slot_offsets[-1])
+    repeats = capacities[edge_mentors]
+    slot_edges = np.repeat(np.arange(len(edge_scores)), repeats)
+    slot_index = np.arange(len(slot_edges)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+
+    # Costs are shifted to be strictly positive: LAPJVsp treats zero as "no edge"
+    ceiling = max(float(edge_scores.max()), min_score) + 1.0
+    rows = np.concatenate([edge_mentees[slot_edges], np.arange(n_mentees)])
+    columns = np.concatenate([slot_offsets[edge_mentors[slot_edges]] + slot_index,
+                              n_slots + np.arange(n_mentees)])
+    costs = np.concatenate([ceiling - edge_scores[slot_edges] + load_penalty * slot_index,
+                            np.full(n_mentees, ceiling - min_score)])
+    graph = sp.csr_matrix((costs, (rows, columns)), shape=(n_mentees, n_slots + n_mentees))
+
+    matched_rows, matched_columns = min_weight_full_bipartite_matching(graph)
+    slot_mentors = np.repeat(np.arange(len(capacities)), capacities)
+    to_slot = matched_columns < n_slots
+    mentees, mentors = matched_rows[to_slot], slot_mentors[matched_columns[to_slot]]
+    assignment[mentees] = mentors
+    positions = np.argmax(candidates[mentees] == mentors[:, None], axis=1)
+    assigned_scores[mentees] = candidate_scores[mentees, positions]
+    return assignment, assigned_scores
+
+
+def greedy_assignment(candidates: np.ndarray, candidate_scores: np.ndarray, capacities=None,
+                      min_score=0.0) -> Tuple[np.ndarray, np.ndarray]:
+    # Baselines: every mentee takes its best candidate, as /match-mentors
+    # recommends one mentee at a time. With capacities, mentees are served
+    # in cohort order and take their best mentor that still has a free slot.
+    n_mentees = len(candidates)
+    assignment = np.full(n_mentees, -1, dtype=np.int64)
+    assigned_scores = np.full(n_mentees, np.nan)
+    remaining = None if capacities is None else np.array(capacities, dtype=np.int64)
+    for i in range(n_mentees):
+        for mentor, score in zip(candidates[i].tolist(), candidate_scores[i].tolist()):
+            if not score >= min_score:
+                break
+            if remaining is None or remaining[mentor] > 0:
+                if remaining is not None:
+                    remaining[mentor] -= 1
+                assignment[i], assigned_scores[i] = mentor, score
+                break
+    return assignment, assigned_scores
+
+
+def assignment_report(assignment: np.ndarray, assigned_scores: np.ndarray, capacities: np.ndarray) -> Dict:
+    assigned = assignment >= 0
+    loads = np.bincount(assignment[assigned], minlength=len(capacities))
+    return {
+        "assigned": int(assigned.sum()),
+        "unassigned": int((~assigned).sum()),
+        "total_score": float(np.nansum(assigned_scores)),
+        "mean_score": float(np.nanmean(assigned_scores)) if assigned.any() else 0.0,
+        "mentors_used": int((loads > 0).sum()),
+        "max_load": int(loads.max(initial=0)),
+        "over_capacity_mentors": int((loads > capacities).sum()),
+        "over_capacity_mentees": int(np.clip(loads - capacities, 0, None).sum()),
+    }
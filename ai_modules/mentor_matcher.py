@@ -1,16 +1,59 @@
+import asyncio
+import os
 import numpy as np
 import pandas as pd
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
 import fastapi
-from fastapi import FastAPI, Body
-from pydantic import BaseModel
-from typing import List, Dict, Optional
+from fastapi import FastAPI, Body, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from typing import List, Dict, Optional, Any
+from embedding_cache import EmbeddingCache
+from micro_batcher import MicroBatcher
+from ranking import rank
+from embedding_store import load_or_build_store, normalize
+from model_loader import ServiceWarmup, add_health_routes, configure_logging
+from mentor_store import MentorStore
+from attribute_table import AttributeTable, max_similarity
+from mentor_assignment import (mentor_capacities, candidate_edges, solve_assignment, greedy_assignment,
+                               assignment_report)
 
 app = FastAPI(title="Mentor-Mentee Matching API")
 
+# Models and precomputed embeddings load on a background thread after
+# startup; /health/ready reports when they are in place
+warmup = ServiceWarmup("mentor_matcher")
+
 # Load BERT model for text embeddings
-bert_model = SentenceTransformer('paraphrase-MiniLM-L6-v2')
+MODEL_NAME = 'paraphrase-MiniLM-L6-v2'
+
+def load_bert_model():
+    # Deferred import: sentence_transformers pulls in torch
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(MODEL_NAME)
+
+bert_model = warmup.resource("bert_model", load_bert_model)
+
+def encode_texts(texts):
+    return bert_model.get().encode(texts)
+
+# Cache for request-time encodes; set EMBEDDING_CACHE_DIR to keep a float16
+# copy on disk that survives restarts (at most 2 x EMBEDDING_CACHE_DISK_MAX_ROWS
+# vectors per model)
+EMBEDDING_CACHE_DIR = os.environ.get("EMBEDDING_CACHE_DIR")
+embedding_cache = EmbeddingCache(
+    max_entries=int(os.environ.get("EMBEDDING_CACHE_SIZE", "10000")),
+    ttl_seconds=float(os.environ.get("EMBEDDING_CACHE_TTL_SECONDS", "3600")),
+    disk_dir=os.path.join(EMBEDDING_CACHE_DIR, "mentor_matcher") if EMBEDDING_CACHE_DIR else None,
+    disk_max_rows=int(os.environ.get("EMBEDDING_CACHE_DISK_MAX_ROWS", "100000")),
+)
+
+# Request-time encodes from concurrent handlers are batched into one
+# bert_model.encode call on a worker thread instead of blocking the loop
+encode_batcher = MicroBatcher(
+    encode_texts,
+    max_batch_size=int(os.environ.get("ENCODE_MAX_BATCH_SIZE", "32")),
+    max_wait_ms=float(os.environ.get("ENCODE_MAX_WAIT_MS", "5")),
+)
 
 # Mock mentor data
 mock_mentors = pd.DataFrame({
@@ -44,15 +87,60 @@ mock_mentors = pd.DataFrame({
     ] * 10
 })
 
-# Pre-compute skill embeddings for mentors
-mentor_skill_texts = [" ".join(skills) for skills in mock_mentors['skills']]
-mentor_skill_embeddings = bert_model.encode(mentor_skill_texts)
+# Columnar copy of the mentor data that requests are scored and served from
+mentor_store = MentorStore.from_frame(mock_mentors)
+
+# Precomputed embeddings live in a quantised, memory-mapped store that every
+# worker maps read-only; texts are only re-encoded when their hash changes
+EMBEDDING_STORE_DIR = os.environ.get(
+    "EMBEDDING_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "embedding_store")
+)
+EMBEDDING_STORE_DTYPE = os.environ.get("EMBEDDING_STORE_DTYPE", "float16")
+
+def load_mentor_embeddings():
+    # One vector per distinct skill; mentors are rows of skill codes in the
+    # store, scored skill by skill with max_similarity
+    skill_vocabulary = load_or_build_store(
+        EMBEDDING_STORE_DIR, "skill_vocabulary", MODEL_NAME, list(mentor_store.skill_names),
+        encode_texts, EMBEDDING_STORE_DTYPE
+    )
+    skill_table = AttributeTable(mentor_store.skill_names, skill_vocabulary[:])
+    
+    # Industries are few: one vector per distinct industry and a precomputed
+    # industry x industry similarity table, indexed by the store's codes
+    industry_vocabulary = load_or_build_store(
+        EMBEDDING_STORE_DIR, "industry_vocabulary", MODEL_NAME, list(mentor_store.industry_names),
+        encode_texts, EMBEDDING_STORE_DTYPE
+    )
+    industry_table = AttributeTable(mentor_store.industry_names, industry_vocabulary[:])
+    
+    # Pre-compute bio embeddings for mentors
+    mentor_bio_embeddings = load_or_build_store(
+        EMBEDDING_STORE_DIR, "mentor_bios", MODEL_NAME, mock_mentors['bio'].tolist(),
+        encode_texts, EMBEDDING_STORE_DTYPE
+    )
+    return skill_table, industry_table, mentor_bio_embeddings
+
+mentor_embeddings = warmup.resource("mentor_embeddings", load_mentor_embeddings)
 
-# Pre-compute industry embeddings for mentors
-mentor_industry_embeddings = bert_model.encode(mock_mentors['industry'].tolist())
+# Requests read the mentor store and its embedding tables once, as one
+# (store, embeddings) pair, and score against that pair throughout. Skill
+# updates build the next pair copy-on-write and swap it in with a single
+# assignment, so a match or cohort request in flight never sees a store
+# whose skill codes run past its skill table. Updates are serialised.
+mentor_snapshot = None
+mentor_update_lock = asyncio.Lock()
 
-# Pre-compute bio embeddings for mentors
-mentor_bio_embeddings = bert_model.encode(mock_mentors['bio'].tolist())
+def current_mentors():
+    global mentor_snapshot
+    if mentor_snapshot is None:
+        mentor_snapshot = (mentor_store, mentor_embeddings.get())
+    return mentor_snapshot
+
+add_health_routes(app, warmup)
+
+# Largest page of matches a request may ask for
+MAX_PAGE_SIZE = int(os.environ.get("MENTOR_MAX_PAGE_SIZE", "100"))
 
 class MenteeProfile(BaseModel):
     user_id: int
@@ -63,139 +151,265 @@ class MenteeProfile(BaseModel):
     preferred_mentorship_type: Optional[str] = "one-on-one"
     budget_range: Optional[Dict[str, int]] = {"min": 1000, "max": 3000}
     availability: Optional[Dict[str, int]] = {"hours_per_week": 5}
+    offset: int = Field(0, ge=0)
+    limit: int = Field(5, ge=1, le=MAX_PAGE_SIZE)
 
 class MentorMatchResponse(BaseModel):
     mentee_id: int
-    mentors: List[Dict[str, any]]
+    mentors: List[Dict[str, Any]]
     match_scores: List[float]
     match_reasons: List[str]
 
-@app.post("/match-mentors", response_model=MentorMatchResponse)
-async def match_mentors(mentee_profile: MenteeProfile = Body(...)):
-    mentee_id = mentee_profile.user_id
-    skills_to_learn = mentee_profile.skills_to_learn
-    industry = mentee_profile.industry
-    experience_years = mentee_profile.experience_years
-    goals = mentee_profile.goals
-    budget_min = mentee_profile.budget_range["min"]
-    budget_max = mentee_profile.budget_range["max"]
-    hours_per_week = mentee_profile.availability["hours_per_week"]
-    
-    # Create embeddings for mentee
-    mentee_skills_text = " ".join(skills_to_learn)
-    mentee_skills_embedding = bert_model.encode([mentee_skills_text])[0]
-    
-    mentee_industry_embedding = bert_model.encode([industry])[0]
-    
-    mentee_goals_text = " ".join(goals)
-    mentee_goals_embedding = bert_model.encode([mentee_goals_text])[0]
-    
-    # Calculate skill similarity scores
-    skill_similarities = cosine_similarity([mentee_skills_embedding], mentor_skill_embeddings)[0]
-    
-    # Calculate industry similarity scores
-    industry_similarities = cosine_similarity([mentee_industry_embedding], mentor_industry_embeddings)[0]
+# Calculate final match scores with weights
+MATCH_WEIGHTS = {
+    'skills': 0.4,
+    'industry': 0.2,
+    'goals_bio': 0.2,
+    'experience': 0.1,
+    'rating': 0.1
+}
+
+def match_page(store: MentorStore, embeddings, mentee_profile: MenteeProfile, mentee_embeddings) -> Dict[str, Any]:
+    # One page of matches for a mentee already turned into query terms by
+    # encode_mentees (one row of each); embeddings are the skill table,
+    # industry table and mentor bio store
+    skill_table, industry_table, mentor_bio_embeddings = embeddings
+    skill_weights, skill_similarities, mentee_industry_similarities, mentee_goals_embedding = mentee_embeddings
+    weights = MATCH_WEIGHTS
     
-    # Calculate goals-bio similarity (how well mentor's bio matches mentee's goals)
-    goals_bio_similarities = cosine_similarity([mentee_goals_embedding], mentor_bio_embeddings)[0]
+    # Filter by budget and availability before scoring; mentors outside the
+    # filters are never scored or returned
+    eligible = store.eligible(
+        mentee_profile.budget_range["min"], mentee_profile.budget_range["max"],
+        mentee_profile.availability["hours_per_week"]
+    )
     
-    # Filter by budget and availability
-    budget_filter = (mock_mentors['hourly_rate'] >= budget_min) & (mock_mentors['hourly_rate'] <= budget_max)
-    availability_filter = mock_mentors['availability_hours_per_week'] >= hours_per_week
+    def score_mentors(rows):
+        return (
+            # Each skill the mentee wants, against the mentor's closest skill
+            weights['skills'] * (skill_weights @ max_similarity(skill_similarities, store.skill_codes[rows])) +
+            weights['industry'] * mentee_industry_similarities[store.industry_codes[rows]] +
+            # How well the mentor's bio matches the mentee's goals, on average
+            weights['goals_bio'] * mentor_bio_embeddings.dot(mentee_goals_embedding, rows) +
+            weights['experience'] * store.experience_scores(rows, mentee_profile.experience_years) +
+            weights['rating'] * (store.rating[rows] - 3.5) / 1.5  # Normalize ratings to 0-1
+        )
     
-    # Experience level match (prefer mentors with more experience than mentee)
-    experience_scores = np.zeros(len(mock_mentors))
-    for i, mentor_exp in enumerate(mock_mentors['experience_years']):
-        if mentor_exp > experience_years:
-            # Prefer mentors with 3-10 years more experience than mentee
-            exp_diff = mentor_exp - experience_years
-            if exp_diff <= 10:
-                experience_scores[i] = 1.0 - (exp_diff - 3) / 7 if exp_diff >= 3 else 1.0 - (3 - exp_diff) / 3
-            else:
-                experience_scores[i] = 0.5  # Still valuable but not optimal
-        else:
-            experience_scores[i] = 0.2  # Less experienced mentors are less valuable
+    # Get the requested page of mentor matches
+    top_indices, top_scores = rank(score_mentors, eligible, len(store), mentee_profile.limit, mentee_profile.offset)
     
-    # Calculate final match scores with weights
-    weights = {
-        'skills': 0.4,
-        'industry': 0.2,
-        'goals_bio': 0.2,
-        'experience': 0.1,
-        'rating': 0.1
+    return {
+        "mentee_id": mentee_profile.user_id,
+        "mentors": store.to_dicts(top_indices, top_scores),
+        "match_scores": top_scores.tolist(),
+        "match_reasons": store.match_reasons(top_indices, mentee_profile.skills_to_learn, mentee_profile.industry)
     }
+
+async def encode_mentees(skill_table: AttributeTable, industry_table: AttributeTable,
+                         mentee_profiles: List[MenteeProfile]):
+    # Query terms for a batch of mentees:
+    #   skill_weights         (mentees, k) 1/count over each mentee's skills
+    #                         among the batch's k distinct skills
+    #   skill_similarities    (k, skill vocabulary) rows for those skills
+    #   industry_similarities (mentees, industry vocabulary)
+    #   goal_vectors          (mentees, dim) mean of the normalised goals
+    # Known skills and industries are table lookups. Each goal, unknown
+    # skill and unknown industry is encoded on its own, in one cached batch.
+    mentee_skills = [list(dict.fromkeys(profile.skills_to_learn)) for profile in mentee_profiles]
+    query_skills = list(dict.fromkeys(skill for skills in mentee_skills for skill in skills))
+    industries = [profile.industry for profile in mentee_profiles]
+    goals = [goal for profile in mentee_profiles for goal in profile.goals]
+    unknown_skills = skill_table.unknown(query_skills)
+    unknown_industries = industry_table.unknown(industries)
+    texts = goals + unknown_skills + unknown_industries
+    if texts:
+        vectors = await embedding_cache.encode_async(encode_batcher.submit, MODEL_NAME, texts)
+    else:
+        vectors = np.empty((0, skill_table.vectors.shape[1]), dtype=np.float32)
+    goal_vectors, vectors = normalize(vectors[:len(goals)]), vectors[len(goals):]
+    encoded = dict(zip(unknown_skills + unknown_industries, vectors))
     
-    final_scores = (
-        weights['skills'] * skill_similarities +
-        weights['industry'] * industry_similarities +
-        weights['goals_bio'] * goals_bio_similarities +
-        weights['experience'] * experience_scores +
-        weights['rating'] * (mock_mentors['rating'] - 3.5) / 1.5  # Normalize ratings to 0-1
-    )
-    
-    # Apply filters
-    final_scores = np.where(budget_filter & availability_filter, final_scores, 0)
+    skill_positions = {skill: position for position, skill in enumerate(query_skills)}
+    skill_weights = np.zeros((len(mentee_profiles), len(query_skills)), dtype=np.float32)
+    mentee_goals = np.zeros((len(mentee_profiles), goal_vectors.shape[1]), dtype=np.float32)
+    start = 0
+    for i, (profile, skills) in enumerate(zip(mentee_profiles, mentee_skills)):
+        if skills:
+            skill_weights[i, [skill_positions[skill] for skill in skills]] = 1.0 / len(skills)
+        if profile.goals:
+            mentee_goals[i] = goal_vectors[start:start + len(profile.goals)].mean(axis=0)
+        start += len(profile.goals)
+    skill_similarities = skill_table.similarity_rows(query_skills, encoded)
+    return skill_weights, skill_similarities, industry_table.similarity_rows(industries, encoded), mentee_goals
+
+@app.post("/match-mentors", response_model=MentorMatchResponse)
+async def match_mentors(mentee_profile: MenteeProfile = Body(...)):
+    warmup.require_ready()
+    store, embeddings = current_mentors()
     
-    # Get top 5 mentor matches
-    top_indices = np.argsort(final_scores)[::-1][:5]
-    top_mentors = mock_mentors.iloc[top_indices]
-    top_scores = final_scores[top_indices]
+    # Create embeddings for mentee; cache misses are encoded in one batch
+    skill_weights, skill_similarities, industry_similarities, goals = await encode_mentees(
+        embeddings[0], embeddings[1], [mentee_profile]
+    )
+    return match_page(store, embeddings, mentee_profile,
+                      (skill_weights[0], skill_similarities, industry_similarities[0], goals[0]))
+
+# Cohort assignment: each mentor offers one slot per MENTOR_HOURS_PER_MENTEE
+# of weekly availability, up to MENTOR_MAX_MENTEES mentees in total
+MENTOR_HOURS_PER_MENTEE = float(os.environ.get("MENTOR_HOURS_PER_MENTEE", "2"))
+MENTOR_MAX_MENTEES = int(os.environ.get("MENTOR_MAX_MENTEES", "30"))
+ASSIGNMENT_CANDIDATES = int(os.environ.get("ASSIGNMENT_CANDIDATES", "50"))
+ASSIGNMENT_LOAD_PENALTY = float(os.environ.get("ASSIGNMENT_LOAD_PENALTY", "0.001"))
+MAX_COHORT_SIZE = int(os.environ.get("MAX_COHORT_SIZE", "20000"))
+
+class CohortAssignmentRequest(BaseModel):
+    mentees: List[MenteeProfile]
+    candidates_per_mentee: int = ASSIGNMENT_CANDIDATES
+    min_score: float = 0.0
+
+def cohort_score_block(store: MentorStore, embeddings, mentee_profiles: List[MenteeProfile], mentee_embeddings):
+    # Scores of a cohort against every mentor, one block of mentees at a
+    # time: the match_page terms and weights, with -inf where the budget or
+    # availability filter excludes the pair
+    _, _, mentor_bio_embeddings = embeddings
+    weights = MATCH_WEIGHTS
+    skill_weights, skill_similarities, mentee_industry_similarities, mentee_goals = mentee_embeddings
+    # Best match of each of the cohort's distinct skills in every mentor,
+    # so a block's skill term is one (mentees x skills) @ (skills x mentors)
+    skill_matches = max_similarity(skill_similarities, store.skill_codes)
+    # Term weights are folded into the mentee side
+    skill_weights = weights['skills'] * skill_weights
+    industry_similarities = (weights['industry'] * mentee_industry_similarities).astype(np.float32)
+    goals = weights['goals_bio'] * mentee_goals
+    budget_min = np.array([profile.budget_range["min"] for profile in mentee_profiles])[:, None]
+    budget_max = np.array([profile.budget_range["max"] for profile in mentee_profiles])[:, None]
+    hours_per_week = np.array([profile.availability["hours_per_week"] for profile in mentee_profiles])[:, None]
+    # Experience and rating terms depend on the mentee only through their
+    # years of experience: one row per distinct value, gathered per block
+    experience_levels, level_index = np.unique(
+        [profile.experience_years for profile in mentee_profiles], return_inverse=True
+    )
+    profile_terms = (
+        weights['experience'] * store.experience_scores(np.arange(len(store)), experience_levels[:, None]) +
+        weights['rating'] * (store.rating - 3.5) / 1.5
+    ).astype(np.float32)
     
-    # Generate match reasons
-    match_reasons = []
-    for idx in top_indices:
-        mentor = mock_mentors.iloc[idx]
-        
-        reasons = []
-        # Skill match reason
-        matching_skills = set(skills_to_learn).intersection(set(mentor['skills']))
-        if matching_skills:
-            reasons.append(f"Skills match: {', '.join(list(matching_skills)[:3])}")
-            if len(matching_skills) > 3:
-                reasons[-1] += f" and {len(matching_skills) - 3} more"
-        
-        # Industry match
-        if mentor['industry'] == industry:
-            reasons.append(f"Same industry: {industry}")
-        
-        # Experience reason
-        reasons.append(f"{mentor['experience_years']} years of experience")
-        
-        # Rating reason
-        if mentor['rating'] >= 4.5:
-            reasons.append(f"Highly rated: {mentor['rating']:.1f}/5.0")
-        
-        match_reasons.append(", ".join(reasons))
+    def score_block(start, end):
+        block = slice(start, end)
+        scores = profile_terms[level_index[block]]
+        scores += mentor_bio_embeddings.dot(goals[block].T).T
+        scores += skill_weights[block] @ skill_matches
+        scores += industry_similarities[block][:, store.industry_codes]
+        scores[~store.eligible(budget_min[block], budget_max[block], hours_per_week[block])] = -np.inf
+        return scores
     
-    # Prepare response
-    mentors_list = []
-    for i, idx in enumerate(top_indices):
-        mentor = mock_mentors.iloc[idx]
-        mentors_list.append({
-            "id": int(mentor['id']),
-            "name": mentor['name'],
-            "skills": mentor['skills'],
-            "industry": mentor['industry'],
-            "experience_years": int(mentor['experience_years']),
-            "hourly_rate": int(mentor['hourly_rate']),
-            "availability_hours_per_week": int(mentor['availability_hours_per_week']),
-            "rating": float(mentor['rating']),
-            "mentees_count": int(mentor['mentees_count']),
-            "bio": mentor['bio'],
-            "match_score": float(top_scores[i])
+    return score_block
+
+def assign_cohort(store: MentorStore, embeddings, mentee_profiles: List[MenteeProfile], mentee_embeddings,
+                  candidates_per_mentee=ASSIGNMENT_CANDIDATES, min_score=0.0) -> Dict[str, Any]:
+    # Capacity-constrained assignment for a cohort, with the greedy
+    # per-mentee ranking (with and without capacities) as baselines
+    capacities = mentor_capacities(store, MENTOR_HOURS_PER_MENTEE, MENTOR_MAX_MENTEES)
+    candidates, candidate_scores = candidate_edges(
+        cohort_score_block(store, embeddings, mentee_profiles, mentee_embeddings),
+        len(mentee_profiles), candidates_per_mentee
+    )
+    assignment, assigned_scores = solve_assignment(
+        candidates, candidate_scores, capacities, min_score, ASSIGNMENT_LOAD_PENALTY
+    )
+    assignments = []
+    for profile, row, score in zip(mentee_profiles, assignment.tolist(), assigned_scores.tolist()):
+        assigned = row >= 0
+        assignments.append({
+            "mentee_id": profile.user_id,
+            "mentor_id": int(store.id[row]) if assigned else None,
+            "match_score": score if assigned else None,
         })
-    
     return {
-        "mentee_id": mentee_id,
-        "mentors": mentors_list,
-        "match_scores": top_scores.tolist(),
-        "match_reasons": match_reasons
+        "assignments": assignments,
+        "report": {
+            "mentees": len(mentee_profiles),
+            "mentors": len(store),
+            "total_capacity": int(capacities.sum()),
+            "solver": assignment_report(assignment, assigned_scores, capacities),
+            "greedy": assignment_report(*greedy_assignment(candidates, candidate_scores, None, min_score),
+                                        capacities),
+            "greedy_with_capacity": assignment_report(
+                *greedy_assignment(candidates, candidate_scores, capacities, min_score), capacities
+            ),
+        },
     }
 
+@app.post("/match-mentors/cohort")
+async def match_mentors_cohort(request: CohortAssignmentRequest = Body(...)):
+    if not request.mentees:
+        raise HTTPException(status_code=422, detail="mentees must not be empty")
+    if request.candidates_per_mentee < 1:
+        raise HTTPException(status_code=422, detail="candidates_per_mentee must be at least 1")
+    if len(request.mentees) > MAX_COHORT_SIZE:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_COHORT_SIZE} mentees per cohort")
+    warmup.require_ready()
+    store, embeddings = current_mentors()
+    
+    mentee_embeddings = await encode_mentees(embeddings[0], embeddings[1], request.mentees)
+    return await run_in_threadpool(
+        assign_cohort, store, embeddings, request.mentees, mentee_embeddings,
+        request.candidates_per_mentee, request.min_score
+    )
+
+@app.get("/embedding-cache/stats")
+async def embedding_cache_stats():
+    return embedding_cache.stats()
+
+class MentorSkillsUpdate(BaseModel):
+    skills: List[str]
+
+@app.put("/mentors/{mentor_id}/skills")
+async def update_mentor_skills(mentor_id: int, update: MentorSkillsUpdate):
+    # Skills new to the vocabulary are encoded once and appended to a copy
+    # of the skill table; no other mentor or skill is re-encoded
+    global mentor_snapshot
+    warmup.require_ready()
+    async with mentor_update_lock:
+        store, embeddings = current_mentors()
+        row = store.row_of(mentor_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"Mentor {mentor_id} not found")
+        skill_table = embeddings[0]
+        new_skills = skill_table.unknown(update.skills)
+        vectors = {}
+        if new_skills:
+            vectors = dict(zip(new_skills, await embedding_cache.encode_async(
+                encode_batcher.submit, MODEL_NAME, new_skills
+            )))
+        store, added = store.with_skills(row, update.skills)
+        if added:
+            skill_table = skill_table.extended(added, np.stack([vectors[skill] for skill in added]))
+        mentor_snapshot = (store, (skill_table,) + tuple(embeddings[1:]))
+    return {"mentor_id": mentor_id, "skills": store.skills[row], "new_skills": added,
+            "vocabulary_size": len(skill_table)}
+
+@app.get("/industry-table/stats")
+async def industry_table_stats():
+    warmup.require_ready()
+    return current_mentors()[1][1].stats()
+
+@app.get("/skill-table/stats")
+async def skill_table_stats():
+    warmup.require_ready()
+    return current_mentors()[1][0].stats()
+
+@app.get("/encode-batcher/stats")
+async def encode_batcher_stats():
+    return encode_batcher.stats()
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
+warmup.mark_imported()
+
 if __name__ == "__main__":
+    configure_logging()
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8003)
@@ -0,0 +1,175 @@
+import copy
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Columnar mentor data for the mentor matcher. Every field is one array
+# indexed by row, so the filter and score terms are whole-array expressions
+# over the candidate rows. Responses are built from per-column slices of
+# the returned rows rather than per-row DataFrame access. MentorRecord is a
+# lightweight view of one row for code that wants attribute access.
+
+NUMERIC_COLUMNS = {
+    "id": np.int64,
+    "experience_years": np.int32,
+    "hourly_rate": np.int32,
+    "availability_hours_per_week": np.int32,
+    "rating": np.float64,
+    "mentees_count": np.int32,
+}
+
+
+class MentorRecord:
+    __slots__ = ("_store", "row")
+
+    def __init__(self, store: "MentorStore", row: int):
+        self._store = store
+        self.row = row
+
+    def __getattr__(self, name):
+        # Only reached for column names (slots are found first)
+        try:
+            return self._store.column(name)[self.row]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._store.to_dicts([self.row])[0]
+
+
+class MentorStore:
+    def __init__(self, columns: Dict[str, Any]):
+        self.id = np.asarray(columns["id"], dtype=np.int64)
+        self.name = list(columns["name"])
+        self.skills = [list(skills) for skills in columns["skills"]]
+        self.skill_sets = [frozenset(skills) for skills in self.skills]
+        self.industry = list(columns["industry"])
+        self.experience_years = np.asarray(columns["experience_years"], dtype=np.int32)
+        self.hourly_rate = np.asarray(columns["hourly_rate"], dtype=np.int32)
+        self.availability_hours_per_week = np.asarray(columns["availability_hours_per_week"], dtype=np.int32)
+        self.rating = np.asarray(columns["rating"], dtype=np.float64)
+        self.mentees_count = np.asarray(columns["mentees_count"], dtype=np.int32)
+        self.bio = list(columns["bio"])
+        # Industries as integer codes so "same industry" is an array compare
+        self.industry_names, self.industry_codes = np.unique(np.array(self.industry, dtype=object),
+                                                             return_inverse=True)
+        self._industry_lookup = {name: code for code, name in enumerate(self.industry_names)}
+        # Skills as rows of vocabulary codes padded with -1. The vocabulary is
+        # in first-seen order, so skills added later only append codes.
+        self.skill_names = list(dict.fromkeys(skill for skills in self.skills for skill in skills))
+        self._skill_lookup = {name: code for code, name in enumerate(self.skill_names)}
+        self.skill_codes = np.full((len(self.skills), max(map(len, self.skills), default=0)), -1, dtype=np.int32)
+        for row, skills in enumerate(self.skills):
+            self.skill_codes[row, :len(skills)] = [self._skill_lookup[skill] for skill in skills]
+        self._rows = {mentor_id: row for row, mentor_id in enumerate(self.id.tolist())}
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "MentorStore":
+        return cls({column: frame[column].tolist() if column not in NUMERIC_COLUMNS else frame[column].to_numpy()
+                    for column in frame.columns})
+
+    def __len__(self):
+        return len(self.id)
+
+    def column(self, name):
+        if name not in self.__dict__ or name.startswith("_"):
+            raise KeyError(name)
+        return self.__dict__[name]
+
+    def row_of(self, mentor_id: int) -> Optional[int]:
+        return self._rows.get(mentor_id)
+
+    def new_skills(self, skills: Sequence[str]) -> List[str]:
+        # Distinct skills not yet in the vocabulary, in the order with_skills
+        # would add them
+        return [skill for skill in dict.fromkeys(skills) if skill not in self._skill_lookup]
+
+    def with_skills(self, row: int, skills: Sequence[str]) -> Tuple["MentorStore", List[str]]:
+        # A copy of the store with one mentor's skills replaced, and the
+        # skills new to the vocabulary, in code order, for the caller's skill
+        # table. This store is left untouched, so requests still scoring
+        # against it never see codes beyond their skill table; the other
+        # columns are shared with the copy.
+        skills = list(dict.fromkeys(skills))
+        added = self.new_skills(skills)
+        store = copy.copy(self)
+        store.skill_names = self.skill_names + added
+        store._skill_lookup = {name: code for code, name in enumerate(store.skill_names)}
+        codes = [store._skill_lookup[skill] for skill in skills]
+        store.skill_codes = np.full((len(self.skill_codes), max(len(codes), self.skill_codes.shape[1])), -1,
+                                    dtype=np.int32)
+        store.skill_codes[:, :self.skill_codes.shape[1]] = self.skill_codes
+        store.skill_codes[row] = -1
+        store.skill_codes[row, :len(codes)] = codes
+        store.skills = list(self.skills)
+        store.skills[row] = skills
+        store.skill_sets = list(self.skill_sets)
+        store.skill_sets[row] = frozenset(skills)
+        return store, added
+
+    def record(self, row: int) -> MentorRecord:
+        return MentorRecord(self, row)
+
+    def eligible(self, budget_min, budget_max, hours_per_week) -> np.ndarray:
+        return ((self.hourly_rate >= budget_min) & (self.hourly_rate <= budget_max)
+                & (self.availability_hours_per_week >= hours_per_week))
+
+    def experience_scores(self, rows, mentee_experience_years) -> np.ndarray:
+        # Prefer mentors with 3-10 years more experience than the mentee:
+        # 1.0 at +3, falling linearly on either side; 0.5 past +10 (still
+        # valuable but not optimal); 0.2 for mentors with no more experience
+        diff = self.experience_years[rows].astype(np.float64) - mentee_experience_years
+        scores = np.where(diff >= 3, 1.0 - (diff - 3) / 7, 1.0 - (3 - diff) / 3)
+        scores = np.where(diff > 10, 0.5, scores)
+        return np.where(diff <= 0, 0.2, scores)
+
+    def same_industry(self, rows, industry) -> np.ndarray:
+        code = self._industry_lookup.get(industry)
+        if code is None:
+            return np.zeros(len(rows), dtype=bool)
+        return self.industry_codes[rows] == code
+
+    def match_reasons(self, rows, skills_to_learn: Sequence[str], industry: str) -> List[str]:
+        wanted = set(skills_to_learn)
+        same_industry = self.same_industry(rows, industry).tolist()
+        experience = self.experience_years[rows].tolist()
+        ratings = self.rating[rows].tolist()
+        reasons_list = []
+        for row, is_same_industry, years, rating in zip(np.asarray(rows).tolist(), same_industry, experience, ratings):
+            reasons = []
+            # Skill match reason
+            matching_skills = [skill for skill in self.skills[row] if skill in wanted]
+            if matching_skills:
+                reasons.append(f"Skills match: {', '.join(matching_skills[:3])}")
+                if len(matching_skills) > 3:
+                    reasons[-1] += f" and {len(matching_skills) - 3} more"
+            # Industry match
+            if is_same_industry:
+                reasons.append(f"Same industry: {industry}")
+            # Experience reason
+            reasons.append(f"{years} years of experience")
+            # Rating reason
+            if rating >= 4.5:
+                reasons.append(f"Highly rated: {rating:.1f}/5.0")
+            reasons_list.append(", ".join(reasons))
+        return reasons_list
+
+    def to_dicts(self, rows, match_scores=None) -> List[Dict[str, Any]]:
+        rows = np.asarray(rows, dtype=np.int64)
+        positions = rows.tolist()
+        columns = {
+            "id": self.id[rows].tolist(),
+            "name": [self.name[row] for row in positions],
+            "skills": [self.skills[row] for row in positions],
+            "industry": [self.industry[row] for row in positions],
+            "experience_years": self.experience_years[rows].tolist(),
+            "hourly_rate": self.hourly_rate[rows].tolist(),
+            "availability_hours_per_week": self.availability_hours_per_week[rows].tolist(),
+            "rating": self.rating[rows].tolist(),
+            "mentees_count": self.mentees_count[rows].tolist(),
+            "bio": [self.bio[row] for row in positions],
+        }
+        if match_scores is not None:
+            columns["match_score"] = np.asarray(match_scores, dtype=np.float64).tolist()
+        names = list(columns)
+        return [dict(zip(names, values)) for values in zip(*columns.values())]
@@ -0,0 +1,96 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Sequence
+
+# Dynamic batching for model inference called from async handlers. Callers
+# await submit(items); a single runner task collects submissions for up to
+# max_wait_ms or max_batch_size items, runs batch_fn once on a worker thread
+# and hands each caller its slice of the result. The event loop never blocks
+# on the model, and concurrent requests share one forward pass.
+
+
+class MicroBatcher:
+    def __init__(self, batch_fn: Callable[[List], Sequence], max_batch_size=32,
+                 max_wait_ms=5.0, executor=None):
+        self._batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="micro-batcher")
+        self._loop = None
+        self._queue = None
+        self._runner = None
+        self.batches = 0
+        self.items = 0
+        self.busy_seconds = 0.0
+
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._runner is None or self._runner.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._runner = loop.create_task(self._run())
+
+    async def submit(self, items: List) -> Sequence:
+        if not items:
+            return []
+        self._ensure_running()
+        future = self._loop.create_future()
+        self._queue.put_nowait((list(items), future))
+        return await future
+
+    async def _collect(self):
+        pending = [await self._queue.get()]
+        count = len(pending[0][0])
+        deadline = self._loop.time() + self.max_wait_ms / 1000
+        while count < self.max_batch_size:
+            if self._queue.empty():
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            else:
+                pending.append(self._queue.get_nowait())
+            count += len(pending[-1][0])
+        return pending
+
+    async def _run(self):
+        while True:
+            pending = await self._collect()
+            # Skip callers that gave up (e.g. client disconnects) before the batch ran
+            pending = [(items, future) for items, future in pending if not future.done()]
+            if not pending:
+                continue
+            batch = [item for items, _ in pending for item in items]
+
+            start = time.perf_counter()
+            try:
+                results = await self._loop.run_in_executor(self._executor, self._batch_fn, batch)
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.busy_seconds += time.perf_counter() - start
+            self.batches += 1
+            self.items += len(batch)
+
+            offset = 0
+            for items, future in pending:
+                if not future.done():
+                    future.set_result(results[offset:offset + len(items)])
+                offset += len(items)
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "busy_seconds": self.busy_seconds,
+            "queued": self._queue.qsize() if self._queue else 0,
+        }
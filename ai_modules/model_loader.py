@@ -0,0 +1,173 @@
+import logging
+import os
+import threading
+import time
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Lazy, background-warmed loading for the heavy parts of each service
+# (SentenceTransformer, ResNet50, trained fraud models, precomputed embedding
+# stores, matplotlib). Importing a service module only registers loaders and
+# their imports are deferred into them; the startup event warms them on a
+# daemon thread, so /health/live answers straight away and /health/ready
+# flips to 200 once every resource is loaded.
+
+
+def _process_started() -> float:
+    # On Linux, when the process itself started (so interpreter start-up and
+    # numpy/pandas imports count); elsewhere when this module was imported
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - (uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return time.time()
+
+
+PROCESS_STARTED = _process_started()
+# Failed warm-up loads are retried on the warm-up thread, backing off from
+# the initial delay up to the maximum
+WARMUP_RETRY_SECONDS = float(os.environ.get("WARMUP_RETRY_SECONDS", "1"))
+WARMUP_RETRY_MAX_SECONDS = float(os.environ.get("WARMUP_RETRY_MAX_SECONDS", "60"))
+# Level for the services' own loggers when run as scripts
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+
+
+class LazyResource:
+    # One heavy object, built on first get(). Concurrent callers wait for the
+    # same load; a failed load is recorded and retried by the next get().
+    def __init__(self, name: str, load: Callable):
+        self.name = name
+        self._load = load
+        self._lock = threading.Lock()
+        self._value = None
+        self.loaded = False
+        self.seconds: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def get(self):
+        if not self.loaded:
+            with self._lock:
+                if not self.loaded:
+                    start = time.perf_counter()
+                    try:
+                        self._value = self._load()
+                    except Exception as e:
+                        self.error = str(e)
+                        raise
+                    self.seconds = time.perf_counter() - start
+                    self.error = None
+                    self.loaded = True
+        return self._value
+
+
+class ServiceWarmup:
+    def __init__(self, service: str):
+        self.service = service
+        self.resources: List[LazyResource] = []
+        self.import_seconds: Optional[float] = None
+        self.ready_at: Optional[float] = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def resource(self, name: str, load: Callable) -> LazyResource:
+        # Resources warm in registration order, so later loaders may get()
+        # earlier ones
+        resource = LazyResource(name, load)
+        self.resources.append(resource)
+        return resource
+
+    def mark_imported(self):
+        # Called at the end of the service module: process start to import done
+        self.import_seconds = time.time() - PROCESS_STARTED
+
+    @property
+    def ready(self) -> bool:
+        return all(resource.loaded for resource in self.resources)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"{self.service}-warmup", daemon=True)
+            self._thread.start()
+
+    def load_all(self):
+        # Synchronous warm-up for CLI entry points and scripts
+        for resource in self.resources:
+            resource.get()
+        self._mark_ready()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        # Handlers stay 503 while anything is unloaded, so failed loads are
+        # retried here with backoff until every resource is in place;
+        # /health/ready shows the errors meanwhile
+        delay = WARMUP_RETRY_SECONDS
+        while True:
+            for resource in self.resources:
+                if resource.loaded:
+                    continue
+                try:
+                    resource.get()
+                except Exception as e:
+                    logger.warning("%s: failed to load %s: %s; retrying in %gs", self.service, resource.name, e, delay)
+            if self.ready:
+                self._mark_ready()
+                return
+            if self._stop.wait(delay):
+                return
+            delay = min(delay * 2, WARMUP_RETRY_MAX_SECONDS)
+
+    def _mark_ready(self):
+        if self.ready_at is None:
+            self.ready_at = time.time()
+            report = self.report()
+            loads = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in report["load_seconds"].items())
+            logger.info("%s: ready %.2fs after process start (import %.2fs; %s)", self.service,
+                        report['process_to_ready_seconds'], report['import_seconds'], loads)
+
+    def require_ready(self):
+        # Handlers call this first so requests arriving during warm-up get a
+        # quick 503 instead of blocking the event loop on a model load
+        if not self.ready:
+            raise HTTPException(status_code=503, detail=f"{self.service} is still loading models",
+                                headers={"Retry-After": "5"})
+
+    def report(self) -> Dict:
+        return {
+            "service": self.service,
+            "ready": self.ready,
+            "import_seconds": self.import_seconds,
+            "load_seconds": {resource.name: resource.seconds for resource in self.resources if resource.loaded},
+            "pending": [resource.name for resource in self.resources if not resource.loaded],
+            "errors": {resource.name: resource.error for resource in self.resources if resource.error},
+            "process_to_ready_seconds": self.ready_at - PROCESS_STARTED if self.ready_at else None,
+        }
+
+
+def add_health_routes(app: FastAPI, warmup: ServiceWarmup):
+    # /health/live: the process is up and serving. /health/ready: every model
+    # is loaded (503 until then). Warm-up starts with the app.
+    @app.on_event("startup")
+    async def start_warmup():
+        warmup.start()
+
+    @app.get("/health/live")
+    async def health_live():
+        return {"status": "alive", "service": warmup.service}
+
+    @app.get("/health/ready")
+    async def health_ready():
+        return JSONResponse(status_code=200 if warmup.ready else 503, content=warmup.report())
+
+
+def configure_logging():
+    # Called from each service's __main__; uvicorn only configures its own
+    # loggers, so warm-up and reload messages need a root handler
+    logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
@@ -0,0 +1,82 @@
+import threading
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from typing import Callable, Dict, List
+
+# Live project catalogue for the recommender. Readers take one immutable
+# CatalogueSnapshot per request; writers encode only the changed projects,
+# build the next snapshot copy-on-write and swap it in with a single
+# reference assignment, so /recommend never waits on an update.
+
+
+class CatalogueSnapshot:
+    def __init__(self, projects, tfidf_matrix, index, skill_index, version):
+        self.projects = projects.reset_index(drop=True)
+        self.tfidf_matrix = tfidf_matrix
+        self.index = index
+        self.skill_index = skill_index
+        self.version = version
+        # Project id -> row position in `projects` / `tfidf_matrix`
+        self.rows = pd.Index(self.projects['id'])
+        # Row position of each index entry, and the filter columns in index
+        # order so request-time masks can be passed straight to index.search
+        self.index_rows = self.rows.get_indexer(index.ids)
+        self.index_positions = pd.Index(index.ids)
+        self.index_budgets = self.projects['budget'].to_numpy(dtype=float)[self.index_rows]
+        self.index_open = (self.projects['status'] == 'open').to_numpy()[self.index_rows]
+
+    def __len__(self):
+        return len(self.projects)
+
+
+class ProjectCatalogue:
+    def __init__(self, snapshot: CatalogueSnapshot, encode: Callable, tfidf):
+        self._snapshot = snapshot
+        self._encode = encode
+        self._tfidf = tfidf
+        self._write_lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> CatalogueSnapshot:
+        return self._snapshot
+
+    def upsert(self, records: List[Dict]) -> CatalogueSnapshot:
+        if not records:
+            return self._snapshot
+        changed = pd.DataFrame(records).drop_duplicates('id', keep='last')
+        descriptions = changed['description'].tolist()
+
+        # Encode outside the write lock; only the swap itself is serialised
+        embeddings = self._encode(descriptions)
+        tfidf_rows = self._tfidf.transform(descriptions)
+
+        with self._write_lock:
+            current = self._snapshot
+            ids = changed['id'].to_numpy()
+            keep = ~current.projects['id'].isin(ids).to_numpy()
+            changed = changed.reindex(columns=current.projects.columns)
+            changed['status'] = changed['status'].fillna('open')
+            projects = pd.concat([current.projects[keep], changed], ignore_index=True)
+            tfidf_matrix = sp.vstack([current.tfidf_matrix[np.flatnonzero(keep)], tfidf_rows], format='csr')
+            index = current.index.updated(ids, embeddings)
+            skill_index = current.skill_index.updated(keep, changed['skills_required'].tolist())
+            self._snapshot = CatalogueSnapshot(projects, tfidf_matrix, index, skill_index, current.version + 1)
+            return self._snapshot
+
+    def delete(self, project_ids: List[int]) -> CatalogueSnapshot:
+        with self._write_lock:
+            current = self._snapshot
+            keep = ~current.projects['id'].isin(project_ids).to_numpy()
+            if keep.all():
+                return current
+            dim = current.index.vectors.shape[1]
+            index = current.index.updated(np.empty(0, dtype=np.int64), np.empty((0, dim)), project_ids)
+            self._snapshot = CatalogueSnapshot(
+                current.projects[keep],
+                current.tfidf_matrix[np.flatnonzero(keep)],
+                index,
+                current.skill_index.updated(keep, []),
+                current.version + 1,
+            )
+            return self._snapshot
@@ -0,0 +1,156 @@
+import glob
+import json
+import os
+import sqlite3
+import zlib
+from functools import lru_cache
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+# Quiz item banks for skill verification. Each category's answer key is
+# compiled once into a NumPy array, so grading any number of submissions is
+# a gather and a comparison. The answer-stripped quiz is serialised to JSON
+# once per category. Each question is also serialised on its own, so a
+# sampled quiz is built by joining pre-encoded fragments.
+#
+# Sampled quizzes are reproducible from (category, attempt_seed, count): the
+# same seed always selects the same questions, so the server does not have
+# to remember which questions an attempt was given.
+#
+# Banks load from a directory of JSON files or from SQLite:
+#
+#   {dir}/{category}.json   [{"question": ..., "options": [...], "answer": 0}, ...]
+#                           or {"skill_category": ..., "questions": [...]}
+#   SQLite table quiz_questions(skill_category, position, question, options, answer)
+#       with options stored as a JSON array
+
+MAX_ANSWER = int(np.iinfo(np.int16).max)
+
+
+def _dumps(value) -> bytes:
+    # Same encoding as FastAPI's JSONResponse
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class QuizBank:
+    def __init__(self, skill_category: str, questions: List[Dict]):
+        self.skill_category = skill_category
+        self.questions = questions
+        self.answer_key = np.array([question["answer"] for question in questions], dtype=np.int16)
+        self.question_json = [
+            _dumps({"question": question["question"], "options": question["options"]})
+            for question in questions
+        ]
+        self._prefix = b'{"skill_category":' + _dumps(skill_category) + b',"questions":['
+        self.full_quiz_json = self._prefix + b",".join(self.question_json) + b"]}"
+        self._seed_salt = zlib.crc32(skill_category.encode("utf-8"))
+
+    def __len__(self):
+        return len(self.questions)
+
+    def sample_indices(self, attempt_seed: int, count: int) -> np.ndarray:
+        return _sample_indices(self._seed_salt, len(self.questions), attempt_seed, count)
+
+    def quiz_json(self, attempt_seed: Optional[int] = None, count: Optional[int] = None) -> bytes:
+        # The whole bank, or count questions selected by attempt_seed
+        if count is None:
+            return self.full_quiz_json
+        indices = self.sample_indices(attempt_seed, count)
+        return (self._prefix + b",".join(self.question_json[i] for i in indices)
+                + b'],"attempt_seed":' + str(attempt_seed).encode("ascii")
+                + b',"question_count":' + str(len(indices)).encode("ascii") + b"}")
+
+    def grade(self, answers: Sequence[Sequence[int]], attempt_seeds: Optional[Sequence[int]] = None,
+              count: Optional[int] = None) -> np.ndarray:
+        # Fraction correct per submission. Rows answer the whole bank, or
+        # the count questions their attempt seed selected. A row of the wrong
+        # length scores 0, as a single submission always has.
+        if count is None:
+            keys = self.answer_key[None, :]
+            width = len(self.questions)
+        else:
+            width = min(count, len(self.questions))
+            keys = np.stack([self.answer_key[self.sample_indices(seed, count)] for seed in attempt_seeds])
+        if width == 0:
+            return np.zeros(len(answers))
+        valid = np.array([len(row) == width for row in answers], dtype=bool)
+        if valid.all():
+            try:
+                submitted = np.array(answers, dtype=np.int64).reshape(len(answers), width)
+            except OverflowError:
+                submitted = np.array([_answer_row(row) for row in answers], dtype=np.int64).reshape(
+                    len(answers), width)
+        else:
+            submitted = np.full((len(answers), width), -1, dtype=np.int64)
+            for i in np.flatnonzero(valid):
+                submitted[i] = _answer_row(answers[i])
+        return np.where(valid, (submitted == keys).mean(axis=1), 0.0)
+
+
+def _answer_row(row):
+    # Answers no int16 key can equal, however large, are graded wrong
+    # instead of overflowing the int64 conversion
+    return [answer if -1 <= answer <= MAX_ANSWER else -1 for answer in row]
+
+
+@lru_cache(maxsize=65536)
+def _sample_indices(salt, n_questions, attempt_seed, count):
+    rng = np.random.default_rng([salt, attempt_seed])
+    return np.sort(rng.choice(n_questions, size=min(count, n_questions), replace=False))
+
+
+class QuizStore:
+    def __init__(self, banks: Dict[str, List[Dict]], source: str = "builtin"):
+        self.source = source
+        self.banks = {category: QuizBank(category, questions) for category, questions in banks.items()}
+
+    def get(self, skill_category: str) -> Optional[QuizBank]:
+        return self.banks.get(skill_category)
+
+    @classmethod
+    def from_directory(cls, directory: str) -> "QuizStore":
+        banks = {}
+        for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+            with open(path) as f:
+                data = json.load(f)
+            if isinstance(data, list):
+                banks[os.path.splitext(os.path.basename(path))[0]] = data
+            else:
+                banks[data["skill_category"]] = data["questions"]
+        return cls(banks, source=directory)
+
+    @classmethod
+    def from_sqlite(cls, path: str) -> "QuizStore":
+        banks: Dict[str, List[Dict]] = {}
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            rows = connection.execute(
+                "SELECT skill_category, question, options, answer FROM quiz_questions "
+                "ORDER BY skill_category, position"
+            )
+            for category, question, options, answer in rows:
+                banks.setdefault(category, []).append(
+                    {"question": question, "options": json.loads(options), "answer": int(answer)}
+                )
+        finally:
+            connection.close()
+        return cls(banks, source=path)
+
+    @classmethod
+    def load(cls, path: Optional[str], fallback: Dict[str, List[Dict]]) -> "QuizStore":
+        # A directory of JSON files, a SQLite file, or the fallback banks
+        if not path:
+            return cls(fallback)
+        if os.path.isdir(path):
+            return cls.from_directory(path)
+        return cls.from_sqlite(path)
+
+    def stats(self):
+        sizes = [len(bank) for bank in self.banks.values()]
+        return {
+            "source": self.source,
+            "categories": len(self.banks),
+            "questions": int(sum(sizes)),
+            "largest_bank": max(sizes, default=0),
+            "cached_samples": _sample_indices.cache_info().currsize,
+        }
@@ -0,0 +1,45 @@
+import numpy as np
+from typing import Callable, Optional, Tuple
+
+# Ranking helpers shared by the recommender and the mentor matcher. Top-K is
+# selected with argpartition (O(n)) and only the selected rows are sorted,
+# instead of sorting every candidate to keep a handful. Boolean masks are
+# applied before scoring so excluded rows are never scored at all.
+
+
+def top_k(scores, k, offset=0) -> np.ndarray:
+    # Positions of the results ranked [offset, offset + k) by descending score
+    scores = np.asarray(scores)
+    end = min(offset + k, len(scores))
+    if end <= offset:
+        return np.empty(0, dtype=np.int64)
+    if end < len(scores):
+        selected = np.argpartition(-scores, end - 1)[:end]
+    else:
+        selected = np.arange(len(scores))
+    order = selected[np.argsort(-scores[selected], kind='stable')]
+    return order[offset:end]
+
+
+def top_k_rows(scores, k) -> Tuple[np.ndarray, np.ndarray]:
+    # Row-wise top_k for a (users x candidates) score block
+    k = min(k, scores.shape[1])
+    if k < scores.shape[1]:
+        selected = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        selected = np.broadcast_to(np.arange(scores.shape[1]), scores.shape).copy()
+    selected_scores = np.take_along_axis(scores, selected, axis=1)
+    order = np.argsort(-selected_scores, axis=1, kind='stable')
+    return np.take_along_axis(selected, order, axis=1), np.take_along_axis(selected_scores, order, axis=1)
+
+
+def rank(score_rows: Callable[[np.ndarray], np.ndarray], mask: Optional[np.ndarray],
+         n_rows: int, limit: int, offset=0) -> Tuple[np.ndarray, np.ndarray]:
+    # Score only the rows allowed by mask, then return one page of
+    # (row positions, scores) in descending score order
+    rows = np.arange(n_rows) if mask is None else np.flatnonzero(mask)
+    if len(rows) == 0:
+        return rows, np.empty(0, dtype=np.float32)
+    scores = np.asarray(score_rows(rows))
+    top = top_k(scores, limit, offset)
+    return rows[top], scores[top]
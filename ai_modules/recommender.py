@@ -1,15 +1,33 @@
+import os
+import sys
+import json
+import logging
+import itertools
 import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
 import fastapi
-from fastapi import FastAPI, Body
-from pydantic import BaseModel
-from typing import List, Dict, Optional
+from fastapi import FastAPI, Body, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Dict, Optional, Iterable, Iterator
+from embedding_cache import EmbeddingCache
+from micro_batcher import MicroBatcher
+from vector_index import load_or_build_index, normalize_rows
+from ranking import top_k, top_k_rows
+from embedding_store import load_or_build_store
+from project_catalogue import CatalogueSnapshot, ProjectCatalogue
+from skill_index import SkillIndex
+from collaborative import CollaborativeRefresher
+from model_loader import ServiceWarmup, add_health_routes, configure_logging
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Project Recommendation API")
 
+# Models and precomputed embeddings load on a background thread after
+# startup; /health/ready reports when they are in place
+warmup = ServiceWarmup("recommender")
+
 # Mock data - in production this would come from a database
 mock_projects = pd.DataFrame({
     'id': range(1, 101),
@@ -40,7 +58,8 @@ mock_projects = pd.DataFrame({
     ] * 10,
     'budget': np.random.randint(10000, 100000, 100),
     'employer_id': np.random.randint(1, 50, 100),
-    'avg_rating': np.random.uniform(3.0, 5.0, 100)
+    'avg_rating': np.random.uniform(3.0, 5.0, 100),
+    'status': ['open'] * 100
 })
 
 # Mock user data
@@ -70,15 +89,97 @@ mock_users = pd.DataFrame({
 })
 
 # Load BERT model for text embeddings
-bert_model = SentenceTransformer('paraphrase-MiniLM-L6-v2')
+MODEL_NAME = 'paraphrase-MiniLM-L6-v2'
+
+def load_bert_model():
+    # Deferred import: sentence_transformers pulls in torch
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(MODEL_NAME)
+
+bert_model = warmup.resource("bert_model", load_bert_model)
+
+def encode_texts(texts):
+    return bert_model.get().encode(texts)
+
+# Cache for request-time encodes; set EMBEDDING_CACHE_DIR to keep a float16
+# copy on disk that survives restarts (at most 2 x EMBEDDING_CACHE_DISK_MAX_ROWS
+# vectors per model)
+EMBEDDING_CACHE_DIR = os.environ.get("EMBEDDING_CACHE_DIR")
+embedding_cache = EmbeddingCache(
+    max_entries=int(os.environ.get("EMBEDDING_CACHE_SIZE", "10000")),
+    ttl_seconds=float(os.environ.get("EMBEDDING_CACHE_TTL_SECONDS", "3600")),
+    disk_dir=os.path.join(EMBEDDING_CACHE_DIR, "recommender") if EMBEDDING_CACHE_DIR else None,
+    disk_max_rows=int(os.environ.get("EMBEDDING_CACHE_DISK_MAX_ROWS", "100000")),
+)
 
-# TF-IDF vectorizer for content-based filtering
-tfidf = TfidfVectorizer(stop_words='english')
-project_descriptions = mock_projects['description'].tolist()
-tfidf_matrix = tfidf.fit_transform(project_descriptions)
+# Request-time encodes from concurrent handlers are batched into one
+# bert_model.encode call on a worker thread instead of blocking the loop
+encode_batcher = MicroBatcher(
+    encode_texts,
+    max_batch_size=int(os.environ.get("ENCODE_MAX_BATCH_SIZE", "32")),
+    max_wait_ms=float(os.environ.get("ENCODE_MAX_WAIT_MS", "5")),
+)
+
+# Precomputed embeddings live in a quantised, memory-mapped store that every
+# worker maps read-only; texts are only re-encoded when their hash changes
+EMBEDDING_STORE_DIR = os.environ.get(
+    "EMBEDDING_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "embedding_store")
+)
+EMBEDDING_STORE_DTYPE = os.environ.get("EMBEDDING_STORE_DTYPE", "float16")
+
+# Vector index over project embeddings ("exact" or "ivf"). Only the top
+# CANDIDATE_K projects it returns go through skill and collaborative scoring.
+VECTOR_INDEX_KIND = os.environ.get("RECOMMENDER_INDEX_KIND", "exact")
+VECTOR_INDEX_PATH = os.environ.get("RECOMMENDER_INDEX_PATH")
+CANDIDATE_K = int(os.environ.get("RECOMMENDER_CANDIDATE_K", "200"))
+# Largest page (limit, or top_k per user in batch mode) a request may ask for
+MAX_PAGE_SIZE = int(os.environ.get("RECOMMENDER_MAX_PAGE_SIZE", "100"))
+
+def load_catalogue():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    
+    # TF-IDF vectorizer for content-based filtering
+    tfidf = TfidfVectorizer(stop_words='english')
+    project_descriptions = mock_projects['description'].tolist()
+    tfidf_matrix = tfidf.fit_transform(project_descriptions)
+    
+    # Pre-compute BERT embeddings for project descriptions; a warm store
+    # skips the model entirely until the first request-time encode
+    bert_embeddings = load_or_build_store(
+        EMBEDDING_STORE_DIR, "projects", MODEL_NAME, project_descriptions,
+        encode_texts, EMBEDDING_STORE_DTYPE
+    )
+    project_index = load_or_build_index(
+        VECTOR_INDEX_KIND, bert_embeddings, mock_projects['id'].to_numpy(), VECTOR_INDEX_PATH
+    )
+    
+    # Live catalogue: project add/update/delete encode only the changed projects
+    # and swap a new snapshot in while /recommend keeps reading the old one
+    return ProjectCatalogue(
+        CatalogueSnapshot(
+            mock_projects, tfidf_matrix, project_index,
+            SkillIndex(mock_projects['skills_required']), version=1
+        ),
+        encode=encode_texts,
+        tfidf=tfidf,
+    )
 
-# Pre-compute BERT embeddings for project descriptions
-bert_embeddings = bert_model.encode(project_descriptions)
+catalogue = warmup.resource("catalogue", load_catalogue)
+
+# Item-item collaborative model over users' project histories, rebuilt
+# periodically in the background instead of scanning every user per request
+COLLABORATIVE_REFRESH_SECONDS = float(os.environ.get("COLLABORATIVE_REFRESH_SECONDS", "3600"))
+
+def load_collaborative():
+    refresher = CollaborativeRefresher(
+        lambda: mock_users['project_history'].tolist(), COLLABORATIVE_REFRESH_SECONDS
+    )
+    refresher.start()
+    return refresher
+
+collaborative = warmup.resource("collaborative", load_collaborative)
+
+add_health_routes(app, warmup)
 
 class UserProfile(BaseModel):
     user_id: int
@@ -86,101 +187,252 @@ class UserProfile(BaseModel):
     preferred_categories: Optional[List[str]] = None
     project_history: Optional[List[int]] = None
     weights: Optional[Dict[str, float]] = {"content": 0.6, "collaborative": 0.4}
+    budget_range: Optional[Dict[str, int]] = None
+    exclude_project_ids: Optional[List[int]] = None
+    offset: int = Field(0, ge=0)
+    limit: int = Field(10, ge=1, le=MAX_PAGE_SIZE)
+
+class ProjectRecord(BaseModel):
+    id: int
+    title: str
+    description: str
+    skills_required: List[str]
+    budget: Optional[int] = None
+    employer_id: Optional[int] = None
+    avg_rating: Optional[float] = None
+    status: str = "open"
+
+class CatalogueUpdateResponse(BaseModel):
+    catalogue_version: int
+    project_count: int
 
 class RecommendationResponse(BaseModel):
     project_ids: List[int]
     scores: List[float]
     match_reasons: List[str]
 
+class BatchRecommendationRequest(BaseModel):
+    profiles: List[UserProfile]
+    top_k: int = Field(10, ge=1, le=MAX_PAGE_SIZE)
+
+# Users scored per chunk in batch mode; memory is O(chunk size x catalogue size)
+BATCH_CHUNK_SIZE = int(os.environ.get("RECOMMENDER_BATCH_CHUNK_SIZE", "32"))
+
+def eligible_projects(snapshot, user_profile: UserProfile):
+    # Boolean mask in index order: open jobs within the budget range that the
+    # user has not already applied to. Excluded projects are never scored.
+    mask = snapshot.index_open.copy()
+    if user_profile.budget_range:
+        if "min" in user_profile.budget_range:
+            mask &= snapshot.index_budgets >= user_profile.budget_range["min"]
+        if "max" in user_profile.budget_range:
+            mask &= snapshot.index_budgets <= user_profile.budget_range["max"]
+    if user_profile.exclude_project_ids:
+        excluded = snapshot.index_positions.get_indexer(user_profile.exclude_project_ids)
+        mask[excluded[excluded >= 0]] = False
+    return mask
+
+def combine_scores(bert_similarities, skill_match_scores, collaborative_scores,
+                   content_weight, collaborative_weight):
+    # Works on one user's candidate scores or on a (users x projects) block
+    # with per-user weights of shape (users, 1)
+    content_scores = 0.7 * bert_similarities + 0.3 * skill_match_scores
+    final_scores = content_weight * content_scores
+    # Only add collaborative if we have data
+    has_collaborative = np.max(collaborative_scores, axis=-1, keepdims=True, initial=0.0) > 0
+    return final_scores + np.where(has_collaborative, collaborative_weight * collaborative_scores, 0.0)
+
+def skill_match_reason(matching_skills):
+    if matching_skills:
+        reason = f"Skills match: {', '.join(matching_skills[:3])}"
+        if len(matching_skills) > 3:
+            reason += f" and {len(matching_skills) - 3} more"
+        return reason
+    return "Similar to projects you've shown interest in"
+
 @app.post("/recommend", response_model=RecommendationResponse)
 async def recommend_projects(user_profile: UserProfile = Body(...)):
     user_id = user_profile.user_id
     user_skills = user_profile.skills
     weights = user_profile.weights
-    
-    # Content-based filtering using skills match and BERT embeddings
-    content_scores = []
+    warmup.require_ready()
+    snapshot = catalogue.get().snapshot
+    allowed = eligible_projects(snapshot, user_profile)
+    if not allowed.any():
+        # Every project is filtered out: nothing to encode or score
+        return {"project_ids": [], "scores": [], "match_reasons": []}
     
     # Create a user profile text by joining their skills
     user_profile_text = " ".join(user_skills)
-    user_embedding = bert_model.encode([user_profile_text])[0]
-    
-    # Calculate similarity between user profile and project descriptions
-    bert_similarities = cosine_similarity([user_embedding], bert_embeddings)[0]
-    
-    # Calculate skill match score
-    skill_match_scores = []
-    for skills in mock_projects['skills_required']:
-        matching_skills = set(user_skills).intersection(set(skills))
-        match_ratio = len(matching_skills) / len(skills) if skills else 0
-        skill_match_scores.append(match_ratio)
+    user_embedding = (await embedding_cache.encode_async(encode_batcher.submit, MODEL_NAME, [user_profile_text]))[0]
     
-    # Combine BERT similarities and skill match scores
-    content_scores = 0.7 * np.array(bert_similarities) + 0.3 * np.array(skill_match_scores)
+    # Retrieve the most similar eligible projects from the vector index
+    candidate_ids, bert_similarities = snapshot.index.search(
+        user_embedding, max(CANDIDATE_K, user_profile.offset + user_profile.limit),
+        allowed=allowed
+    )
+    candidate_rows = snapshot.rows.get_indexer(candidate_ids)
     
-    # Collaborative filtering
-    collaborative_scores = np.zeros(len(mock_projects))
+    # Calculate skill match score with one sparse product over the candidates
+    user_skill_ids = snapshot.skill_index.lookup(user_skills)
+    skill_match_scores = snapshot.skill_index.match_ratios(user_skill_ids, candidate_rows)
     
-    if user_profile.project_history:
-        # Find similar users based on project history
-        user_project_history = set(user_profile.project_history)
-        
-        for idx, history in enumerate(mock_users['project_history']):
-            if idx == user_id - 1:  # Skip the current user
-                continue
-                
-            other_history = set(history)
-            overlap = len(user_project_history.intersection(other_history))
-            
-            if overlap > 0:
-                similarity = overlap / len(user_project_history.union(other_history))
-                
-                # Get projects this similar user has worked on that the current user hasn't
-                unique_projects = [p for p in history if p not in user_project_history]
-                
-                # Add weighted scores to those projects
-                for project in unique_projects:
-                    if project <= len(collaborative_scores):
-                        collaborative_scores[project-1] += similarity
-    
-    # Normalize collaborative scores
-    if np.max(collaborative_scores) > 0:
-        collaborative_scores = collaborative_scores / np.max(collaborative_scores)
+    # Collaborative filtering from the precomputed item-item similarities
+    collaborative_scores = collaborative.get().model.score(user_profile.project_history or [], candidate_ids)
     
     # Weighted ensemble of content-based and collaborative filtering
-    final_scores = weights["content"] * content_scores
-    if np.max(collaborative_scores) > 0:  # Only add collaborative if we have data
-        final_scores += weights["collaborative"] * collaborative_scores
+    final_scores = combine_scores(
+        bert_similarities, skill_match_scores, collaborative_scores,
+        weights["content"], weights["collaborative"]
+    )
     
-    # Get top 10 project recommendations
-    top_indices = np.argsort(final_scores)[::-1][:10]
-    recommended_projects = mock_projects.iloc[top_indices]
+    # Get the requested page of project recommendations
+    top_indices = top_k(final_scores, user_profile.limit, user_profile.offset)
     
-    # Generate match reasons
-    match_reasons = []
-    for idx in top_indices:
-        project_skills = mock_projects.iloc[idx]['skills_required']
-        matching_skills = set(user_skills).intersection(set(project_skills))
-        
-        if matching_skills:
-            reason = f"Skills match: {', '.join(list(matching_skills)[:3])}"
-            if len(matching_skills) > 3:
-                reason += f" and {len(matching_skills) - 3} more"
-        else:
-            reason = "Similar to projects you've shown interest in"
-            
-        match_reasons.append(reason)
+    # Generate match reasons from the skill index
+    match_reasons = [
+        skill_match_reason(snapshot.skill_index.matching_skills(candidate_rows[idx], user_skill_ids))
+        for idx in top_indices
+    ]
     
     return {
-        "project_ids": recommended_projects['id'].tolist(),
+        "project_ids": candidate_ids[top_indices].tolist(),
         "scores": final_scores[top_indices].tolist(),
         "match_reasons": match_reasons
     }
 
+def recommend_batch(profiles: Iterable[UserProfile], limit=10, chunk_size=BATCH_CHUNK_SIZE) -> Iterator[Dict]:
+    # Exact scoring of many users against the whole catalogue, one chunk of
+    # users at a time: one embedding matrix product and one sparse skill
+    # product per chunk, then argpartition top-K per user
+    snapshot = catalogue.get().snapshot
+    model = collaborative.get().model
+    project_ids = snapshot.index.ids
+    project_rows = snapshot.index_rows
+    project_skills = snapshot.skill_index.project_skills[project_rows]
+    skill_counts = snapshot.skill_index.skill_counts[project_rows]
+    
+    profiles = iter(profiles)
+    while True:
+        chunk = list(itertools.islice(profiles, chunk_size))
+        if not chunk:
+            break
+        
+        user_embeddings = normalize_rows(embedding_cache.encode(
+            bert_model.get(), MODEL_NAME, [" ".join(profile.skills) for profile in chunk]
+        ))
+        bert_similarities = (snapshot.index.vectors @ user_embeddings.T).T
+        
+        user_skill_ids = [snapshot.skill_index.lookup(profile.skills) for profile in chunk]
+        user_skills = np.vstack([snapshot.skill_index.query_vector(ids) for ids in user_skill_ids])
+        overlap = (project_skills @ user_skills.T).T
+        skill_match_scores = np.divide(overlap, skill_counts, out=np.zeros_like(overlap), where=skill_counts > 0)
+        
+        collaborative_scores = np.vstack([
+            model.score(profile.project_history or [], project_ids) for profile in chunk
+        ])
+        
+        weights = [profile.weights for profile in chunk]
+        final_scores = combine_scores(
+            bert_similarities, skill_match_scores, collaborative_scores,
+            np.array([[w["content"]] for w in weights]), np.array([[w["collaborative"]] for w in weights])
+        )
+        
+        # Ineligible projects (closed, outside budget, already applied) drop out
+        for i, profile in enumerate(chunk):
+            final_scores[i, ~eligible_projects(snapshot, profile)] = -np.inf
+        top, top_scores = top_k_rows(final_scores, limit)
+        
+        for profile, skill_ids, indices, scores in zip(chunk, user_skill_ids, top, top_scores):
+            indices = indices[np.isfinite(scores)]
+            scores = scores[np.isfinite(scores)]
+            yield {
+                "user_id": profile.user_id,
+                "project_ids": project_ids[indices].tolist(),
+                "scores": scores.tolist(),
+                "match_reasons": [
+                    skill_match_reason(snapshot.skill_index.matching_skills(project_rows[idx], skill_ids))
+                    for idx in indices
+                ]
+            }
+
+@app.post("/recommend/batch")
+async def recommend_projects_batch(request: BatchRecommendationRequest = Body(...)):
+    # Streams one JSON line per user; the sync generator runs in the threadpool
+    warmup.require_ready()
+    results = recommend_batch(request.profiles, request.top_k)
+    return StreamingResponse((json.dumps(result) + "\n" for result in results),
+                             media_type="application/x-ndjson")
+
+def run_batch_cli(input_path, output_path, limit, chunk_size):
+    # Offline digest mode: reads UserProfile JSON lines and writes one
+    # recommendation JSON line per user without holding either file in memory
+    sink = sys.stdout if output_path == "-" else open(output_path, "w")
+    count = 0
+    try:
+        with open(input_path) as source:
+            profiles = (UserProfile(**json.loads(line)) for line in source if line.strip())
+            for result in recommend_batch(profiles, limit, chunk_size):
+                sink.write(json.dumps(result) + "\n")
+                count += 1
+    finally:
+        if sink is not sys.stdout:
+            sink.close()
+    logger.info("Wrote recommendations for %d users", count)
+
+@app.post("/projects", response_model=CatalogueUpdateResponse)
+def upsert_projects(projects: List[ProjectRecord] = Body(...)):
+    # Sync handler: FastAPI runs it in the threadpool, so encoding the changed
+    # projects does not block /recommend on the event loop
+    warmup.require_ready()
+    snapshot = catalogue.get().upsert([project.model_dump() for project in projects])
+    return {"catalogue_version": snapshot.version, "project_count": len(snapshot)}
+
+@app.put("/projects/{project_id}", response_model=CatalogueUpdateResponse)
+def update_project(project_id: int, project: ProjectRecord = Body(...)):
+    if project.id != project_id:
+        raise HTTPException(status_code=400, detail="Project id in body does not match the URL")
+    warmup.require_ready()
+    snapshot = catalogue.get().upsert([project.model_dump()])
+    return {"catalogue_version": snapshot.version, "project_count": len(snapshot)}
+
+@app.delete("/projects/{project_id}", response_model=CatalogueUpdateResponse)
+def delete_project(project_id: int):
+    warmup.require_ready()
+    if project_id not in catalogue.get().snapshot.rows:
+        raise HTTPException(status_code=404, detail="Project not found")
+    snapshot = catalogue.get().delete([project_id])
+    return {"catalogue_version": snapshot.version, "project_count": len(snapshot)}
+
+@app.get("/embedding-cache/stats")
+async def embedding_cache_stats():
+    return embedding_cache.stats()
+
+@app.get("/encode-batcher/stats")
+async def encode_batcher_stats():
+    return encode_batcher.stats()
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
+warmup.mark_imported()
+
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    import argparse
+    configure_logging()
+    parser = argparse.ArgumentParser(description="Project Recommendation API")
+    subparsers = parser.add_subparsers(dest="command")
+    batch_parser = subparsers.add_parser("batch", help="score a file of UserProfile JSON lines")
+    batch_parser.add_argument("--input", required=True)
+    batch_parser.add_argument("--output", default="-")
+    batch_parser.add_argument("--top-k", type=int, default=10)
+    batch_parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE)
+    args = parser.parse_args()
+    
+    if args.command == "batch":
+        warmup.load_all()
+        run_batch_cli(args.input, args.output, args.top_k, args.chunk_size)
+    else:
+        import uvicorn
+        uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,80 @@
+import numpy as np
+import scipy.sparse as sp
+from typing import Dict, List, Optional
+
+# Skill vocabulary plus a binary project x skill CSR matrix and its transpose,
+# the inverted index (skill id -> project rows). Skill-overlap ratios for any
+# set of projects come from one sparse matrix-vector product instead of
+# building Python sets per project per request.
+
+
+class SkillIndex:
+    def __init__(self, skill_lists, vocabulary: Optional[Dict[str, int]] = None):
+        self.vocabulary = dict(vocabulary or {})
+        self.project_skills = self._encode_rows(skill_lists)
+        self._finalise()
+
+    def _encode_rows(self, skill_lists):
+        indptr = [0]
+        indices = []
+        for skills in skill_lists:
+            row = {self.vocabulary.setdefault(skill, len(self.vocabulary)) for skill in skills}
+            indices.extend(sorted(row))
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.float32)
+        return sp.csr_matrix((data, indices, indptr), shape=(len(skill_lists), len(self.vocabulary)))
+
+    def _finalise(self):
+        self.skill_names = np.empty(len(self.vocabulary), dtype=object)
+        for skill, skill_id in self.vocabulary.items():
+            self.skill_names[skill_id] = skill
+        self.skill_counts = np.diff(self.project_skills.indptr)
+        self.skill_projects = self.project_skills.T.tocsr()
+
+    def __len__(self):
+        return self.project_skills.shape[0]
+
+    def lookup(self, skills: List[str]) -> np.ndarray:
+        # Skills outside the vocabulary cannot match any project, so drop them
+        ids = [self.vocabulary[skill] for skill in set(skills) if skill in self.vocabulary]
+        return np.array(sorted(ids), dtype=np.int64)
+
+    def query_vector(self, skill_ids):
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        vector[skill_ids] = 1.0
+        return vector
+
+    def match_ratios(self, skill_ids, rows=None) -> np.ndarray:
+        # Fraction of each project's required skills covered by skill_ids, for
+        # the given project rows or for the whole catalogue
+        if rows is None:
+            overlap = np.asarray(self.skill_projects[skill_ids].sum(axis=0)).ravel()
+            counts = self.skill_counts
+        else:
+            overlap = self.project_skills[rows] @ self.query_vector(skill_ids)
+            counts = self.skill_counts[rows]
+        return np.divide(overlap, counts, out=np.zeros(len(counts), dtype=np.float32), where=counts > 0)
+
+    def matching_skills(self, row, skill_ids) -> List[str]:
+        start, end = self.project_skills.indptr[row], self.project_skills.indptr[row + 1]
+        matched = np.intersect1d(self.project_skills.indices[start:end], skill_ids, assume_unique=True)
+        return self.skill_names[matched].tolist()
+
+    def projects_with_skill(self, skill: str) -> np.ndarray:
+        skill_id = self.vocabulary.get(skill)
+        if skill_id is None:
+            return np.empty(0, dtype=np.int32)
+        return self.skill_projects.indices[self.skill_projects.indptr[skill_id]:self.skill_projects.indptr[skill_id + 1]]
+
+    def updated(self, keep, new_skill_lists) -> "SkillIndex":
+        # Copy-on-write: kept rows followed by the new rows, matching the row
+        # order of the catalogue snapshot. The vocabulary only ever grows.
+        index = SkillIndex.__new__(SkillIndex)
+        index.vocabulary = dict(self.vocabulary)
+        new_rows = index._encode_rows(new_skill_lists)
+        kept = self.project_skills[np.flatnonzero(keep)]
+        kept = sp.csr_matrix((kept.data, kept.indices, kept.indptr),
+                             shape=(kept.shape[0], len(index.vocabulary)))
+        index.project_skills = sp.vstack([kept, new_rows], format='csr')
+        index._finalise()
+        return index
@@ -0,0 +1,281 @@
+import argparse
+import datetime
+import glob
+import json
+import logging
+import os
+import sys
+import threading
+import numpy as np
+from PIL import Image
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Exported inference graphs for the skill-verification ResNet50 feature
+# extractor. The export CLI converts the Keras model once into the formats
+# below and checks each one against Keras on a fixture image set, recording
+# the result in a manifest:
+#
+#   {model_dir}/savedmodel/          tf.function with XLA (jit_compile)
+#   {model_dir}/resnet50_int8.tflite TFLite, int8 weights and activations
+#   {model_dir}/resnet50_fp16.tflite TFLite, float16 weights
+#   {model_dir}/resnet50.onnx        ONNX, when tf2onnx is installed
+#   {model_dir}/manifest.json
+#
+# The service picks one with SKILL_MODEL_BACKEND. Every backend is a
+# callable taking a (n, 224, 224, 3) float32 batch of preprocessed images
+# and returning the (n, 2048) pooled features as a NumPy array.
+#
+#   python skill_model.py --backends savedmodel tflite-int8 onnx
+
+BACKENDS = ("keras", "savedmodel", "tflite-int8", "tflite-fp16", "onnx")
+BACKEND_FILES = {
+    "savedmodel": "savedmodel",
+    "tflite-int8": "resnet50_int8.tflite",
+    "tflite-fp16": "resnet50_fp16.tflite",
+    "onnx": "resnet50.onnx",
+}
+IMAGE_SIZE = 224
+FEATURE_DIM = 2048
+
+# Minimum cosine similarity to the Keras features on every fixture image;
+# int8 quantisation is allowed to drift further than the float formats
+PARITY_MIN_COSINE = {"savedmodel": 0.9999, "tflite-fp16": 0.999, "tflite-int8": 0.98, "onnx": 0.9999}
+
+DEFAULT_FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "public")
+
+# Define skill categories and their corresponding ImageNet classes
+# This is a simplified mapping - in production, you would fine-tune on domain-specific data
+skill_categories = {
+    "web_design": [407, 408, 409, 722, 723],  # Computer, screen related classes
+    "graphic_design": [401, 402, 403, 404, 405],  # Art related classes
+    "photography": [759, 760, 761, 762, 763],  # Camera related classes
+    "ui_ux": [407, 408, 409, 722, 723],  # Similar to web design for this example
+    "logo_design": [401, 402, 403, 404, 405],  # Art related classes
+    "illustration": [401, 402, 403, 404, 405],  # Art related classes
+    "video_editing": [759, 760, 761, 762, 763],  # Camera related classes
+    "content_writing": [420, 421, 422, 423, 424],  # Book, document related classes
+}
+
+# (skills x classes) index matrix: the confidences for a whole batch are one
+# gather and mean over the model outputs
+SKILL_NAMES = list(skill_categories)
+SKILL_CLASS_INDEX = np.array([skill_categories[skill] for skill in SKILL_NAMES])
+
+
+def build_keras_model():
+    # Deferred imports: TensorFlow alone takes seconds to import
+    from tensorflow.keras.applications import ResNet50
+    return ResNet50(weights='imagenet', include_top=False, pooling='avg')
+
+
+def preprocess_image(img) -> np.ndarray:
+    # PIL image -> (224, 224, 3) float32 ResNet50 input
+    from tensorflow.keras.applications.resnet50 import preprocess_input
+    img = img.resize((IMAGE_SIZE, IMAGE_SIZE)).convert("RGB")  # ResNet50 input size
+    return preprocess_input(np.asarray(img, dtype=np.float32))
+
+
+def fixture_images(directory=DEFAULT_FIXTURE_DIR) -> Dict[str, np.ndarray]:
+    # Preprocessed PNG/JPEG fixtures by file name
+    paths = sorted(glob.glob(os.path.join(directory, "*.png")) + glob.glob(os.path.join(directory, "*.jpg")))
+    images = {}
+    for path in paths:
+        with Image.open(path) as img:
+            images[os.path.basename(path)] = preprocess_image(img)
+    return images
+
+
+class KerasBackend:
+    name = "keras"
+
+    def __init__(self, model=None):
+        self.model = model or build_keras_model()
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        return self.model(batch, training=False).numpy()
+
+
+class SavedModelBackend:
+    name = "savedmodel"
+
+    def __init__(self, path):
+        import tensorflow as tf
+        self._tf = tf
+        self._serve = tf.saved_model.load(path).signatures["serving_default"]
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        return self._serve(images=self._tf.constant(batch, dtype=self._tf.float32))["features"].numpy()
+
+
+class TFLiteBackend:
+    def __init__(self, path, name="tflite", num_threads=None):
+        import tensorflow as tf
+        self.name = name
+        self._interpreter = tf.lite.Interpreter(model_path=path, num_threads=num_threads or os.cpu_count())
+        self._input = self._interpreter.get_input_details()[0]["index"]
+        self._output = self._interpreter.get_output_details()[0]["index"]
+        self._batch_size = None
+        # The interpreter holds its tensors in place, so calls are serialised
+        self._lock = threading.Lock()
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        with self._lock:
+            if len(batch) != self._batch_size:
+                self._interpreter.resize_tensor_input(self._input, [len(batch), IMAGE_SIZE, IMAGE_SIZE, 3])
+                self._interpreter.allocate_tensors()
+                self._batch_size = len(batch)
+            self._interpreter.set_tensor(self._input, np.ascontiguousarray(batch, dtype=np.float32))
+            self._interpreter.invoke()
+            return self._interpreter.get_tensor(self._output).copy()
+
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, path):
+        import onnxruntime
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self._input = self._session.get_inputs()[0].name
+
+    def __call__(self, batch: np.ndarray) -> np.ndarray:
+        return self._session.run(None, {self._input: np.asarray(batch, dtype=np.float32)})[0]
+
+
+def load_backend(name: str, model_dir: str) -> Callable[[np.ndarray], np.ndarray]:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown skill model backend '{name}', expected one of {', '.join(BACKENDS)}")
+    if name == "keras":
+        return KerasBackend()
+    path = os.path.join(model_dir, BACKEND_FILES[name])
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No exported {name} model at {path}; run skill_model.py to export it")
+    if name == "savedmodel":
+        return SavedModelBackend(path)
+    if name == "onnx":
+        return OnnxBackend(path)
+    return TFLiteBackend(path, name)
+
+
+def read_manifest(model_dir: str) -> Optional[Dict]:
+    path = os.path.join(model_dir, "manifest.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def export_savedmodel(model, path):
+    import tensorflow as tf
+
+    @tf.function(jit_compile=True,
+                 input_signature=[tf.TensorSpec([None, IMAGE_SIZE, IMAGE_SIZE, 3], tf.float32, name="images")])
+    def serve(images):
+        return {"features": model(images, training=False)}
+
+    module = tf.Module()
+    module.model = model
+    module.serve = serve
+    tf.saved_model.save(module, path, signatures={"serving_default": serve})
+
+
+def export_tflite(model, path, quantization, representative: List[np.ndarray]):
+    # quantization is "int8" (full integer, calibrated on representative
+    # images, with float input and output) or "fp16"
+    import tensorflow as tf
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == "int8":
+        converter.representative_dataset = lambda: ([image[None]] for image in representative)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    else:
+        converter.target_spec.supported_types = [tf.float16]
+    with open(path, "wb") as f:
+        f.write(converter.convert())
+
+
+def export_onnx(model, path):
+    import tensorflow as tf
+    import tf2onnx
+    spec = (tf.TensorSpec([None, IMAGE_SIZE, IMAGE_SIZE, 3], tf.float32, name="images"),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=17, output_path=path)
+
+
+def check_parity(backend, reference: np.ndarray, images: np.ndarray, skill_class_index: np.ndarray) -> Dict:
+    # Agreement with the Keras features on the fixtures: worst cosine
+    # similarity, largest skill-confidence difference, and how many
+    # confidence > 0.5 decisions flip
+    features = np.concatenate([backend(images[i:i + 8]) for i in range(0, len(images), 8)])
+    cosine = np.sum(features * reference, axis=1) / (
+        np.linalg.norm(features, axis=1) * np.linalg.norm(reference, axis=1) + 1e-12
+    )
+    confidences = features[:, skill_class_index].mean(axis=2)
+    reference_confidences = reference[:, skill_class_index].mean(axis=2)
+    return {
+        "images": len(images),
+        "min_cosine": float(cosine.min()),
+        "max_confidence_error": float(np.abs(confidences - reference_confidences).max()),
+        "decision_flips": int(np.sum((confidences > 0.5) != (reference_confidences > 0.5))),
+    }
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Export the skill-verification model for CPU inference")
+    parser.add_argument("--model-dir", default=os.environ.get(
+        "SKILL_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_models")))
+    parser.add_argument("--backends", nargs="+", default=["savedmodel", "tflite-int8", "tflite-fp16", "onnx"],
+                        choices=[backend for backend in BACKENDS if backend != "keras"])
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURE_DIR, help="directory of PNG/JPEG parity images")
+    args = parser.parse_args()
+
+    import tensorflow as tf
+
+    fixtures = fixture_images(args.fixtures)
+    if not fixtures:
+        sys.exit(f"No PNG or JPEG fixtures in {args.fixtures}")
+    images = np.stack(list(fixtures.values()))
+    keras_backend = KerasBackend()
+    reference = np.concatenate([keras_backend(images[i:i + 8]) for i in range(0, len(images), 8)])
+
+    os.makedirs(args.model_dir, exist_ok=True)
+    manifest = read_manifest(args.model_dir) or {"backends": {}}
+    failures = []
+    for name in args.backends:
+        path = os.path.join(args.model_dir, BACKEND_FILES[name])
+        try:
+            if name == "savedmodel":
+                export_savedmodel(keras_backend.model, path)
+            elif name == "onnx":
+                export_onnx(keras_backend.model, path)
+            else:
+                export_tflite(keras_backend.model, path, name.split("-")[1], list(images))
+            parity = check_parity(load_backend(name, args.model_dir), reference, images, SKILL_CLASS_INDEX)
+        except ImportError as e:
+            logger.warning("Skipping %s: %s", name, e)
+            continue
+        parity["passed"] = parity["min_cosine"] >= PARITY_MIN_COSINE[name]
+        if not parity["passed"]:
+            failures.append(name)
+        manifest["backends"][name] = {
+            "path": BACKEND_FILES[name],
+            "exported_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "parity": parity,
+        }
+        logger.info("Exported %s to %s: min cosine %.5f, max confidence error %.4f, %d decision flips on %d fixtures",
+                    name, path, parity['min_cosine'], parity['max_confidence_error'], parity['decision_flips'],
+                    parity['images'])
+
+    manifest["tensorflow_version"] = tf.__version__
+    manifest["fixtures"] = sorted(fixtures)
+    with open(os.path.join(args.model_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    if failures:
+        sys.exit(f"Parity below threshold for: {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,68 @@
+import os
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.applications import ResNet50
-from tensorflow.keras.preprocessing import image
-from tensorflow.keras.applications.resnet50 import preprocess_input
-from tensorflow.keras.models import Model
 import fastapi
-from fastapi import FastAPI, File, UploadFile, Form
-from pydantic import BaseModel
-from typing import List, Dict, Optional
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Dict, Optional, Any, BinaryIO, Callable
 import io
 import json
 import base64
+import importlib.util
+import logging
+import secrets
+from itertools import groupby
 from PIL import Image
+from model_loader import ServiceWarmup, add_health_routes, configure_logging
+from micro_batcher import MicroBatcher
+from image_cache import ImageResultCache, dhash
+from skill_model import KerasBackend, load_backend, preprocess_image, read_manifest, SKILL_NAMES, SKILL_CLASS_INDEX
+from quiz_store import QuizStore
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Skill Verification API")
 
+# Models load on a background thread after startup; /health/ready reports
+# when they are in place
+warmup = ServiceWarmup("skill_verification")
+
+# Inference backend for the ResNet50 feature extractor: "keras" (eager
+# Keras, the default), or a graph exported by skill_model.py into
+# SKILL_MODEL_DIR: "savedmodel" (XLA), "tflite-int8", "tflite-fp16" or
+# "onnx". If the exported model cannot be loaded the service falls back to
+# Keras.
+SKILL_MODEL_BACKEND = os.environ.get("SKILL_MODEL_BACKEND", "keras")
+SKILL_MODEL_DIR = os.environ.get(
+    "SKILL_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_models")
+)
+
 # Load pre-trained ResNet50 model
-base_model = ResNet50(weights='imagenet', include_top=False, pooling='avg')
-model = Model(inputs=base_model.input, outputs=base_model.output)
-
-# Define skill categories and their corresponding ImageNet classes
-# This is a simplified mapping - in production, you would fine-tune on domain-specific data
-skill_categories = {
-    "web_design": [407, 408, 409, 722, 723],  # Computer, screen related classes
-    "graphic_design": [401, 402, 403, 404, 405],  # Art related classes
-    "photography": [759, 760, 761, 762, 763],  # Camera related classes
-    "ui_ux": [407, 408, 409, 722, 723],  # Similar to web design for this example
-    "logo_design": [401, 402, 403, 404, 405],  # Art related classes
-    "illustration": [401, 402, 403, 404, 405],  # Art related classes
-    "video_editing": [759, 760, 761, 762, 763],  # Camera related classes
-    "content_writing": [420, 421, 422, 423, 424],  # Book, document related classes
-}
+def load_resnet():
+    try:
+        return load_backend(SKILL_MODEL_BACKEND, SKILL_MODEL_DIR)
+    except Exception as e:
+        logger.warning("Error loading skill model backend %s: %s; using keras", SKILL_MODEL_BACKEND, e)
+        return KerasBackend()
+
+resnet = warmup.resource("resnet50", load_resnet)
+
+add_health_routes(app, warmup)
+
+# Upper bound on images per /verify-portfolio/images or /upload call
+MAX_PORTFOLIO_IMAGES = int(os.environ.get("MAX_PORTFOLIO_IMAGES", "30"))
+
+# Multipart uploads are cut off with a 413 as soon as the body passes
+# SKILL_MAX_UPLOAD_BYTES, and any single image over SKILL_MAX_IMAGE_BYTES is
+# rejected without being decoded
+SKILL_MAX_UPLOAD_BYTES = int(os.environ.get("SKILL_MAX_UPLOAD_BYTES", str(64 * 1024 * 1024)))
+SKILL_MAX_IMAGE_BYTES = int(os.environ.get("SKILL_MAX_IMAGE_BYTES", str(10 * 1024 * 1024)))
+
+# Multipart parsing needs the python-multipart package. Without it,
+# /verify-portfolio/upload falls back to the base64 JSON body of
+# /verify-portfolio/images and answers multipart bodies with a 415.
+MULTIPART_AVAILABLE = any(importlib.util.find_spec(name) is not None for name in ("python_multipart", "multipart"))
 
 # Mock quiz data for skill assessment
 mock_quizzes = {
@@ -51,73 +83,147 @@ mock_quizzes = {
     ]
 }
 
+# Quiz item banks: a directory of {category}.json files or a SQLite file
+# (see quiz_store.py). Without QUIZ_BANK_PATH the mock quizzes are served.
+QUIZ_BANK_PATH = os.environ.get("QUIZ_BANK_PATH")
+quiz_store = warmup.resource("quiz_store", lambda: QuizStore.load(QUIZ_BANK_PATH, mock_quizzes))
+
 class PortfolioAnalysisRequest(BaseModel):
     user_id: int
     image_data: str  # Base64 encoded image
     claimed_skills: List[str]
 
+class PortfolioImagesRequest(BaseModel):
+    user_id: int
+    images: List[str]  # Base64 encoded images
+    claimed_skills: List[str]
+
 class QuizSubmissionRequest(BaseModel):
     user_id: int
     skill_category: str
     answers: List[int]
+    # Set for sampled quizzes: the values returned by /quiz/{skill_category}
+    attempt_seed: Optional[int] = Field(None, ge=0)
+    question_count: Optional[int] = Field(None, ge=1)
+
+class BatchQuizSubmissionRequest(BaseModel):
+    submissions: List[QuizSubmissionRequest]
 
 class SkillVerificationResponse(BaseModel):
     user_id: int
-    verified_skills: List[Dict[str, any]]
+    verified_skills: List[Dict[str, Any]]
     confidence_scores: Dict[str, float]
     verification_method: str
 
+class PortfolioVerificationResponse(SkillVerificationResponse):
+    # Per image: {"index", "confidence_scores", "cache"} or {"index", "error"}
+    images: List[Dict[str, Any]]
+
+def skill_confidences(images: List[np.ndarray]) -> np.ndarray:
+    # One forward pass for the whole batch; returns (images x skills)
+    outputs = resnet.get()(np.stack(images))
+    # This is a simplified approach - in production you would use a more sophisticated model
+    return outputs[:, SKILL_CLASS_INDEX].mean(axis=2)
+
+# Images from concurrent requests share one forward pass on a worker thread
+image_batcher = MicroBatcher(
+    skill_confidences,
+    max_batch_size=int(os.environ.get("SKILL_IMAGE_MAX_BATCH_SIZE", "32")),
+    max_wait_ms=float(os.environ.get("SKILL_IMAGE_MAX_WAIT_MS", "10")),
+)
+
+# Per-image skill confidences keyed by content: re-uploads of the same bytes
+# and near-duplicates (dHash within SKILL_IMAGE_CACHE_MAX_DISTANCE bits) skip
+# ResNet50. The accounts behind each image feed /image-reuse.
+image_cache = ImageResultCache(
+    max_entries=int(os.environ.get("SKILL_IMAGE_CACHE_SIZE", "20000")),
+    ttl_seconds=float(os.environ.get("SKILL_IMAGE_CACHE_TTL_SECONDS", "86400")),
+    policy=os.environ.get("SKILL_IMAGE_CACHE_POLICY", "lru"),
+    max_distance=int(os.environ.get("SKILL_IMAGE_CACHE_MAX_DISTANCE", "6")),
+)
+
+def prepare_image(source: BinaryIO, user_id: int, draft=False) -> Dict[str, Any]:
+    # Cached confidences when the image is known, otherwise the model input;
+    # "cache" is "exact", "near" or "miss"
+    sha256 = image_cache.sha256(source)
+    confidences = image_cache.get_exact(sha256, user_id)
+    if confidences is not None:
+        return {"cache": "exact", "confidences": confidences}
+    img = Image.open(source)
+    if draft:
+        # JPEGs are decoded at the smallest DCT scale (1/2 to 1/8) that still
+        # covers 224x224, skipping most of the full-size decode
+        img.draft("RGB", (224, 224))
+    image_hash = dhash(img)
+    near = image_cache.get_near(image_hash, user_id)
+    if near is not None:
+        return {"cache": "near", "confidences": near[0], "distance": near[1]}
+    return {"cache": "miss", "sha256": sha256, "dhash": image_hash, "input": preprocess_image(img)}
+
+def open_base64(image_data: str) -> BinaryIO:
+    return io.BytesIO(base64.b64decode(image_data))
+
+async def score_images(images: List[Any], user_id: int, open_image: Callable[[Any], BinaryIO] = open_base64,
+                       draft=False):
+    # -> ({index: prepared image with "confidences"}, {index: error}).
+    # Decoding runs in the threadpool, and the cache misses from the whole
+    # list go to the batcher together.
+    def prepare_all():
+        prepared, errors = {}, {}
+        for index, image in enumerate(images):
+            try:
+                prepared[index] = prepare_image(open_image(image), user_id, draft)
+            except Exception as e:
+                errors[index] = str(e)
+        return prepared, errors
+    
+    prepared, errors = await run_in_threadpool(prepare_all)
+    misses = [item for item in prepared.values() if item["cache"] == "miss"]
+    if misses:
+        confidences = await image_batcher.submit([item.pop("input") for item in misses])
+        for item, row in zip(misses, confidences):
+            item["confidences"] = row
+            image_cache.put(item.pop("sha256"), item.pop("dhash"), row, user_id)
+    return prepared, errors
+
+def verify_claimed_skills(claimed_skills: List[str], confidence_scores: Dict[str, float]) -> List[Dict[str, Any]]:
+    # Determine verified skills based on confidence threshold
+    verified_skills = []
+    for skill in claimed_skills:
+        skill_key = skill.lower().replace(" ", "_")
+        if skill_key in confidence_scores:
+            is_verified = confidence_scores[skill_key] > 0.5  # Threshold
+            verified_skills.append({
+                "name": skill,
+                "verified": is_verified,
+                "confidence": confidence_scores[skill_key],
+                "verification_method": "portfolio"
+            })
+        else:
+            # If we don't have a model for this skill, default to unverified
+            verified_skills.append({
+                "name": skill,
+                "verified": False,
+                "confidence": 0.0,
+                "verification_method": "portfolio"
+            })
+    return verified_skills
+
 @app.post("/verify-portfolio", response_model=SkillVerificationResponse)
 async def verify_portfolio(request: PortfolioAnalysisRequest):
     user_id = request.user_id
     claimed_skills = request.claimed_skills
+    warmup.require_ready()
     
-    # Decode base64 image
     try:
-        image_data = base64.b64decode(request.image_data)
-        img = Image.open(io.BytesIO(image_data))
-        img = img.resize((224, 224))  # ResNet50 input size
-        img_array = image.img_to_array(img)
-        img_array = np.expand_dims(img_array, axis=0)
-        img_array = preprocess_input(img_array)
-        
-        # Get image features
-        features = model.predict(img_array)
-        
-        # Get ImageNet predictions
-        base_predictions = base_model.predict(img_array)
-        
-        # Calculate skill confidence scores
-        confidence_scores = {}
-        for skill, related_classes in skill_categories.items():
-            # This is a simplified approach - in production you would use a more sophisticated model
-            confidence = np.mean([base_predictions[0, cls] for cls in related_classes])
-            confidence_scores[skill] = float(confidence)
-        
-        # Determine verified skills based on confidence threshold
-        verified_skills = []
-        for skill in claimed_skills:
-            skill_key = skill.lower().replace(" ", "_")
-            if skill_key in confidence_scores:
-                is_verified = confidence_scores[skill_key] > 0.5  # Threshold
-                verified_skills.append({
-                    "name": skill,
-                    "verified": is_verified,
-                    "confidence": confidence_scores[skill_key],
-                    "verification_method": "portfolio"
-                })
-            else:
-                # If we don't have a model for this skill, default to unverified
-                verified_skills.append({
-                    "name": skill,
-                    "verified": False,
-                    "confidence": 0.0,
-                    "verification_method": "portfolio"
-                })
+        prepared, errors = await score_images([request.image_data], user_id)
+        if errors:
+            raise ValueError(errors[0])
+        confidence_scores = dict(zip(SKILL_NAMES, prepared[0]["confidences"].tolist()))
         
         return {
             "user_id": user_id,
-            "verified_skills": verified_skills,
+            "verified_skills": verify_claimed_skills(claimed_skills, confidence_scores),
             "confidence_scores": confidence_scores,
             "verification_method": "portfolio"
         }
@@ -130,31 +236,112 @@ async def verify_portfolio(request: PortfolioAnalysisRequest):
             "verification_method": f"error: {str(e)}"
         }
 
-@app.post("/verify-quiz", response_model=SkillVerificationResponse)
-async def verify_quiz(request: QuizSubmissionRequest):
-    user_id = request.user_id
-    skill_category = request.skill_category
-    user_answers = request.answers
-    
-    if skill_category not in mock_quizzes:
+def portfolio_response(user_id: int, claimed_skills: List[str], prepared, errors) -> Dict[str, Any]:
+    # The portfolio confidence for a skill is its mean over the images that
+    # decoded
+    images = [{"index": index, "error": error} for index, error in errors.items()]
+    if not prepared:
         return {
             "user_id": user_id,
-            "verified_skills": [{"name": skill_category, "verified": False, "confidence": 0.0, "verification_method": "quiz"}],
-            "confidence_scores": {skill_category: 0.0},
-            "verification_method": "quiz"
+            "verified_skills": [{"name": skill, "verified": False, "confidence": 0.0, "verification_method": "error"} for skill in claimed_skills],
+            "confidence_scores": {},
+            "verification_method": "error: no image could be decoded",
+            "images": images
         }
     
-    # Get correct answers for the quiz
-    quiz = mock_quizzes[skill_category]
-    correct_answers = [q["answer"] for q in quiz]
+    confidences = np.stack([item["confidences"] for item in prepared.values()])
+    confidence_scores = dict(zip(SKILL_NAMES, confidences.mean(axis=0).tolist()))
+    images += [
+        {"index": index, "confidence_scores": dict(zip(SKILL_NAMES, row)), "cache": item["cache"]}
+        for (index, item), row in zip(prepared.items(), confidences.tolist())
+    ]
+    images.sort(key=lambda item: item["index"])
+    return {
+        "user_id": user_id,
+        "verified_skills": verify_claimed_skills(claimed_skills, confidence_scores),
+        "confidence_scores": confidence_scores,
+        "verification_method": "portfolio",
+        "images": images
+    }
+
+@app.post("/verify-portfolio/images", response_model=PortfolioVerificationResponse)
+async def verify_portfolio_images(request: PortfolioImagesRequest):
+    # A whole portfolio in one call: images that decode are scored in one
+    # batch (minus cache hits)
+    warmup.require_ready()
+    if not request.images:
+        raise HTTPException(status_code=422, detail="images must not be empty")
+    if len(request.images) > MAX_PORTFOLIO_IMAGES:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_PORTFOLIO_IMAGES} images per portfolio")
     
-    # Calculate score
-    if len(user_answers) != len(correct_answers):
-        score = 0.0
-    else:
-        correct_count = sum(1 for ua, ca in zip(user_answers, correct_answers) if ua == ca)
-        score = correct_count / len(correct_answers)
+    try:
+        prepared, errors = await score_images(request.images, request.user_id)
+    except Exception as e:
+        return {
+            "user_id": request.user_id,
+            "verified_skills": [{"name": skill, "verified": False, "confidence": 0.0, "verification_method": "error"} for skill in request.claimed_skills],
+            "confidence_scores": {},
+            "verification_method": f"error: {str(e)}",
+            "images": []
+        }
+    return portfolio_response(request.user_id, request.claimed_skills, prepared, errors)
+
+def limit_body(request: Request, max_bytes: int) -> Request:
+    # The same request with its body cut off at max_bytes: the 413 is raised
+    # while the form parser is still reading, not after the whole body
+    received = 0
     
+    async def receive():
+        nonlocal received
+        message = await request.receive()
+        received += len(message.get("body", b""))
+        if received > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+        return message
+    
+    return Request(request.scope, receive)
+
+@app.post("/verify-portfolio/upload", response_model=PortfolioVerificationResponse)
+async def verify_portfolio_upload(request: Request):
+    # Multipart form: user_id, one claimed_skills field per skill and one
+    # "images" file part per image. Parts are spooled to temporary files as
+    # they arrive, and images are hashed and decoded from those files in
+    # the threadpool, so no image is held as a base64 string or bytes copy.
+    # JSON bodies (and every body when python-multipart is not installed)
+    # take the base64 path of /verify-portfolio/images.
+    warmup.require_ready()
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > SKILL_MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {SKILL_MAX_UPLOAD_BYTES} bytes")
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith("multipart/form-data") or not MULTIPART_AVAILABLE:
+        if content_type.startswith("multipart/"):
+            raise HTTPException(status_code=415, detail="Multipart uploads are not available on this server; "
+                                                        "send base64 images as JSON instead")
+        try:
+            images_request = PortfolioImagesRequest.model_validate_json(
+                await limit_body(request, SKILL_MAX_UPLOAD_BYTES).body())
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+        return await verify_portfolio_images(images_request)
+    
+    async with limit_body(request, SKILL_MAX_UPLOAD_BYTES).form(max_files=MAX_PORTFOLIO_IMAGES) as form:
+        try:
+            user_id = int(form.get("user_id"))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=422, detail="user_id must be an integer form field")
+        claimed_skills = [skill for skill in form.getlist("claimed_skills") if isinstance(skill, str)]
+        uploads = [upload for upload in form.getlist("images") if not isinstance(upload, str)]
+        if not uploads:
+            raise HTTPException(status_code=422, detail="images must not be empty")
+        oversized = [upload.filename for upload in uploads if upload.size is not None and upload.size > SKILL_MAX_IMAGE_BYTES]
+        if oversized:
+            raise HTTPException(status_code=413, detail=f"Images over {SKILL_MAX_IMAGE_BYTES} bytes: {', '.join(map(str, oversized))}")
+        
+        prepared, errors = await score_images(uploads, user_id, open_image=lambda upload: upload.file, draft=True)
+        return portfolio_response(user_id, claimed_skills, prepared, errors)
+
+def quiz_result(user_id: int, skill_category: str, score: float) -> Dict[str, Any]:
     # Determine if skill is verified based on score threshold
     is_verified = score >= 0.7  # 70% threshold
     
@@ -165,25 +352,98 @@ async def verify_quiz(request: QuizSubmissionRequest):
         "verification_method": "quiz"
     }
 
+def grade_quizzes(submissions: List[QuizSubmissionRequest]) -> List[Dict[str, Any]]:
+    # Submissions for the same bank and question count are graded together
+    # against the precompiled answer key. A sampled quiz is graded against
+    # the questions its seed selected, so the seed and count come together.
+    for i, submission in enumerate(submissions):
+        if (submission.attempt_seed is None) != (submission.question_count is None):
+            where = f" (submission {i})" if len(submissions) > 1 else ""
+            raise HTTPException(status_code=422,
+                                detail=f"attempt_seed and question_count must be sent together{where}")
+    store = quiz_store.get()
+    scores = [0.0] * len(submissions)
+    group_key = lambda i: (submissions[i].skill_category, submissions[i].question_count or 0)
+    for (skill_category, question_count), group in groupby(sorted(range(len(submissions)), key=group_key), group_key):
+        group = list(group)
+        bank = store.get(skill_category)
+        if bank is None:
+            continue
+        if question_count:
+            seeds = [submissions[i].attempt_seed for i in group]
+            graded = bank.grade([submissions[i].answers for i in group], seeds, question_count)
+        else:
+            graded = bank.grade([submissions[i].answers for i in group])
+        for i, score in zip(group, graded.tolist()):
+            scores[i] = score
+    return [quiz_result(submission.user_id, submission.skill_category, score)
+            for submission, score in zip(submissions, scores)]
+
+@app.post("/verify-quiz", response_model=SkillVerificationResponse)
+async def verify_quiz(request: QuizSubmissionRequest):
+    warmup.require_ready()
+    return grade_quizzes([request])[0]
+
+@app.post("/verify-quiz/batch")
+def verify_quiz_batch(request: BatchQuizSubmissionRequest):
+    warmup.require_ready()
+    return {"results": grade_quizzes(request.submissions)}
+
 @app.get("/quiz/{skill_category}")
-async def get_quiz(skill_category: str):
-    if skill_category not in mock_quizzes:
+async def get_quiz(skill_category: str, question_count: Optional[int] = Query(None, ge=1),
+                   attempt_seed: Optional[int] = Query(None, ge=0)):
+    # The answer-free quiz, served from bytes serialised when the bank was
+    # loaded. With question_count, a sample of the bank is drawn by
+    # attempt_seed (a fresh one if not given); submit both back with the
+    # answers.
+    warmup.require_ready()
+    bank = quiz_store.get().get(skill_category)
+    if bank is None:
         return {"error": "Quiz not found for this skill category"}
-    
-    # Return quiz questions without answers
-    quiz_questions = []
-    for q in mock_quizzes[skill_category]:
-        quiz_questions.append({
-            "question": q["question"],
-            "options": q["options"]
-        })
-    
-    return {"skill_category": skill_category, "questions": quiz_questions}
+    if question_count is not None and attempt_seed is None:
+        attempt_seed = secrets.randbelow(2 ** 31)
+    return Response(bank.quiz_json(attempt_seed, question_count), media_type="application/json")
+
+@app.get("/quiz-store/stats")
+async def quiz_store_stats():
+    warmup.require_ready()
+    return quiz_store.get().stats()
+
+@app.get("/model-info")
+async def model_info():
+    # The backend actually serving, and its export parity record if any
+    warmup.require_ready()
+    manifest = read_manifest(SKILL_MODEL_DIR) or {"backends": {}}
+    backend = resnet.get().name
+    return {
+        "backend": backend,
+        "requested_backend": SKILL_MODEL_BACKEND,
+        "model_dir": SKILL_MODEL_DIR,
+        "export": manifest["backends"].get(backend),
+        "tensorflow_version": manifest.get("tensorflow_version")
+    }
+
+@app.get("/image-batcher/stats")
+async def image_batcher_stats():
+    return image_batcher.stats()
+
+@app.get("/image-cache/stats")
+async def image_cache_stats():
+    return image_cache.stats()
+
+@app.get("/image-reuse")
+async def image_reuse(min_accounts: int = 2, limit: int = 100):
+    # Portfolio images uploaded from several accounts, including re-encoded
+    # or lightly edited copies matched by the near-duplicate tier
+    return {"images": image_cache.reuse_report(min_accounts, limit)}
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
+warmup.mark_imported()
+
 if __name__ == "__main__":
+    configure_logging()
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
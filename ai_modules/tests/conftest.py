@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Service modules import their siblings flat, as when run from ai_modules/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
@@ -0,0 +1,91 @@
+import time
+import pytest
+
+from activity_features import ActivityFeatureStore
+
+# Sliding-window features from raw events: stale and future events, window
+# expiry, user eviction and the HyperLogLog IP count.
+
+HOUR = 3600
+
+
+@pytest.fixture
+def store():
+    return ActivityFeatureStore(window_seconds=24 * HOUR, n_buckets=12, max_users=3)
+
+
+def test_events_older_than_the_window_are_stale_for_new_and_known_users(store):
+    now = time.time()
+    assert store.add(1, "bid", now - 5 * 24 * HOUR) is False
+    assert 1 not in store
+    assert store.add(2, "bid", now) is True
+    assert store.add(2, "bid", now - 25 * HOUR) is False
+    assert store.features(1)["bids_per_day"] == 0.0
+    assert store.features(2)["bids_per_day"] == 1.0
+    assert store.stats()["stale_events"] == 2 and store.stats()["events"] == 1
+
+
+def test_events_leave_the_window_as_it_moves(store):
+    now = time.time()
+    for hours_ago in (1, 5, 20):
+        store.add(1, "payment", now - hours_ago * HOUR, amount=100.0 * hours_ago)
+    features = store.features(1, now)
+    assert features["payment_amount"] == pytest.approx((100 + 500 + 2000) / 3)
+    later = store.features(1, now + 10 * HOUR)
+    assert later["payment_amount"] == pytest.approx((100 + 500) / 2)
+    assert store.features(1, now + 30 * HOUR)["payment_amount"] == 0.0
+
+
+def test_far_future_timestamps_are_clamped(store):
+    now = time.time()
+    assert store.add(1, "bid", now + 365 * 24 * HOUR) is True
+    # A far-future event did not claim the ring: recent events still count
+    assert store.add(1, "bid", now - HOUR) is True
+    assert store.features(1, now + 300)["bids_per_day"] == 2.0
+
+
+def test_least_recently_active_users_are_evicted(store):
+    now = time.time()
+    for user_id in (1, 2, 3):
+        store.add(user_id, "login", now)
+    store.add(1, "login", now)
+    store.add(4, "login", now)
+    assert 2 not in store and all(user_id in store for user_id in (1, 3, 4))
+    assert store.stats()["evictions"] == 1
+
+
+def test_ip_counts_are_approximate_distinct_counts(store):
+    now = time.time()
+    for i in range(3):
+        store.add(1, "login", now, ip_address="10.0.0.1")
+    assert store.features(1)["ip_address_count"] == 1
+    for i in range(40):
+        store.add(2, "login", now - (i % 20) * HOUR, ip_address=f"10.0.{i // 256}.{i % 256}")
+    assert store.features(2)["ip_address_count"] == pytest.approx(40, rel=0.35)
+
+
+def test_unknown_event_types_are_rejected(store):
+    with pytest.raises(ValueError):
+        store.add(1, "logout")
+
+
+def login_variance(hours, day):
+    store = ActivityFeatureStore(window_seconds=7 * 24 * HOUR, n_buckets=14)
+    for hour in hours:
+        assert store.add(1, "login", day + hour * HOUR)
+    return store.features(1)["login_time_variance"]
+
+
+def test_login_hour_spread_wraps_around_midnight():
+    # Logins at 23:00 and 01:00 are as close as 11:00 and 13:00
+    day = (time.time() // 86400 - 2) * 86400  # midnight UTC two days ago
+    late = login_variance([23, 25], day)
+    midday = login_variance([11, 13], day)
+    assert late == pytest.approx(midday) and late == pytest.approx(1.0, rel=0.02)
+    assert login_variance([9, 9, 9], day) == pytest.approx(0.0, abs=1e-9)
+    assert login_variance([0, 6, 12, 18], day) == pytest.approx(48.0)
+    assert login_variance([], day) == 0.0
+    # Tight daytime clusters keep the scale of the plain variance in hours
+    hours = [9, 10, 11, 10, 9.5, 10.5]
+    plain = sum((hour - 10) ** 2 for hour in hours) / len(hours)
+    assert login_variance(hours, day) == pytest.approx(plain, rel=0.05)
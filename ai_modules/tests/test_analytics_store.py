@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics_store import DAY, AnalyticsStore
+
+# Rollup queries against a pandas recompute from the raw events.
+
+START = 1_735_689_600  # 2025-01-01, a Wednesday
+
+
+@pytest.fixture
+def events():
+    rng = np.random.default_rng(0)
+    timestamps = START + rng.integers(0, 120 * DAY, 5000)
+    values = rng.gamma(2.0, 50.0, len(timestamps))
+    return timestamps, values
+
+
+def reference(timestamps, values, start, end, rule):
+    frame = pd.Series(values, index=pd.to_datetime(timestamps, unit="s"))
+    window = frame[(frame.index >= pd.to_datetime(start, unit="s")) & (frame.index < pd.to_datetime(end, unit="s"))]
+    return window.resample(rule).sum()
+
+
+@pytest.mark.parametrize("start,end", [(START, START + 90 * DAY), (START + 3600 * 5, START + 40 * DAY + 7200),
+                                       (START - 10 * DAY, START + 200 * DAY)])
+def test_total_matches_raw_events(events, start, end):
+    store = AnalyticsStore(["total_earnings"])
+    store.add("total_earnings", *events)
+    timestamps, values = events
+    expected = values[(timestamps >= start) & (timestamps < end)].sum()
+    assert store.total("total_earnings", start, end) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("granularity,rule", [("hour", "h"), ("day", "D"), ("week", "W-MON")])
+def test_series_matches_resample(events, granularity, rule):
+    store = AnalyticsStore(["total_earnings"])
+    store.add("total_earnings", *events)
+    start, end = START + 7 * DAY, START + 63 * DAY
+    times, totals = store.series("total_earnings", start, end, granularity)
+    assert totals.sum() == pytest.approx(reference(*events, start, end, "D").sum())
+    if granularity != "week":
+        expected = reference(*events, start, end, rule)
+        np.testing.assert_allclose(totals[:len(expected)], expected.to_numpy())
+    assert (np.diff(times) > 0).all() and times[0] == start
+
+
+def test_events_before_and_after_a_query_rebuild_the_prefix(events):
+    store = AnalyticsStore(["total_earnings"])
+    store.add("total_earnings", *events)
+    before = store.total("total_earnings", START, START + 200 * DAY)
+    store.add("total_earnings", [START + 119 * DAY, START - 30 * DAY], [10.0, 5.0])
+    assert store.total("total_earnings", START - 30 * DAY, START + 200 * DAY) == pytest.approx(before + 15.0)
+    assert store.earliest == START - 30 * DAY
+
+
+def test_empty_store_and_ranges():
+    store = AnalyticsStore(["user_signups"])
+    assert store.total("user_signups", START, START + DAY) == 0.0
+    assert store.summary("user_signups", START, START) == {"total": 0.0, "buckets": 0}
+    with pytest.raises(KeyError):
+        store.total("unknown", START, START + DAY)
+
+
+@pytest.mark.parametrize("bad", [np.nan, np.inf, -np.inf])
+def test_non_finite_values_are_rejected_without_poisoning_the_rollups(events, bad):
+    store = AnalyticsStore(["total_earnings"])
+    store.add("total_earnings", *events)
+    expected = store.summary("total_earnings", START, START + 120 * DAY)
+    with pytest.raises(ValueError):
+        store.add("total_earnings", [START + DAY, START + 2 * DAY], [1.0, bad])
+    assert store.summary("total_earnings", START, START + 120 * DAY) == expected
+    assert np.isfinite(store.series("total_earnings", START, START + 120 * DAY, "hour")[1]).all()
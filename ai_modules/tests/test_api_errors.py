@@ -0,0 +1,33 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, ConfigDict
+
+from api_errors import add_validation_error_handler
+
+# Rejected NaN and infinity come back as a 422, not a 500 from encoding them.
+
+
+class Reading(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
+    
+    value: float
+
+
+app = FastAPI()
+add_validation_error_handler(app)
+
+
+@app.post("/readings")
+async def add_reading(reading: Reading):
+    return {"value": reading.value}
+
+
+def test_non_finite_inputs_are_reported_as_strings():
+    client = TestClient(app, raise_server_exceptions=False)
+    for literal, reported in (("NaN", "nan"), ("Infinity", "inf"), ("-Infinity", "-inf"), ("1e400", "inf")):
+        response = client.post("/readings", content=f'{{"value": {literal}}}',
+                               headers={"content-type": "application/json"})
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["input"] == reported
+    assert client.post("/readings", json={"value": 2.5}).json() == {"value": 2.5}
+    assert client.post("/readings", json={}).status_code == 422
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from collaborative import CollaborativeModel, CollaborativeRefresher
+
+# Item-item scores against Jaccard similarities computed from sets, plus
+# cold-start inputs and background refresh.
+
+
+def jaccard_scores(histories, history, project_ids, max_neighbours):
+    users = {}
+    for user, items in enumerate(histories):
+        for item in items:
+            users.setdefault(item, set()).add(user)
+    neighbours = {}
+    for item, item_users in users.items():
+        similar = [(len(item_users & other_users) / len(item_users | other_users), other)
+                   for other, other_users in users.items() if other != item and item_users & other_users]
+        similar.sort(key=lambda pair: (-pair[0], pair[1]))
+        neighbours[item] = dict((other, score) for score, other in similar[:max_neighbours])
+    totals = {}
+    for item in set(history) & set(users):
+        for other, score in neighbours[item].items():
+            if other not in history:
+                totals[other] = totals.get(other, 0.0) + score
+    best = max(totals.values(), default=0.0)
+    return np.array([totals.get(p, 0.0) / best if best > 0 else 0.0 for p in project_ids])
+
+
+@pytest.mark.parametrize("max_neighbours", [2, 50])
+def test_scores_match_set_based_jaccard(max_neighbours):
+    rng = np.random.default_rng(0)
+    histories = [rng.choice(30, rng.integers(1, 8), replace=False).tolist() for _ in range(200)]
+    model = CollaborativeModel(histories, max_neighbours=max_neighbours)
+    project_ids = np.arange(-2, 35)
+    for history in ([1, 2, 3], [5], [7, 7, 40], [31]):
+        expected = jaccard_scores(histories, history, project_ids, max_neighbours)
+        np.testing.assert_allclose(model.score(history, project_ids), expected, rtol=1e-5, atol=1e-6)
+
+
+def test_cold_start_inputs_score_zero():
+    model = CollaborativeModel([[1, 2], [2, 3]])
+    assert model.score([], [1, 2, 3]).tolist() == [0.0, 0.0, 0.0]
+    assert model.score([99], [1, 2, 3]).tolist() == [0.0, 0.0, 0.0]
+    assert model.score([1], []).tolist() == []
+    empty = CollaborativeModel([])
+    assert empty.user_count == 0 and empty.score([1], [1, 2]).tolist() == [0.0, 0.0]
+    # Projects already in the history are never recommended back
+    assert model.score([1, 2], [1, 2, 3]).tolist() == [0.0, 0.0, 1.0]
+
+
+def test_refresher_swaps_in_rebuilt_models():
+    histories = [[[1, 2]]]
+    refresher = CollaborativeRefresher(lambda: histories[-1], interval_seconds=3600, max_neighbours=5)
+    first = refresher.model
+    assert first.max_neighbours == 5 and first.score([1], [2]).tolist() == [1.0]
+    histories.append([[1, 3]])
+    second = refresher.refresh()
+    assert refresher.model is second and second is not first
+    assert second.score([1], [2, 3]).tolist() == [0.0, 1.0]
+    assert first.score([1], [2, 3]).tolist() == [1.0, 0.0]
@@ -0,0 +1,107 @@
+import os
+import numpy as np
+import pytest
+
+import embedding_cache
+from embedding_cache import EmbeddingCache
+
+# Memory LRU/TTL behaviour and the bounded, shared disk tier.
+
+
+class FakeModel:
+    def __init__(self, dim=8):
+        self.dim = dim
+        self.encoded = []
+
+    def encode(self, texts):
+        self.encoded.extend(texts)
+        return np.stack([np.random.default_rng(abs(hash(text)) % 2 ** 32).standard_normal(self.dim)
+                         for text in texts]).astype(np.float32)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(embedding_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_hits_are_keyed_by_normalised_text_and_misses_encode_once():
+    cache, model = EmbeddingCache(max_entries=10), FakeModel()
+    first = cache.encode(model, "m", ["Python  Django", "React", "React"])
+    assert model.encoded == ["Python  Django", "React"]
+    again = cache.encode(model, "m", ["python django", "PYTHON DJANGO"])
+    assert len(model.encoded) == 2
+    np.testing.assert_array_equal(again[0], first[0])
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 3)
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache, model = EmbeddingCache(max_entries=2), FakeModel()
+    cache.encode(model, "m", ["a", "b"])
+    cache.encode(model, "m", ["a"])  # b is now least recently used
+    cache.encode(model, "m", ["c"])
+    assert [v is not None for v in cache.get_many("m", ["a", "b", "c"])] == [True, False, True]
+    assert cache.stats()["evictions"] == 1 and cache.stats()["size"] == 2
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache, model = EmbeddingCache(ttl_seconds=10), FakeModel()
+    cache.encode(model, "m", ["a"])
+    clock[0] += 9.9
+    assert cache.get_many("m", ["a"])[0] is not None
+    clock[0] += 0.2
+    assert cache.get_many("m", ["a"])[0] is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_disk_tier_warms_a_new_worker(tmp_path):
+    model = FakeModel()
+    vectors = EmbeddingCache(disk_dir=str(tmp_path)).encode(model, "m", ["a", "b"])
+    restarted = EmbeddingCache(disk_dir=str(tmp_path))
+    found = restarted.get_many("m", ["a", "b", "c"])
+    np.testing.assert_allclose(np.stack(found[:2]), vectors, atol=1e-2)
+    assert found[2] is None
+    assert (restarted.stats()["disk_hits"], restarted.stats()["misses"]) == (2, 1)
+
+
+def test_disk_tier_is_bounded_by_rotation(tmp_path):
+    model = FakeModel()
+    cache = EmbeddingCache(max_entries=1, disk_dir=str(tmp_path), disk_max_rows=5)
+    texts = [f"text {i}" for i in range(23)]
+    for text in texts:
+        cache.encode(model, "m", [text])
+    record_size = 40 + 2 * model.dim
+    sizes = [os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path) if not name.endswith(".json")]
+    assert len(sizes) == 2 and all(size <= 5 * record_size for size in sizes)
+    model_file = cache.disk._files["m"]
+    assert len(model_file.current.rows) + len(model_file.previous.rows) <= 10
+    # The newest texts are still on disk, the oldest are gone
+    fresh = EmbeddingCache(disk_dir=str(tmp_path), disk_max_rows=5)
+    assert fresh.get_many("m", [texts[-1]])[0] is not None
+    assert fresh.get_many("m", [texts[0]])[0] is None
+
+
+def test_hits_in_the_previous_generation_survive_rotation(tmp_path):
+    model = FakeModel()
+    cache = EmbeddingCache(max_entries=1, disk_dir=str(tmp_path), disk_max_rows=3)
+    for text in ["keep", "b", "c", "d"]:  # "keep" rotates into the previous file
+        cache.encode(model, "m", [text])
+    cache.encode(model, "m", ["keep"])  # disk hit, copied into the current file
+    for text in ["e", "f"]:  # rotates again, dropping the old previous file
+        cache.encode(model, "m", [text])
+    fresh = EmbeddingCache(disk_dir=str(tmp_path), disk_max_rows=3)
+    assert fresh.get_many("m", ["keep"])[0] is not None
+    assert model.encoded.count("keep") == 1
+
+
+def test_workers_sharing_a_directory_see_each_others_rotations(tmp_path):
+    model = FakeModel()
+    writer = EmbeddingCache(max_entries=1, disk_dir=str(tmp_path), disk_max_rows=2)
+    reader = EmbeddingCache(max_entries=1, disk_dir=str(tmp_path), disk_max_rows=2)
+    writer.encode(model, "m", ["a"])
+    assert reader.get_many("m", ["a"])[0] is not None
+    writer.encode(model, "m", ["b", "c", "d", "e"])
+    assert reader.get_many("m", ["e"])[0] is not None
+    assert reader.get_many("m", ["a"])[0] is None
@@ -0,0 +1,166 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+from sklearn.ensemble import IsolationForest
+
+import fraud_detector
+from fraud_detector import FEATURE_NAMES, UserActivityRequest, detect_fraud_many, fraud_reasons
+from fraud_fastpath import CompiledFraudEnsemble, parity_probe
+from fraud_model import FAST_PATH_MAX_ROWS, FAST_PATH_TOLERANCE, synthetic_training_data, train_bundle
+
+# The flat-array fraud path against sklearn: isolation forest scores from
+# IsolationForest.score_samples / decision_function, the ensembled scores and
+# statuses from detect_fraud_many, and the vectorised reasons against the
+# original per-request rules.
+
+FOREST_PARAMS = [{}, {"max_features": 0.5}, {"bootstrap": True, "random_state": 7}, {"max_samples": 64}]
+
+
+@pytest.fixture(scope="module")
+def training_data():
+    return synthetic_training_data()
+
+
+@pytest.fixture(scope="module")
+def service_bundle():
+    fraud_detector.warmup.load_all()
+    return fraud_detector.fraud_models.get().bundle
+
+
+def edge_rows(scaler, X):
+    # Random rows around the training data, far outliers, all-zero activity,
+    # values that overflow float32, and ties on the tree thresholds
+    rng = np.random.default_rng(1)
+    zeros = np.zeros((4, X.shape[1]))
+    huge = np.full((2, X.shape[1]), 1e12)
+    overflow = np.full((2, X.shape[1]), 1e300)
+    return np.vstack([
+        parity_probe(scaler, 2048, seed=3),
+        X * rng.uniform(-20, 20, X.shape),
+        zeros, huge, overflow, -huge,
+    ])
+
+
+def reference_reasons(row, status):
+    # The per-request rules the vectorised fraud_reasons replaced
+    logins, bids, ratio, payment, variance, ips, failed = (row[FEATURE_NAMES.index(name)] for name in [
+        "logins_per_day", "bids_per_day", "bid_to_project_ratio", "payment_amount", "login_time_variance",
+        "ip_address_count", "failed_login_attempts"])
+    reasons = []
+    if logins > 5:
+        reasons.append(f"High login frequency: {logins} logins per day")
+    if bids > 10:
+        reasons.append(f"High bidding frequency: {bids} bids per day")
+    if ratio > 0.5:
+        reasons.append(f"Unusual bid-to-project ratio: {ratio:.2f}")
+    if payment > 10000:
+        reasons.append(f"Large payment amount: ₹{payment:.2f}")
+    if variance > 8:
+        reasons.append(f"Unusual login time variance: {variance} hours")
+    if ips > 5:
+        reasons.append(f"Multiple IP addresses: {int(ips)}")
+    if failed > 3:
+        reasons.append(f"Failed login attempts: {int(failed)}")
+    if not reasons and status != "normal":
+        reasons.append("Unusual pattern detected in user behavior")
+    return reasons
+
+
+def activities(features):
+    integer_columns = {"ip_address_count", "failed_login_attempts"}
+    return [
+        UserActivityRequest(user_id=i, **{name: int(value) if name in integer_columns else float(value)
+                                          for name, value in zip(FEATURE_NAMES, row)})
+        for i, row in enumerate(features)
+    ]
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.parametrize("params", FOREST_PARAMS, ids=lambda params: ",".join(params) or "default")
+def test_isolation_scores_match_sklearn(training_data, params):
+    X, y = training_data
+    bundle = train_bundle(X, y)
+    if params:
+        params = {"random_state": 42, **params}
+        bundle.isolation_forest = IsolationForest(contamination=0.1, **params).fit(bundle.scaler.transform(X))
+    forest = bundle.isolation_forest
+    compiled = CompiledFraudEnsemble(bundle.scaler, forest, bundle.logistic_regression)
+    features = np.vstack([X, edge_rows(bundle.scaler, X)])
+    scaled = bundle.scaler.transform(features)
+
+    depths = compiled.isolation_depths(scaled)
+    score_samples = -(2 ** (-depths / compiled.denominator))
+    np.testing.assert_allclose(score_samples, forest.score_samples(scaled), rtol=0, atol=FAST_PATH_TOLERANCE)
+    np.testing.assert_allclose(score_samples - compiled.offset, forest.decision_function(scaled),
+                               rtol=0, atol=FAST_PATH_TOLERANCE)
+
+    isolation, probabilities = compiled.score(features)
+    expected_isolation, expected_probabilities = bundle.sklearn_score(features)
+    np.testing.assert_allclose(isolation, expected_isolation, rtol=0, atol=FAST_PATH_TOLERANCE)
+    np.testing.assert_allclose(probabilities, expected_probabilities, rtol=0, atol=FAST_PATH_TOLERANCE)
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.parametrize("n_rows", [1, 37, FAST_PATH_MAX_ROWS + 1])
+def test_detect_fraud_many_matches_sklearn(service_bundle, training_data, n_rows):
+    X, _ = training_data
+    assert service_bundle.compiled is not None
+    features = edge_rows(service_bundle.scaler, X)
+    features = features[np.random.default_rng(n_rows).choice(len(features), n_rows, replace=False)]
+    features[:, FEATURE_NAMES.index("ip_address_count")] = np.round(
+        np.abs(features[:, FEATURE_NAMES.index("ip_address_count")]))
+    features[:, FEATURE_NAMES.index("failed_login_attempts")] = np.round(
+        np.abs(features[:, FEATURE_NAMES.index("failed_login_attempts")]))
+    # Rows as the models see them after the request round trip
+    requests = activities(features)
+    features = np.array([[getattr(request, name) for name in FEATURE_NAMES] for request in requests])
+    results = detect_fraud_many(requests)
+
+    scaled = service_bundle.scaler.transform(features)
+    isolation = 1 - (service_bundle.isolation_forest.decision_function(scaled) + 1) / 2
+    probabilities = service_bundle.logistic_regression.predict_proba(scaled)[:, 1]
+    weights = service_bundle.weights
+    fraud_scores = weights["isolation_forest"] * isolation + weights["logistic_regression"] * probabilities
+
+    assert [result["user_id"] for result in results] == list(range(n_rows))
+    np.testing.assert_allclose([result["isolation_forest_score"] for result in results], isolation,
+                               rtol=0, atol=FAST_PATH_TOLERANCE)
+    np.testing.assert_allclose([result["fraud_probability"] for result in results], probabilities,
+                               rtol=0, atol=FAST_PATH_TOLERANCE)
+    np.testing.assert_allclose([result["fraud_score"] for result in results], fraud_scores,
+                               rtol=0, atol=FAST_PATH_TOLERANCE)
+    thresholds = service_bundle.thresholds
+    for result, score, row in zip(results, fraud_scores, features):
+        expected = ("normal" if score < thresholds["suspicious"]
+                    else "suspicious" if score < thresholds["flagged"] else "flagged")
+        assert result["status"] == expected
+        assert result["reasons"] == reference_reasons(row, expected)
+
+
+def test_fraud_reasons_matches_per_request_rules(training_data):
+    X, _ = training_data
+    rng = np.random.default_rng(5)
+    features = np.vstack([X[:500], np.zeros((3, X.shape[1])), X[:200] * rng.uniform(0, 5, (200, X.shape[1]))])
+    for column in ("ip_address_count", "failed_login_attempts"):
+        features[:, FEATURE_NAMES.index(column)] = np.round(features[:, FEATURE_NAMES.index(column)])
+    statuses = rng.choice(["normal", "suspicious", "flagged"], len(features))
+    reasons = fraud_reasons(features, statuses)
+    assert reasons == [reference_reasons(row, status) for row, status in zip(features, statuses)]
+    # All-zero activity only gets the generic reason when it is not normal
+    assert fraud_reasons(np.zeros((2, X.shape[1])), np.array(["normal", "flagged"])) == [
+        [], ["Unusual pattern detected in user behavior"]]
+
+
+@pytest.mark.parametrize("value", [np.nan, np.inf, -np.inf])
+def test_non_finite_features_are_rejected(service_bundle, value):
+    row = {name: 1.0 for name in FEATURE_NAMES}
+    row["logins_per_day"] = value
+    with pytest.raises(ValidationError):
+        UserActivityRequest(user_id=1, **row)
+    features = np.ones((3, len(FEATURE_NAMES)))
+    features[1, 0] = value
+    # Both scoring paths refuse, whatever the batch size
+    with pytest.raises(ValueError):
+        service_bundle.score(features)
+    with pytest.raises(ValueError):
+        service_bundle.score(np.repeat(features, FAST_PATH_MAX_ROWS, axis=0))
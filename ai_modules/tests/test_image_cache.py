@@ -0,0 +1,104 @@
+import io
+import time
+import numpy as np
+import pytest
+from PIL import Image
+
+from image_cache import ImageResultCache, dhash, hamming
+
+# Exact and near-duplicate lookups, eviction, expiry and the cross-account
+# reuse report.
+
+
+def gradient_image(size=64, seed=0):
+    rng = np.random.default_rng(seed)
+    pixels = (rng.random((8, 8)) * 255).astype(np.uint8)
+    return Image.fromarray(pixels).resize((size, size), Image.BILINEAR).convert("RGB")
+
+
+def test_dhash_survives_resizing_and_recompression():
+    image = gradient_image(256)
+    buffer = io.BytesIO()
+    image.resize((120, 120)).save(buffer, format="JPEG", quality=70)
+    copy = Image.open(io.BytesIO(buffer.getvalue()))
+    assert hamming(dhash(image), dhash(copy)) <= 6
+    assert hamming(dhash(image), dhash(gradient_image(256, seed=1))) > 6
+    assert 0 <= dhash(image) < 1 << 64
+
+
+def test_sha256_rewinds_the_upload():
+    source = io.BytesIO(b"image bytes")
+    assert ImageResultCache.sha256(source) == ImageResultCache.sha256(io.BytesIO(b"image bytes"))
+    assert source.read() == b"image bytes"
+
+
+def test_exact_then_near_duplicate_lookups():
+    cache = ImageResultCache(max_distance=6)
+    cache.put("a", 0b1010, [1.0], account=1)
+    assert cache.get_exact("a", account=2).tolist() == [1.0]
+    assert cache.get_exact("b") is None
+    outputs, distance = cache.get_near(0b1010 ^ (1 << 40) ^ (1 << 3), account=3)
+    assert outputs.tolist() == [1.0] and distance == 2
+    assert cache.get_near(0b1010 ^ 0x7F) is None  # 7 bits away
+    stats = cache.stats()
+    assert (stats["exact_hits"], stats["near_hits"], stats["misses"]) == (1, 1, 1)
+    assert cache.reuse_report()[0]["accounts"] == 3
+
+
+def test_near_duplicate_tier_can_be_disabled():
+    cache = ImageResultCache(max_distance=0)
+    cache.put("a", 5, [1.0])
+    assert cache.get_near(5) is None and cache.get_exact("a") is not None
+
+
+@pytest.mark.parametrize("max_distance", [1, 6, 10])
+def test_near_lookup_finds_the_closest_entry_within_range(max_distance):
+    rng = np.random.default_rng(max_distance)
+    hashes = [int(h) for h in rng.integers(0, 1 << 63, 200)]
+    cache = ImageResultCache(max_distance=max_distance)
+    for i, image_hash in enumerate(hashes):
+        cache.put(str(i), image_hash, [i])
+    for image_hash in hashes[:20]:
+        query = image_hash
+        for bit in rng.choice(64, max_distance, replace=False):
+            query ^= 1 << int(bit)
+        distances = [hamming(other, query) for other in hashes]
+        outputs, distance = cache.get_near(query)
+        assert distance == min(distances) and distances[int(outputs[0])] == distance
+
+
+def test_lru_evicts_the_least_recently_used_entry():
+    cache = ImageResultCache(max_entries=2, policy="lru")
+    cache.put("a", 0, [1])
+    cache.put("b", 0xFFFF, [2])
+    cache.get_exact("a")
+    cache.put("c", 0xFFFF << 32, [3])
+    assert cache.get_exact("b") is None and cache.get_exact("a") is not None
+    assert cache.get_near(0xFFFF) is None  # the evicted entry left the hash index too
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lfu_evicts_the_least_hit_entry():
+    cache = ImageResultCache(max_entries=2, policy="lfu")
+    cache.put("a", 1, [1])
+    cache.put("b", 2, [2])
+    cache.get_exact("a")
+    cache.get_exact("b")
+    cache.get_exact("b")
+    cache.put("c", 3, [3])
+    # The new entry has no hits yet but is kept over the least-hit old one
+    assert cache.get_exact("a") is None and cache.get_exact("b") is not None
+    assert cache.get_exact("c") is not None
+
+
+def test_entries_expire_after_the_ttl():
+    cache = ImageResultCache(ttl_seconds=0.05)
+    cache.put("a", 1, [1])
+    time.sleep(0.1)
+    assert cache.get_exact("a") is None and cache.get_near(1) is None
+    assert cache.stats()["expirations"] == 1 and cache.stats()["size"] == 0
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        ImageResultCache(policy="fifo")
@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from scipy.optimize import linear_sum_assignment
+
+from mentor_assignment import (assignment_report, candidate_edges, greedy_assignment, mentor_capacities,
+                               solve_assignment)
+
+# Cohort assignment against a dense reference solver, and the greedy
+# baselines.
+
+
+def random_scores(n_mentees, n_mentors, seed=0, ineligible=0.3):
+    rng = np.random.default_rng(seed)
+    scores = rng.uniform(-0.2, 1.0, (n_mentees, n_mentors)).astype(np.float32)
+    scores[rng.random(scores.shape) < ineligible] = -np.inf
+    return scores
+
+
+def reference_total(scores, capacities, min_score):
+    # Dense assignment: one column per mentor slot plus one "unassigned"
+    # column per mentee worth min_score
+    slot_mentors = np.repeat(np.arange(len(capacities)), capacities)
+    n_mentees = len(scores)
+    gains = np.full((n_mentees, len(slot_mentors) + n_mentees), -1e9)
+    usable = np.where(np.isfinite(scores) & (scores >= min_score), scores, -1e9)
+    gains[:, :len(slot_mentors)] = usable[:, slot_mentors]
+    gains[:, len(slot_mentors):] = np.where(np.eye(n_mentees, dtype=bool), min_score, -1e9)
+    rows, columns = linear_sum_assignment(gains, maximize=True)
+    assigned = columns < len(slot_mentors)
+    return float(gains[rows[assigned], columns[assigned]].sum())
+
+
+def block_of(scores):
+    return lambda start, end: scores[start:end]
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("min_score", [0.0, 0.5])
+def test_solver_matches_dense_optimum(seed, min_score):
+    scores = random_scores(30, 8, seed)
+    capacities = np.random.default_rng(seed).integers(0, 5, 8)
+    candidates, candidate_scores = candidate_edges(block_of(scores), len(scores), scores.shape[1])
+    assignment, assigned_scores = solve_assignment(candidates, candidate_scores, capacities, min_score)
+
+    assigned = assignment >= 0
+    assert (np.bincount(assignment[assigned], minlength=8) <= capacities).all()
+    np.testing.assert_array_equal(assigned_scores[assigned], scores[assigned, assignment[assigned]])
+    assert (assigned_scores[assigned] >= min_score).all()
+    assert np.nansum(assigned_scores) == pytest.approx(reference_total(scores, capacities, min_score), abs=1e-4)
+
+
+def test_solver_beats_greedy_with_capacity():
+    # Mentee 0 takes mentor 0 greedily, though mentee 1 has nowhere else to go
+    scores = np.array([[0.9, 0.8], [0.85, -np.inf]], dtype=np.float32)
+    capacities = np.array([1, 1])
+    candidates, candidate_scores = candidate_edges(block_of(scores), 2, 2)
+    greedy, greedy_scores = greedy_assignment(candidates, candidate_scores, capacities)
+    assert greedy.tolist() == [0, -1]
+    assignment, assigned_scores = solve_assignment(candidates, candidate_scores, capacities)
+    assert assignment.tolist() == [1, 0]
+    assert np.nansum(assigned_scores) == pytest.approx(1.65)
+
+
+def test_greedy_without_capacities_takes_each_best_candidate():
+    scores = random_scores(20, 6, seed=3)
+    candidates, candidate_scores = candidate_edges(block_of(scores), 20, 6, block_size=7)
+    assignment, assigned_scores = greedy_assignment(candidates, candidate_scores, None, min_score=0.0)
+    best = scores.argmax(axis=1)
+    best_scores = scores.max(axis=1)
+    expected = np.where(best_scores >= 0.0, best, -1)
+    np.testing.assert_array_equal(assignment, expected)
+    report = assignment_report(assignment, assigned_scores, np.zeros(6, dtype=np.int64))
+    assert report["assigned"] == int((expected >= 0).sum())
+    assert report["over_capacity_mentees"] == report["assigned"]
+
+
+def test_unassignable_cohort():
+    scores = np.full((4, 3), -np.inf, dtype=np.float32)
+    candidates, candidate_scores = candidate_edges(block_of(scores), 4, 2)
+    assignment, assigned_scores = solve_assignment(candidates, candidate_scores, np.array([2, 2, 2]))
+    assert (assignment == -1).all() and np.isnan(assigned_scores).all()
+    assignment, _ = solve_assignment(*candidate_edges(block_of(random_scores(4, 3)), 4, 3), np.zeros(3, int))
+    assert (assignment == -1).all()
+
+
+def test_load_penalty_spreads_ties():
+    scores = np.ones((4, 2), dtype=np.float32)
+    candidates, candidate_scores = candidate_edges(block_of(scores), 4, 2)
+    assignment, _ = solve_assignment(candidates, candidate_scores, np.array([4, 4]), load_penalty=0.001)
+    assert np.bincount(assignment, minlength=2).tolist() == [2, 2]
+
+
+def test_mentor_capacities():
+    store = SimpleNamespace(availability_hours_per_week=np.array([9, 1, 20, 8], dtype=np.int32),
+                            mentees_count=np.array([0, 0, 29, 30], dtype=np.int32))
+    assert mentor_capacities(store, 2, 30).tolist() == [4, 0, 1, 0]
@@ -0,0 +1,38 @@
+import numpy as np
+
+from attribute_table import AttributeTable, max_similarity
+from mentor_store import MentorStore
+
+# Copy-on-write skill updates: the store and skill table a request already
+# holds stay consistent while an update builds the next ones.
+
+
+def mentor_columns(skills):
+    n = len(skills)
+    return {
+        "id": np.arange(100, 100 + n), "name": [f"m{i}" for i in range(n)], "skills": skills,
+        "industry": ["Technology"] * n, "experience_years": np.full(n, 5), "hourly_rate": np.full(n, 50),
+        "availability_hours_per_week": np.full(n, 10), "rating": np.full(n, 4.5),
+        "mentees_count": np.zeros(n), "bio": [""] * n,
+    }
+
+
+def test_with_skills_leaves_the_old_store_and_table_untouched():
+    store = MentorStore(mentor_columns([["a", "b"], ["b"]]))
+    table = AttributeTable(store.skill_names, np.eye(2, 4, dtype=np.float32))
+    codes, names = store.skill_codes.copy(), list(store.skill_names)
+
+    updated, added = store.with_skills(1, ["c", "a", "d"])
+    new_table = table.extended(added, np.eye(2, 4, k=2, dtype=np.float32))
+
+    assert added == ["c", "d"]
+    np.testing.assert_array_equal(store.skill_codes, codes)
+    assert store.skill_names == names and store.skills[1] == ["b"] and store.new_skills(["c"]) == ["c"]
+    assert len(table) == 2 and table.similarity.shape == (2, 2)
+    assert updated.skills[1] == ["c", "a", "d"] and updated.skill_sets[1] == {"a", "c", "d"}
+    assert updated.skill_codes.shape == (2, 3) and updated.skill_codes.max() < len(new_table)
+    # Codes from either snapshot score against their own table
+    query = table.similarity[[0]]
+    assert max_similarity(query, store.skill_codes).tolist() == [[1.0, 0.0]]
+    query = new_table.similarity[[new_table.code("d")]]
+    assert max_similarity(query, updated.skill_codes).tolist() == [[0.0, 1.0]]
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from project_catalogue import CatalogueSnapshot, ProjectCatalogue
+from skill_index import SkillIndex
+from vector_index import BruteForceIndex, normalize_rows
+
+# Catalogue upserts and deletes: copy-on-write snapshots whose projects,
+# TF-IDF rows, vector index and skill index stay aligned.
+
+DIM = 16
+
+
+def encode(texts):
+    vectors = [np.random.default_rng(sum(map(ord, text))).standard_normal(DIM) for text in texts]
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def project(project_id, description, skills, budget=1000.0, status="open"):
+    return {"id": project_id, "description": description, "skills_required": skills,
+            "budget": budget, "status": status}
+
+
+@pytest.fixture
+def catalogue():
+    projects = pd.DataFrame([
+        project(1, "react dashboard", ["React"]),
+        project(2, "python data pipeline", ["Python", "SQL"], budget=5000.0),
+        project(3, "mobile app", ["Swift"], status="closed"),
+    ])
+    descriptions = projects["description"].tolist()
+    tfidf = TfidfVectorizer()
+    snapshot = CatalogueSnapshot(
+        projects, tfidf.fit_transform(descriptions), BruteForceIndex(encode(descriptions), projects["id"].to_numpy()),
+        SkillIndex(projects["skills_required"]), version=1,
+    )
+    return ProjectCatalogue(snapshot, encode=encode, tfidf=tfidf)
+
+
+def assert_aligned(snapshot):
+    n = len(snapshot)
+    assert snapshot.tfidf_matrix.shape[0] == n and len(snapshot.skill_index) == n and len(snapshot.index) == n
+    for row, item in snapshot.projects.iterrows():
+        assert snapshot.rows.get_loc(item["id"]) == row
+        assert sorted(snapshot.skill_index.matching_skills(row, snapshot.skill_index.lookup(item["skills_required"]))) \
+            == sorted(item["skills_required"])
+    positions = snapshot.index_positions.get_indexer(snapshot.projects["id"])
+    np.testing.assert_allclose(snapshot.index.vectors[positions],
+                               normalize_rows(encode(snapshot.projects["description"].tolist())), rtol=1e-5)
+    np.testing.assert_array_equal(snapshot.index_open, (snapshot.projects["status"] == "open").to_numpy()[
+        snapshot.index_rows])
+
+
+def test_upsert_updates_and_adds_without_touching_the_old_snapshot(catalogue):
+    before = catalogue.snapshot
+    after = catalogue.upsert([
+        project(2, "rust backend", ["Rust"], budget=8000.0),
+        {"id": 4, "description": "go service", "skills_required": ["Go"], "budget": 300.0},
+    ])
+    assert catalogue.snapshot is after and after.version == 2 and before.version == 1
+    assert before.projects["id"].tolist() == [1, 2, 3] and len(before.index) == 3
+    assert sorted(after.projects["id"].tolist()) == [1, 2, 3, 4]
+    row = after.rows.get_loc(2)
+    assert after.projects.loc[row, "description"] == "rust backend"
+    assert after.skill_index.projects_with_skill("Rust").tolist() == [row]
+    assert after.projects.loc[after.rows.get_loc(4), "status"] == "open"
+    assert_aligned(after)
+
+    found_ids, _ = after.index.search(encode(["rust backend"])[0], 1)
+    assert found_ids.tolist() == [2]
+
+
+def test_repeated_ids_keep_the_last_record_and_empty_upserts_are_no_ops(catalogue):
+    before = catalogue.snapshot
+    assert catalogue.upsert([]) is before
+    after = catalogue.upsert([project(5, "first", ["A"]), project(5, "second", ["B"])])
+    assert after.projects["id"].tolist().count(5) == 1
+    assert after.projects.loc[after.rows.get_loc(5), "description"] == "second"
+    assert_aligned(after)
+
+
+def test_delete_removes_rows_everywhere(catalogue):
+    before = catalogue.snapshot
+    assert catalogue.delete([99]) is before
+    after = catalogue.delete([1, 99])
+    assert after.version == 2 and after.projects["id"].tolist() == [2, 3]
+    assert 1 not in after.index.ids and len(after.index) == 2
+    assert after.skill_index.projects_with_skill("React").tolist() == []
+    assert_aligned(after)
+    assert len(catalogue.delete([2, 3])) == 0
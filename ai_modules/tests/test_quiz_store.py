@@ -0,0 +1,60 @@
+import json
+import numpy as np
+import pytest
+
+from quiz_store import QuizBank, QuizStore
+
+# Grading against the compiled answer keys, and seeded quiz sampling.
+
+
+def make_bank(n=10, category="Python"):
+    questions = [{"question": f"Q{i}", "options": ["a", "b", "c", "d"], "answer": i % 4} for i in range(n)]
+    return QuizBank(category, questions)
+
+
+def reference_grade(bank, answers, indices=None):
+    keys = [question["answer"] for question in bank.questions]
+    if indices is not None:
+        keys = [keys[i] for i in indices]
+    if len(answers) != len(keys):
+        return 0.0
+    return sum(answer == key for answer, key in zip(answers, keys)) / len(keys)
+
+
+def test_full_bank_grading_matches_per_submission():
+    bank = make_bank()
+    rng = np.random.default_rng(0)
+    answers = [rng.integers(0, 4, 10).tolist() for _ in range(50)] + [[0, 1, 2], [], [i % 4 for i in range(10)]]
+    graded = bank.grade(answers)
+    assert graded.tolist() == [reference_grade(bank, row) for row in answers]
+    assert graded[-1] == 1.0 and graded[-2] == 0.0
+
+
+def test_sampled_quizzes_are_reproducible_and_graded_against_their_questions():
+    bank = make_bank(40)
+    quiz = json.loads(bank.quiz_json(attempt_seed=7, count=5))
+    assert quiz == json.loads(bank.quiz_json(attempt_seed=7, count=5))
+    assert quiz["question_count"] == 5 and len(quiz["questions"]) == 5
+    assert all("answer" not in question for question in quiz["questions"])
+    indices = bank.sample_indices(7, 5)
+    assert [question["question"] for question in quiz["questions"]] == [f"Q{i}" for i in indices]
+
+    seeds = [7, 8, 9]
+    correct = [[bank.questions[i]["answer"] for i in bank.sample_indices(seed, 5)] for seed in seeds]
+    assert bank.grade(correct, seeds, 5).tolist() == [1.0, 1.0, 1.0]
+    # A sample larger than the bank is the whole bank, in a seeded order
+    assert sorted(bank.sample_indices(3, 100).tolist()) == list(range(40))
+
+
+@pytest.mark.parametrize("answer", [10 ** 30, -10 ** 30, 2 ** 63, 40000, -2])
+def test_out_of_range_answers_are_graded_wrong(answer):
+    bank = make_bank(3)
+    assert bank.grade([[0, 1, answer]]).tolist() == [pytest.approx(2 / 3)]
+    assert bank.grade([[0, 1, answer], [0, 1, 2], [0, 1]]).tolist() == [pytest.approx(2 / 3), 1.0, 0.0]
+
+
+def test_empty_bank_and_store_lookup():
+    store = QuizStore({"Python": make_bank(4).questions, "Empty": []})
+    assert store.get("Missing") is None
+    assert store.get("Empty").grade([[0], []]).tolist() == [0.0, 0.0]
+    assert store.stats()["questions"] == 4
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from ranking import rank, top_k, top_k_rows
+
+# Top-K selection and paging against a full stable sort.
+
+
+def reference(scores, k, offset=0):
+    return np.argsort(-np.asarray(scores), kind="stable")[offset:offset + k]
+
+
+@pytest.mark.parametrize("k", [0, 1, 7, 50, 200])
+@pytest.mark.parametrize("offset", [0, 3, 49, 50, 120])
+def test_top_k_pages_match_a_full_sort(k, offset):
+    scores = np.random.default_rng(0).integers(0, 10, 50).astype(np.float32)  # many ties
+    found = top_k(scores, k, offset)
+    expected = reference(scores, k, offset)
+    np.testing.assert_array_equal(scores[found], scores[expected])
+    assert len(found) == len(expected) == len(set(found.tolist()))
+
+
+def test_top_k_edge_cases():
+    assert top_k([], 5).tolist() == []
+    assert top_k([0.5], 0).tolist() == []
+    assert top_k([0.1, 0.3, 0.2], 10).tolist() == [1, 2, 0]
+    assert top_k([0.1, 0.3, 0.2], 1, offset=1).tolist() == [2]
+    assert top_k([0.1, 0.3, 0.2], 2, offset=3).tolist() == []
+
+
+@pytest.mark.parametrize("k", [1, 4, 6, 10])
+def test_top_k_rows_ranks_each_row(k):
+    scores = np.random.default_rng(1).random((5, 6)).astype(np.float32)
+    positions, values = top_k_rows(scores, k)
+    assert positions.shape == (5, min(k, 6))
+    for row in range(5):
+        np.testing.assert_array_equal(positions[row], reference(scores[row], k))
+        np.testing.assert_array_equal(values[row], scores[row, positions[row]])
+
+
+def test_rank_scores_only_allowed_rows():
+    scores = np.array([0.9, 0.1, 0.8, 0.4, 0.7], dtype=np.float32)
+    scored = []
+
+    def score_rows(rows):
+        scored.append(rows)
+        return scores[rows]
+
+    mask = np.array([False, True, True, True, False])
+    rows, values = rank(score_rows, mask, 5, limit=2)
+    assert rows.tolist() == [2, 3] and values.tolist() == pytest.approx([0.8, 0.4])
+    assert scored[-1].tolist() == [1, 2, 3]
+    assert rank(score_rows, None, 5, limit=2, offset=1)[0].tolist() == [2, 4]
+
+
+def test_rank_with_an_empty_mask_scores_nothing():
+    def score_rows(rows):
+        raise AssertionError("nothing should be scored")
+
+    rows, values = rank(score_rows, np.zeros(5, dtype=bool), 5, limit=3)
+    assert len(rows) == 0 and len(values) == 0
+    rows, values = rank(score_rows, None, 0, limit=3)
+    assert len(rows) == 0 and len(values) == 0
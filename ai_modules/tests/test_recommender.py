@@ -0,0 +1,75 @@
+import importlib
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+from fastapi.testclient import TestClient
+
+# /recommend filters and pagination, against the mock catalogue. Needs the
+# sentence-transformers model; the embedding store is built in a temp dir.
+
+
+@pytest.fixture(scope="module")
+def recommender(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("EMBEDDING_STORE_DIR", str(tmp_path_factory.mktemp("embedding_store")))
+        module = importlib.import_module("recommender")
+    module.warmup.load_all()
+    return module
+
+
+@pytest.fixture(scope="module")
+def client(recommender):
+    return TestClient(recommender.app)
+
+
+def profile(**fields):
+    return {"user_id": 1, "skills": ["React", "Python"], **fields}
+
+
+def test_filters_that_exclude_every_project_return_an_empty_page(client):
+    response = client.post("/recommend", json=profile(budget_range={"min": 10 ** 12}))
+    assert response.status_code == 200
+    assert response.json() == {"project_ids": [], "scores": [], "match_reasons": []}
+
+
+def test_excluded_projects_are_never_returned(client):
+    response = client.post("/recommend", json=profile(exclude_project_ids=list(range(1, 96)), limit=10))
+    assert response.status_code == 200
+    assert sorted(response.json()["project_ids"]) == [96, 97, 98, 99, 100]
+
+
+def test_pages_are_consecutive(client):
+    first = client.post("/recommend", json=profile(limit=5)).json()
+    second = client.post("/recommend", json=profile(offset=5, limit=5)).json()
+    both = client.post("/recommend", json=profile(limit=10)).json()
+    assert first["project_ids"] + second["project_ids"] == both["project_ids"]
+    assert np.all(np.diff(both["scores"]) <= 0)
+
+
+def test_combine_scores_on_no_candidates(recommender):
+    empty = np.empty(0)
+    assert recommender.combine_scores(empty, empty, empty, 0.6, 0.4).shape == (0,)
+    assert recommender.combine_scores(np.empty((2, 0)), np.empty((2, 0)), np.empty((2, 0)),
+                                      np.ones((2, 1)), np.ones((2, 1))).shape == (2, 0)
+
+
+@pytest.mark.parametrize("fields", [{"offset": -1}, {"limit": -1}, {"limit": 0}, {"limit": 10 ** 6}])
+def test_out_of_range_pages_are_rejected(client, fields):
+    assert client.post("/recommend", json=profile(**fields)).status_code == 422
+
+
+@pytest.mark.parametrize("top_k", [-2, 0, 10 ** 6])
+def test_out_of_range_batch_top_k_is_rejected(client, top_k):
+    response = client.post("/recommend/batch", json={"profiles": [profile()], "top_k": top_k})
+    assert response.status_code == 422
+
+
+def test_project_upsert_and_delete(client):
+    project = {"id": 101, "title": "Project 101", "description": "Closed test project",
+               "skills_required": ["Python"], "budget": 50000, "status": "closed"}
+    added = client.put("/projects/101", json=project).json()
+    assert added["project_count"] == 101
+    removed = client.delete("/projects/101").json()
+    assert removed["project_count"] == 100 and removed["catalogue_version"] > added["catalogue_version"]
+    assert client.delete("/projects/101").status_code == 404
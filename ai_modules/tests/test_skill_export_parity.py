@@ -0,0 +1,69 @@
+import os
+import numpy as np
+import pytest
+
+from skill_model import (BACKENDS, DEFAULT_FIXTURE_DIR, FEATURE_DIM, PARITY_MIN_COSINE, SKILL_CLASS_INDEX,
+                         check_parity, load_backend, read_manifest)
+
+# Parity of exported skill-model graphs with Keras on the fixture images.
+# check_parity is exercised with synthetic features; the export check runs
+# against the models in SKILL_MODEL_DIR when TensorFlow and an export exist.
+
+SKILL_MODEL_DIR = os.environ.get(
+    "SKILL_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "skill_models")
+)
+
+
+def reference_features(n, seed=0):
+    # ReLU-pooled features are non-negative, with skill confidences on both sides of 0.5
+    return np.random.default_rng(seed).uniform(0, 1, (n, FEATURE_DIM)).astype(np.float32)
+
+
+def test_identical_backend_has_exact_parity():
+    reference = reference_features(20)
+    parity = check_parity(lambda batch: reference[batch[:, 0].astype(int)], reference,
+                          np.arange(20, dtype=np.float32)[:, None], SKILL_CLASS_INDEX)
+    assert parity["images"] == 20
+    assert parity["min_cosine"] == pytest.approx(1.0, abs=1e-6)
+    assert parity["max_confidence_error"] == 0.0
+    assert parity["decision_flips"] == 0
+
+
+def test_drift_is_measured_per_image():
+    reference = reference_features(20)
+    drifted = reference.copy()
+    drifted[7] = reference_features(1, seed=1)[0]
+    parity = check_parity(lambda batch: drifted[batch[:, 0].astype(int)], reference,
+                          np.arange(20, dtype=np.float32)[:, None], SKILL_CLASS_INDEX)
+    expected_cosine = drifted[7] @ reference[7] / (np.linalg.norm(drifted[7]) * np.linalg.norm(reference[7]))
+    assert parity["min_cosine"] == pytest.approx(expected_cosine, rel=1e-5)
+    assert parity["min_cosine"] < min(PARITY_MIN_COSINE.values())
+    confidences = drifted[7, SKILL_CLASS_INDEX].mean(axis=1)
+    reference_confidences = reference[7, SKILL_CLASS_INDEX].mean(axis=1)
+    assert parity["max_confidence_error"] == pytest.approx(np.abs(confidences - reference_confidences).max())
+    assert parity["decision_flips"] == int(np.sum((confidences > 0.5) != (reference_confidences > 0.5)))
+
+
+def test_small_noise_passes_every_threshold():
+    reference = reference_features(16)
+    noisy = reference * (1 + np.random.default_rng(2).normal(0, 1e-5, reference.shape)).astype(np.float32)
+    parity = check_parity(lambda batch: noisy[batch[:, 0].astype(int)], reference,
+                          np.arange(16, dtype=np.float32)[:, None], SKILL_CLASS_INDEX)
+    assert all(parity["min_cosine"] >= threshold for threshold in PARITY_MIN_COSINE.values())
+
+
+def exported_backends():
+    manifest = read_manifest(SKILL_MODEL_DIR) or {"backends": {}}
+    return [name for name in manifest["backends"] if name in BACKENDS]
+
+
+@pytest.mark.parametrize("name", exported_backends() or [pytest.param(None, marks=pytest.mark.skip(
+    reason=f"no exported skill models in {SKILL_MODEL_DIR}"))])
+def test_exported_backend_matches_keras_on_fixtures(name):
+    pytest.importorskip("tensorflow")
+    from skill_model import KerasBackend, fixture_images
+    images = np.stack(list(fixture_images(DEFAULT_FIXTURE_DIR).values()))
+    keras_backend = KerasBackend()
+    reference = np.concatenate([keras_backend(images[i:i + 8]) for i in range(0, len(images), 8)])
+    parity = check_parity(load_backend(name, SKILL_MODEL_DIR), reference, images, SKILL_CLASS_INDEX)
+    assert parity["min_cosine"] >= PARITY_MIN_COSINE[name]
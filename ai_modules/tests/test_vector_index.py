@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from embedding_store import QuantizedEmbeddings, normalize, quantize
+from vector_index import BruteForceIndex, IVFIndex, load_or_build_index, normalize_rows
+
+# Index search against a direct cosine scan, with and without filter masks,
+# over float32 and quantised stores.
+
+
+def store(vectors, dtype):
+    if dtype == "float32":
+        return vectors
+    return QuantizedEmbeddings(*quantize(vectors, dtype))
+
+
+def reference(vectors, ids, query, k, allowed=None):
+    # Stored rows are already normalised (up to quantisation)
+    scores = store_rows(vectors) @ normalize_rows(query)[0]
+    rows = np.arange(len(scores)) if allowed is None else np.flatnonzero(allowed)
+    order = rows[np.argsort(-scores[rows], kind="stable")][:k]
+    return ids[order], scores[order]
+
+
+def store_rows(vectors):
+    return vectors[:] if isinstance(vectors, QuantizedEmbeddings) else vectors
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    vectors = normalize(rng.standard_normal((500, 32)).astype(np.float32))
+    ids = np.arange(1000, 1500)
+    query = rng.standard_normal(32).astype(np.float32)
+    allowed = rng.random(500) < 0.2
+    return vectors, ids, query, allowed
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16", "int8"])
+@pytest.mark.parametrize("k", [1, 10, 500, 1000])
+def test_exact_search_matches_a_full_scan(data, dtype, k):
+    vectors, ids, query, allowed = data
+    vectors = store(vectors, dtype)
+    index = BruteForceIndex(vectors, ids)
+    for mask in (None, allowed):
+        found_ids, found_scores = index.search(query, k, allowed=mask)
+        expected_ids, expected_scores = reference(vectors, ids, query, k, mask)
+        np.testing.assert_array_equal(found_ids, expected_ids)
+        np.testing.assert_allclose(found_scores, expected_scores, rtol=1e-5, atol=1e-6)
+    found_ids, _ = index.search(query, k, allowed=allowed)
+    assert np.isin(found_ids, ids[allowed]).all() and len(found_ids) == min(k, allowed.sum())
+
+
+@pytest.mark.parametrize("dtype", ["float32", "int8"])
+def test_empty_masks_return_nothing(data, dtype):
+    vectors, ids, query, _ = data
+    for index in (BruteForceIndex(store(vectors, dtype), ids), IVFIndex(store(vectors, dtype), ids, n_lists=8)):
+        found_ids, found_scores = index.search(query, 10, allowed=np.zeros(len(ids), dtype=bool))
+        assert len(found_ids) == 0 and len(found_scores) == 0
+        assert len(index.search(query, 0)[0]) == 0
+
+
+def test_ivf_probing_every_list_is_exact(data):
+    vectors, ids, query, allowed = data
+    index = IVFIndex(vectors, ids, n_lists=8)
+    for mask in (None, allowed):
+        found_ids, _ = index.search(query, 20, allowed=mask, n_probe=8)
+        np.testing.assert_array_equal(found_ids, reference(vectors, ids, query, 20, mask)[0])
+    found_ids, _ = index.search(query, 20, allowed=allowed, n_probe=2)
+    assert np.isin(found_ids, ids[allowed]).all()
+
+
+@pytest.mark.parametrize("kind", [BruteForceIndex, IVFIndex])
+def test_updates_are_copy_on_write(data, kind):
+    vectors, ids, query, _ = data
+    index = kind(vectors, ids)
+    updated = index.updated([1000, 2000], np.stack([query, -query]), delete_ids=[1001])
+    assert len(index) == 500 and 2000 not in index.ids
+    assert len(updated) == 500 and 1001 not in updated.ids
+    found_ids, found_scores = updated.search(query, 1)
+    assert found_ids.tolist() == [1000] and found_scores[0] == pytest.approx(1.0)
+
+
+def test_persisted_index_is_reused_only_for_the_same_catalogue(data, tmp_path):
+    vectors, ids, query, _ = data
+    path = str(tmp_path / "index.npz")
+    built = load_or_build_index("ivf", vectors, ids, path, n_lists=8)
+    loaded = load_or_build_index("ivf", vectors, ids, path, n_lists=8)
+    np.testing.assert_array_equal(loaded.centroids, built.centroids)
+    rebuilt = load_or_build_index("exact", vectors[::-1], ids, path)
+    assert rebuilt.kind == "exact"
+    np.testing.assert_array_equal(rebuilt.search(query, 5)[0], reference(vectors[::-1], ids, query, 5)[0])
@@ -0,0 +1,257 @@
+import hashlib
+import os
+import numpy as np
+from typing import Optional, Tuple
+from ranking import top_k
+from embedding_store import QuantizedEmbeddings
+
+# Vector indexes over project embeddings. Every backend stores L2-normalised
+# vectors and answers search(query, k) with (ids, cosine scores) for its top-k
+# rows, so the recommender can swap the exact scan for an approximate one
+# without touching the scoring code that runs on the returned candidates.
+
+
+def normalize_rows(vectors):
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _as_index_vectors(vectors):
+    # Quantised stores are already normalised and are searched in place
+    if isinstance(vectors, QuantizedEmbeddings):
+        return vectors
+    return normalize_rows(vectors)
+
+
+def _append_rows(vectors, keep, new_vectors):
+    if isinstance(vectors, QuantizedEmbeddings):
+        return vectors.with_rows(keep, new_vectors)
+    return np.concatenate([vectors[keep], _as_rows(new_vectors, vectors.shape[1])])
+
+
+def _kept_rows(ids, upsert_ids, delete_ids):
+    replaced = np.concatenate([np.asarray(upsert_ids, dtype=np.int64),
+                               np.asarray(delete_ids, dtype=np.int64)])
+    return ~np.isin(ids, replaced)
+
+
+def _as_rows(vectors, dim):
+    if len(vectors) == 0:
+        return np.empty((0, dim), dtype=np.float32)
+    return normalize_rows(vectors)
+
+
+def _row_scores(vectors, query, rows):
+    # Quantised stores dequantise the rows a chunk at a time
+    if isinstance(vectors, QuantizedEmbeddings):
+        return vectors.dot(query, rows)
+    return vectors[rows] @ query
+
+
+def fingerprint(vectors, ids):
+    # Identifies the catalogue an index was built from, so a persisted index
+    # is only reused when the embeddings and ids are unchanged
+    digest = hashlib.sha1()
+    digest.update(np.ascontiguousarray(ids, dtype=np.int64).tobytes())
+    if isinstance(vectors, QuantizedEmbeddings):
+        digest.update(vectors.content_hash.encode("ascii"))
+    else:
+        digest.update(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+class BruteForceIndex:
+    kind = "exact"
+
+    def __init__(self, vectors, ids=None):
+        self.vectors = _as_index_vectors(vectors)
+        if ids is None:
+            ids = np.arange(len(self.vectors))
+        self.ids = np.asarray(ids, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def search(self, query, k, allowed=None) -> Tuple[np.ndarray, np.ndarray]:
+        # `allowed` is an optional boolean mask over index rows; excluded rows
+        # are never scored
+        query = normalize_rows(query)[0]
+        if allowed is None:
+            scores = self.vectors @ query
+            top = top_k(scores, k)
+            return self.ids[top], scores[top]
+        # Quantised stores dequantise the allowed rows a chunk at a time
+        rows = np.flatnonzero(allowed)
+        scores = _row_scores(self.vectors, query, rows)
+        top = top_k(scores, k)
+        return self.ids[rows[top]], scores[top]
+
+    def updated(self, upsert_ids, upsert_vectors, delete_ids=()):
+        # Copy-on-write update: returns a new index and leaves this one
+        # untouched for readers that are still searching it
+        keep = _kept_rows(self.ids, upsert_ids, delete_ids)
+        index = BruteForceIndex.__new__(BruteForceIndex)
+        index.vectors = _append_rows(self.vectors, keep, upsert_vectors)
+        index.ids = np.concatenate([self.ids[keep], np.asarray(upsert_ids, dtype=np.int64)])
+        return index
+
+    def _arrays(self):
+        return {"ids": self.ids}
+
+    @classmethod
+    def _from_arrays(cls, data, vectors):
+        index = cls.__new__(cls)
+        index.vectors = vectors
+        index.ids = data["ids"]
+        return index
+
+
+class IVFIndex:
+    # Inverted-file index: vectors are clustered with spherical k-means and a
+    # query only scans the rows of its n_probe closest clusters
+    kind = "ivf"
+
+    def __init__(self, vectors, ids=None, n_lists=None, n_probe=16,
+                 n_iter=10, max_train_size=50000, seed=42):
+        self.vectors = _as_index_vectors(vectors)
+        if ids is None:
+            ids = np.arange(len(self.vectors))
+        self.ids = np.asarray(ids, dtype=np.int64)
+        if n_lists is None:
+            n_lists = int(np.sqrt(len(self.vectors)))
+        self.n_lists = max(1, min(n_lists, len(self.vectors)))
+        self.n_probe = n_probe
+        self.centroids = self._train(n_iter, max_train_size, seed)
+        self.assignments = self._assign(self.vectors)
+        self._build_lists()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _assign(self, vectors, chunk_size=65536):
+        assignments = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), chunk_size):
+            chunk = vectors[start:start + chunk_size]
+            assignments[start:start + chunk_size] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return assignments
+
+    def _train(self, n_iter, max_train_size, seed):
+        rng = np.random.default_rng(seed)
+        sample = slice(None)
+        if len(self.vectors) > max_train_size:
+            sample = rng.choice(len(self.vectors), max_train_size, replace=False)
+        train = self.vectors[sample]
+        centroids = train[rng.choice(len(train), self.n_lists, replace=False)].copy()
+
+        for _ in range(n_iter):
+            labels = np.argmax(train @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, train)
+            counts = np.bincount(labels, minlength=self.n_lists)
+            # Empty clusters keep their previous centroid
+            filled = counts > 0
+            centroids[filled] = normalize_rows(sums[filled])
+        return centroids
+
+    def _build_lists(self):
+        self.order = np.argsort(self.assignments, kind='stable')
+        counts = np.bincount(self.assignments, minlength=self.n_lists)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def search(self, query, k, allowed=None, n_probe=None) -> Tuple[np.ndarray, np.ndarray]:
+        query = normalize_rows(query)[0]
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        probe = top_k(self.centroids @ query, n_probe)
+        rows = np.concatenate([self.order[self.offsets[l]:self.offsets[l + 1]] for l in probe])
+        if allowed is not None:
+            rows = rows[allowed[rows]]
+        scores = _row_scores(self.vectors, query, rows)
+        top = top_k(scores, k)
+        return self.ids[rows[top]], scores[top]
+
+    def updated(self, upsert_ids, upsert_vectors, delete_ids=()):
+        # New vectors are assigned to the existing centroids; clustering is
+        # not retrained, so a periodic full rebuild keeps lists balanced
+        keep = _kept_rows(self.ids, upsert_ids, delete_ids)
+        new_vectors = _as_rows(upsert_vectors, self.vectors.shape[1])
+        index = IVFIndex.__new__(IVFIndex)
+        index.centroids = self.centroids
+        index.n_lists = self.n_lists
+        index.n_probe = self.n_probe
+        index.vectors = _append_rows(self.vectors, keep, new_vectors)
+        index.ids = np.concatenate([self.ids[keep], np.asarray(upsert_ids, dtype=np.int64)])
+        index.assignments = np.concatenate([self.assignments[keep], self._assign(new_vectors)])
+        index._build_lists()
+        return index
+
+    def _arrays(self):
+        return {
+            "ids": self.ids,
+            "centroids": self.centroids,
+            "assignments": self.assignments,
+            "n_probe": np.array(self.n_probe),
+        }
+
+    @classmethod
+    def _from_arrays(cls, data, vectors):
+        index = cls.__new__(cls)
+        index.vectors = vectors
+        index.ids = data["ids"]
+        index.centroids = data["centroids"]
+        index.assignments = data["assignments"]
+        index.n_lists = len(index.centroids)
+        index.n_probe = int(data["n_probe"])
+        index._build_lists()
+        return index
+
+
+INDEX_BACKENDS = {
+    BruteForceIndex.kind: BruteForceIndex,
+    IVFIndex.kind: IVFIndex,
+}
+
+
+def build_index(kind, vectors, ids=None, **params):
+    if kind not in INDEX_BACKENDS:
+        raise ValueError(f"Unknown vector index kind: {kind}")
+    return INDEX_BACKENDS[kind](vectors, ids, **params)
+
+
+def save_index(index, path, source_fingerprint=""):
+    # Raw float32 vectors are saved with the index; quantised stores already
+    # live on disk and are re-attached on load
+    arrays = index._arrays()
+    if not isinstance(index.vectors, QuantizedEmbeddings):
+        arrays["vectors"] = index.vectors
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, kind=np.array(index.kind), fingerprint=np.array(source_fingerprint), **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_index(path, expected_fingerprint: Optional[str] = None, vectors=None):
+    with np.load(path) as data:
+        if expected_fingerprint is not None and str(data["fingerprint"]) != expected_fingerprint:
+            return None
+        data = dict(data)
+        if "vectors" in data:
+            vectors = data["vectors"]
+        elif vectors is None:
+            raise ValueError(f"{path} does not contain vectors; pass the embedding store")
+        return INDEX_BACKENDS[str(data["kind"])]._from_arrays(data, _as_index_vectors(vectors))
+
+
+def load_or_build_index(kind, vectors, ids, path=None, **params):
+    # Reuse the index persisted at `path` when it was built from the same
+    # catalogue with the same backend; otherwise build it and persist it
+    source_fingerprint = fingerprint(vectors, ids)
+    if path and os.path.exists(path):
+        index = load_index(path, source_fingerprint, vectors)
+        if index is not None and index.kind == kind:
+            return index
+
+    index = build_index(kind, vectors, ids, **params)
+    if path:
+        save_index(index, path, source_fingerprint)
+    return index